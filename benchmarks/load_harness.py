@@ -0,0 +1,450 @@
+# pyright: basic
+"""
+How many guilds one process can play to before audio stutters.
+
+Drives ``YTDLHandler`` directly for a growing number of simulated guilds. Each
+guild loops a short queue of tracks served by a local HTTP server, played
+through the handler's normal path (``play_next``, ffmpeg source, ``after``
+callback) into a fake voice client that reads one frame per 20 ms on its own
+thread, like discord.py's player. Per ramp step it records frame deadline
+misses (a frame read more than one frame late), first frame latency, CPU per
+session (ffmpeg children included), thread count and RSS, and writes them as
+JSON to compare between versions.
+
+    python benchmarks/load_harness.py --steps 1,2,4,8,16 --out report.json
+
+``--source http`` reads the WAV over HTTP in process instead of spawning
+ffmpeg, for hosts without it; it measures the bot side only.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import platform
+import shutil
+import struct
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+import wave
+from importlib import metadata
+
+import discord
+from aiohttp import web
+
+from muscpy.yt_dlp_streamer import Track, YTDLHandler
+
+FRAME = 0.02  # seconds of audio per voice packet
+PCM_FRAME_BYTES = 3840  # 20 ms of 48 kHz stereo s16le
+
+
+def make_wav(seconds: float, frequency: float = 440.0) -> bytes:
+    period = int(48000 / frequency)
+    cycle = b"".join(
+        struct.pack("<hh", sample, sample)
+        for sample in (
+            int(8000 * math.sin(2 * math.pi * n / period)) for n in range(period)
+        )
+    )
+    frames = cycle * (int(48000 * seconds) // period)
+    out = io.BytesIO()
+    with wave.open(out, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(48000)
+        wav.writeframes(frames)
+    return out.getvalue()
+
+
+class MediaServer:
+    """
+    Serves the same WAV under any ``/track/<n>.wav`` path.
+    """
+
+    def __init__(self, track_seconds: float):
+        self.audio = make_wav(track_seconds)
+        self.requests = 0
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+
+    async def _track(self, _: web.Request) -> web.Response:
+        self.requests += 1
+        return web.Response(body=self.audio, content_type="audio/wav")
+
+    async def start(self) -> None:
+        app = web.Application()
+        _ = app.router.add_get("/track/{name}", self._track)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # pyright: ignore
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+class HttpPcmSource(discord.AudioSource):
+    """
+    ``--source http``: PCM frames of the WAV read straight from the server.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self._response = None
+
+    def read(self) -> bytes:
+        if self._response is None:
+            # on the player thread, the server runs on the event loop
+            self._response = urllib.request.urlopen(self.url)
+            _ = self._response.read(44)  # RIFF header
+        data = self._response.read(PCM_FRAME_BYTES)
+        return data if len(data) == PCM_FRAME_BYTES else b""
+
+    def is_opus(self) -> bool:
+        return False
+
+    def cleanup(self) -> None:
+        if self._response is not None:
+            self._response.close()
+
+
+class SessionStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> dict:
+        with self._lock:
+            snapshot = dict(getattr(self, "_values", {}))
+            self._values = {
+                "frames": 0,
+                "misses": 0,
+                "max_late": 0.0,
+                "tracks": 0,
+                "first_frame_total": 0.0,
+                "player_cpu": 0.0,
+            }
+        return snapshot
+
+    def add(self, **values: float) -> None:
+        with self._lock:
+            for key, value in values.items():
+                if key == "max_late":
+                    self._values[key] = max(self._values[key], value)
+                else:
+                    self._values[key] += value
+
+
+class FakeVoiceClient:
+    """
+    The part of ``discord.VoiceClient`` the handler uses. ``play`` starts a
+    thread reading the source at the 20 ms cadence of discord.py's AudioPlayer
+    (sleeping until each frame's due time, catching up without sleeping when
+    behind) and calls ``after`` when the source runs dry.
+    """
+
+    def __init__(self, stats: SessionStats):
+        self.stats = stats
+        self._source: discord.AudioSource | None = None
+        self._playing = threading.Event()
+        self._paused = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def is_connected(self) -> bool:
+        return True
+
+    def is_playing(self) -> bool:
+        return self._playing.is_set() and not self._paused.is_set()
+
+    def is_paused(self) -> bool:
+        return self._paused.is_set()
+
+    def play(self, source: discord.AudioSource, *, after=None) -> None:
+        if self._playing.is_set():
+            raise discord.ClientException("Already playing audio.")
+        self._source = source
+        self._stopped.clear()
+        self._playing.set()
+        self._thread = threading.Thread(
+            target=self._run, args=(source, after), daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, source: discord.AudioSource, after) -> None:
+        cpu_mark = time.thread_time()
+        requested = time.perf_counter()
+        error = None
+        try:
+            data = source.read()
+            started = time.perf_counter()
+            self.stats.add(tracks=1, first_frame_total=started - requested)
+            sent = frames = misses = 0
+            max_late = 0.0
+            while data and not self._stopped.is_set():
+                if self._paused.is_set():
+                    time.sleep(FRAME)
+                    started += FRAME
+                    continue
+                late = time.perf_counter() - (started + sent * FRAME)
+                sent += 1
+                frames += 1
+                if late > FRAME:
+                    misses += 1
+                max_late = max(max_late, late)
+                if frames == 10:
+                    cpu_now = time.thread_time()
+                    self.stats.add(
+                        frames=frames,
+                        misses=misses,
+                        max_late=max_late,
+                        player_cpu=cpu_now - cpu_mark,
+                    )
+                    cpu_mark = cpu_now
+                    frames = misses = 0
+                    max_late = 0.0
+                delay = started + sent * FRAME - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                data = source.read()
+            self.stats.add(frames=frames, misses=misses, max_late=max_late)
+        except Exception as e:  # noqa: BLE001 handed to after, as AudioPlayer does
+            error = e
+        finally:
+            self.stats.add(player_cpu=time.thread_time() - cpu_mark)
+            self._playing.clear()
+            source.cleanup()
+            if after is not None and not self._stopped.is_set():
+                after(error)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._paused.clear()
+
+    def pause(self) -> None:
+        self._paused.set()
+
+    def resume(self) -> None:
+        self._paused.clear()
+
+    def cleanup(self) -> None:
+        pass
+
+    async def disconnect(self, *, force: bool = False) -> None:
+        self.stop()
+
+
+class FakeBot:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+
+
+class FakeInteraction:
+    def __init__(self, interaction_id: int):
+        self.id = interaction_id
+        self.user = None
+
+    def is_expired(self) -> bool:
+        return False
+
+    async def edit_original_response(self, **kwargs) -> None:
+        pass
+
+
+class Guild:
+    def __init__(self, guild_id: int, bot: FakeBot, base_url: str, tracks: int):
+        self.stats = SessionStats()
+        self.voice_client = FakeVoiceClient(self.stats)
+        self.handler = YTDLHandler(
+            bot=bot,  # pyright: ignore[reportArgumentType]
+            voice_client=self.voice_client,  # pyright: ignore[reportArgumentType]
+            guild_id=str(guild_id),
+        )
+        self.handler.loop = True
+        self.interaction = FakeInteraction(guild_id)
+        for indx in range(tracks):
+            url = f"{base_url}/track/{guild_id}-{indx}.wav"
+            self.handler.queue.append(
+                Track.from_dict(
+                    {
+                        "original_url": url,
+                        "url": url,
+                        "title": f"guild {guild_id} track {indx}",
+                        "duration": 1,
+                        "acodec": "pcm_s16le",
+                    },
+                    fetch_sts=True,
+                )
+            )
+
+    async def start(self) -> None:
+        await self.handler.play_next(self.interaction)  # pyright: ignore[reportArgumentType]
+
+    def stop(self) -> None:
+        self.handler.loop = False
+        self.handler.queue.clear()
+        self.voice_client.stop()
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _cpu_seconds() -> float:
+    times = os.times()
+    # children only count once reaped, i.e. after their track ended
+    return times.user + times.system + times.children_user + times.children_system
+
+
+async def measure(guilds: list[Guild], seconds: float) -> dict:
+    for guild in guilds:
+        _ = guild.stats.reset()
+    cpu_started = _cpu_seconds()
+    started = time.perf_counter()
+    await asyncio.sleep(seconds)
+    elapsed = time.perf_counter() - started
+    cpu = _cpu_seconds() - cpu_started
+    totals = [guild.stats.reset() for guild in guilds]
+    frames = sum(total["frames"] for total in totals)
+    misses = sum(total["misses"] for total in totals)
+    tracks = sum(total["tracks"] for total in totals)
+    expected = len(guilds) * elapsed / FRAME
+    return {
+        "guilds": len(guilds),
+        "seconds": round(elapsed, 3),
+        "frames": frames,
+        "frames_expected": round(expected),
+        "deadline_misses": misses,
+        "miss_ratio": round(misses / frames, 5) if frames else None,
+        "max_late_ms": round(max((t["max_late"] for t in totals), default=0) * 1000, 2),
+        "tracks_started": tracks,
+        "first_frame_ms_avg": round(
+            sum(t["first_frame_total"] for t in totals) / tracks * 1000, 2
+        )
+        if tracks
+        else None,
+        "cpu_per_session": round(cpu / elapsed / len(guilds), 4),
+        "player_cpu_per_session": round(
+            sum(t["player_cpu"] for t in totals) / elapsed / len(guilds), 4
+        ),
+        "threads": threading.active_count(),
+        "rss_mb": round(_rss_bytes() / 1024**2, 1),
+    }
+
+
+def _version() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    try:
+        version = metadata.version("muscpy")
+    except metadata.PackageNotFoundError:
+        version = None
+    return {"muscpy": version, "commit": commit}
+
+
+async def run(args: argparse.Namespace) -> dict:
+    if args.source == "http":
+        YTDLHandler._audio_source = staticmethod(  # pyright: ignore
+            lambda track, cached_path, *_: HttpPcmSource(track.data_url)
+        )
+    server = MediaServer(args.track_seconds)
+    await server.start()
+    bot = FakeBot(asyncio.get_running_loop())
+    guilds: list[Guild] = []
+    steps: list[dict] = []
+    try:
+        for target in args.steps:
+            while len(guilds) < target:
+                guild = Guild(len(guilds) + 1, bot, server.base_url, args.tracks)
+                guilds.append(guild)
+                await guild.start()
+            await asyncio.sleep(args.warmup)
+            step = await measure(guilds, args.seconds)
+            steps.append(step)
+            print(json.dumps(step), file=sys.stderr)
+            if (
+                step["miss_ratio"] is not None
+                and step["miss_ratio"] > args.max_miss_ratio
+            ):
+                break
+    finally:
+        for guild in guilds:
+            guild.stop()
+        await asyncio.sleep(0.1)
+        await server.close()
+    sustained = [
+        step["guilds"]
+        for step in steps
+        if step["miss_ratio"] is not None and step["miss_ratio"] <= args.max_miss_ratio
+    ]
+    return {
+        **_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "source": args.source,
+        "track_seconds": args.track_seconds,
+        "max_miss_ratio": args.max_miss_ratio,
+        "max_sustained_guilds": max(sustained, default=0),
+        "steps": steps,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--steps",
+        type=lambda value: [int(step) for step in value.split(",")],
+        default=[1, 2, 4, 8, 16, 32],
+        help="guild counts to ramp through",
+    )
+    parser.add_argument("--seconds", type=float, default=10, help="measured per step")
+    parser.add_argument("--warmup", type=float, default=2, help="settling per step")
+    parser.add_argument("--tracks", type=int, default=3, help="queued per guild")
+    parser.add_argument("--track-seconds", type=float, default=5)
+    parser.add_argument("--source", choices=("ffmpeg", "http"), default="ffmpeg")
+    parser.add_argument(
+        "--max-miss-ratio",
+        type=float,
+        default=0.01,
+        help="stop ramping once a step misses more frame deadlines",
+    )
+    parser.add_argument("--out", help="report file, stdout if omitted")
+    args = parser.parse_args()
+    if args.source == "ffmpeg" and shutil.which("ffmpeg") is None:
+        sys.exit("ffmpeg not found, install it or run with --source http")
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as out:
+            _ = out.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
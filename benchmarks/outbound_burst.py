@@ -0,0 +1,166 @@
+# pyright: basic
+"""
+Replays a burst of response edits and channel sends against a local fake
+Discord endpoint, once directly and once through ``OutboundScheduler``.
+
+The endpoint enforces a per route limit of 5 requests per 5 seconds and
+answers 429 with ``Retry-After`` past it, like Discord's message routes. The
+direct run does what the handlers did before: one request per edit.
+
+    python benchmarks/outbound_burst.py [interactions] [edits per interaction]
+"""
+
+import asyncio
+import sys
+import time
+from collections import defaultdict, deque
+
+import aiohttp
+import discord
+from aiohttp import web
+
+from muscpy.outbound import OutboundScheduler
+
+ROUTE_LIMIT = 5
+ROUTE_WINDOW = 5.0
+CHANNELS = 2
+SENDS_PER_CHANNEL = 8
+
+
+class FakeDiscord:
+    def __init__(self):
+        self.requests = 0
+        self.rate_limited = 0
+        self._windows: dict[str, deque[float]] = defaultdict(deque)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        now = time.monotonic()
+        window = self._windows[request.path]
+        while window and window[0] <= now - ROUTE_WINDOW:
+            _ = window.popleft()
+        if len(window) >= ROUTE_LIMIT:
+            self.rate_limited += 1
+            retry_after = window[0] + ROUTE_WINDOW - now
+            return web.json_response(
+                {"message": "You are being rate limited.", "retry_after": retry_after},
+                status=429,
+                headers={"Retry-After": f"{retry_after:.3f}"},
+            )
+        window.append(now)
+        return web.json_response({"id": request.path})
+
+
+class FakeHTTP:
+    def __init__(self, session: aiohttp.ClientSession, base: str):
+        self.session = session
+        self.base = base
+
+    async def post(self, path: str, payload: dict) -> dict:
+        async with self.session.post(self.base + path, json=payload) as response:
+            if response.status >= 400:
+                raise discord.HTTPException(response, await response.json())
+            return await response.json()
+
+
+class FakeInteraction:
+    def __init__(self, http: FakeHTTP, interaction_id: int):
+        self.http = http
+        self.id = interaction_id
+
+    def is_expired(self) -> bool:
+        return False
+
+    async def edit_original_response(self, **kwargs) -> dict:
+        return await self.http.post(f"/webhooks/{self.id}/original", kwargs)
+
+
+class FakeChannel:
+    def __init__(self, http: FakeHTTP, channel_id: int):
+        self.http = http
+        self.id = channel_id
+
+    async def send(self, **kwargs) -> dict:
+        return await self.http.post(f"/channels/{self.id}/messages", kwargs)
+
+
+async def _burst(edit, send, http: FakeHTTP, interactions: int, edits: int) -> int:
+    """
+    Progress style edits every 20ms per interaction plus a few channel sends.
+    Returns the calls that failed.
+    """
+    failed = 0
+
+    async def progress(interaction: FakeInteraction):
+        nonlocal failed
+        pending = []
+        for step in range(edits):
+            pending.append(asyncio.ensure_future(edit(interaction, content=f"{step}")))
+            await asyncio.sleep(0.02)
+        for result in await asyncio.gather(*pending, return_exceptions=True):
+            failed += isinstance(result, Exception)
+
+    async def announce(channel: FakeChannel):
+        nonlocal failed
+        for step in range(SENDS_PER_CHANNEL):
+            try:
+                _ = await send(channel, content=f"{step}")
+            except discord.HTTPException:
+                failed += 1
+
+    _ = await asyncio.gather(
+        *(progress(FakeInteraction(http, i)) for i in range(interactions)),
+        *(announce(FakeChannel(http, 1000 + i)) for i in range(CHANNELS)),
+    )
+    return failed
+
+
+async def _run(scheduled: bool, interactions: int, edits: int) -> None:
+    fake = FakeDiscord()
+    app = web.Application()
+    app.router.add_post("/{tail:.*}", fake.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # pyright: ignore
+    async with aiohttp.ClientSession() as session:
+        http = FakeHTTP(session, f"http://127.0.0.1:{port}")
+        if scheduled:
+            scheduler = OutboundScheduler(
+                target_burst=ROUTE_LIMIT, target_rate=ROUTE_LIMIT / ROUTE_WINDOW
+            )
+            edit, send = scheduler.edit, scheduler.send
+        else:
+
+            async def edit(interaction, **kwargs):
+                return await interaction.edit_original_response(**kwargs)
+
+            async def send(channel, **kwargs):
+                return await channel.send(**kwargs)
+
+        start = time.perf_counter()
+        failed = await _burst(edit, send, http, interactions, edits)
+        elapsed = time.perf_counter() - start
+    await runner.cleanup()
+    name = "scheduler" if scheduled else "direct"
+    print(
+        f"{name:>9}: {fake.requests:5d} requests, {fake.rate_limited:5d} answered 429, "
+        f"{failed:5d} calls failed, {elapsed:6.2f}s"
+    )
+    if scheduled:
+        print(f"{'':>9}  {scheduler.report()}")
+
+
+async def main(interactions: int, edits: int) -> None:
+    print(
+        f"{interactions} interactions x {edits} edits, "
+        f"{CHANNELS} channels x {SENDS_PER_CHANNEL} sends"
+    )
+    await _run(False, interactions, edits)
+    await _run(True, interactions, edits)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(main(*(args + [20, 40][len(args) :])))
@@ -0,0 +1,220 @@
+# pyright: basic
+"""
+The track resolution path on replayed extractions, no network needed.
+
+Times ``Track.from_dict``, ``create_track``, ``generate_track_or_que_urls`` (a
+whole playlist, through the extraction scheduler and pools) and
+``PlayButtonView`` construction. Extractions are answered by
+``ReplayYoutubeDL``: from a fixture directory recorded with
+``MUSCPY_YTDL_RECORD`` / ``ytdlp_test.py``, or from synthetic fixtures shaped
+like real results when none is given. The playlist run is repeated with
+injected latency and errors.
+
+    python benchmarks/resolution_bench.py [fixture dir] [iterations]
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from yt_dlp.utils import DownloadError
+
+from muscpy.yt_dlp_streamer import (
+    PlayButtonView,
+    Track,
+    YTDLHandler,
+    extraction_cache,
+    extraction_scheduler,
+    use_ytdl_factory,
+    ytdl_option_profiles,
+)
+from muscpy.ytdl_replay import FixtureStore, replay_factory
+
+PLAYLIST_URL = "https://www.youtube.com/playlist?list=PLresolutionbench"
+SEARCH_URL = "ytsearch5:resolution bench"
+PLAYLIST_ENTRIES = 100
+UNRESOLVED_EVERY = 10  # flat entries without duration, resolved one by one
+
+
+def _video_url(indx: int) -> str:
+    return f"https://www.youtube.com/watch?v=bench{indx:06d}"
+
+
+def _flat_entry(indx: int) -> dict:
+    entry = {
+        "_type": "url",
+        "ie_key": "Youtube",
+        "id": f"bench{indx:06d}",
+        "url": _video_url(indx),
+        "title": f"Benchmark track number {indx} (official audio)",
+        "channel": "Benchmark Channel",
+        "thumbnails": [
+            {"url": f"https://i.ytimg.com/vi/bench{indx:06d}/{size}.jpg"}
+            for size in ("default", "mqdefault", "hqdefault", "maxresdefault")
+        ],
+        "view_count": indx * 1000,
+    }
+    if indx % UNRESOLVED_EVERY:
+        entry["duration"] = 180 + indx
+    return entry
+
+
+def _single(indx: int) -> dict:
+    url = _video_url(indx)
+    stream = f"https://rr1---sn-bench.googlevideo.com/videoplayback?expire=4102444800&id={indx}"
+    return {
+        "id": f"bench{indx:06d}",
+        "title": f"Benchmark track number {indx} (official audio)",
+        "original_url": url,
+        "webpage_url": url,
+        "extractor": "youtube",
+        "duration": 180 + indx,
+        "thumbnail": f"https://i.ytimg.com/vi/bench{indx:06d}/maxresdefault.jpg",
+        "url": stream,
+        "acodec": "opus",
+        "formats": [
+            {"format_id": str(251 + n), "url": f"{stream}&itag={n}", "acodec": "opus"}
+            for n in range(20)
+        ],
+        "description": "benchmark " * 100,
+    }
+
+
+def write_synthetic_fixtures(directory: str) -> None:
+    store = FixtureStore(directory)
+    entries = [_flat_entry(indx) for indx in range(PLAYLIST_ENTRIES)]
+    store.save(
+        PLAYLIST_URL,
+        ytdl_option_profiles["playlist"],
+        {
+            "_type": "playlist",
+            "title": "Resolution benchmark",
+            "playlist_count": PLAYLIST_ENTRIES,
+            "entries": entries,
+        },
+    )
+    store.save(
+        SEARCH_URL,
+        ytdl_option_profiles["search"],
+        {"_type": "playlist", "entries": entries[1:6]},
+    )
+    for indx in range(PLAYLIST_ENTRIES):
+        store.save(_video_url(indx), ytdl_option_profiles["single"], _single(indx))
+
+
+def _per_op(total: float, ops: int) -> str:
+    return f"{total / ops * 1e6:9.1f} us/op"
+
+
+def find_fixtures(store: FixtureStore) -> tuple[str, str, str]:
+    """
+    A playlist, a search and a single video url among the recorded fixtures.
+    """
+    playlist_url = search_url = single_url = None
+    for url in store.recorded():
+        data = store.load(url, {})
+        if url.startswith("ytsearch"):
+            search_url = search_url or url
+        elif data.get("_type") == "playlist":
+            playlist_url = playlist_url or url
+        elif "formats" in data:
+            single_url = single_url or url
+    if playlist_url is None or search_url is None or single_url is None:
+        sys.exit("the fixtures need a playlist, a ytsearch and a single video")
+    return playlist_url, search_url, single_url
+
+
+async def _playlist(url: str) -> int:
+    tracks = 0
+    async for track_cr, _ in YTDLHandler.generate_track_or_que_urls(url):
+        if isinstance(await track_cr, Track):
+            tracks += 1
+    return tracks
+
+
+async def bench(directory: str, iterations: int, results: list[str]) -> None:
+    store = FixtureStore(directory)
+    playlist_url, search_url, single_url = find_fixtures(store)
+    single = store.load(single_url, ytdl_option_profiles["single"])
+    playlist = store.load(playlist_url, ytdl_option_profiles["playlist"])
+    entries = [entry for entry in playlist["entries"] if "duration" in entry]
+    search = store.load(search_url, ytdl_option_profiles["search"])
+
+    start = time.perf_counter()
+    for _ in range(iterations * 100):
+        _ = Track.from_dict(single, fetch_sts=True)
+    results.append(
+        f"Track.from_dict           {_per_op(time.perf_counter() - start, iterations * 100)}"
+    )
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for entry in entries:
+            _ = await YTDLHandler.create_track(entry, fetch_sts=False)
+    ops = iterations * len(entries)
+    results.append(
+        f"create_track (flat entry) {_per_op(time.perf_counter() - start, ops)}"
+    )
+
+    search_tracks = [
+        await YTDLHandler.create_track(entry, fetch_sts=False)
+        for entry in search["entries"]
+    ]
+    start = time.perf_counter()
+    for _ in range(iterations * 10):
+        _ = PlayButtonView(None, search_tracks)  # pyright: ignore[reportArgumentType]
+    results.append(
+        f"PlayButtonView ({len(search_tracks)} tracks) "
+        f"{_per_op(time.perf_counter() - start, iterations * 10)}"
+    )
+
+    for label, options in (
+        ("replay", {}),
+        (
+            "replay 5ms ±50%, 10% errors",
+            {"latency": 0.005, "jitter": 0.5, "error_rate": 0.1},
+        ),
+    ):
+        use_ytdl_factory(replay_factory(directory, seed=1, **options))
+        runs = iterations if not options else max(1, iterations // 10)
+        tracks = failed = 0
+        start = time.perf_counter()
+        for _ in range(runs):
+            extraction_cache.clear()
+            try:
+                tracks += await _playlist(playlist_url)
+            except DownloadError:
+                failed += 1
+        elapsed = time.perf_counter() - start
+        results.append(
+            f"generate_track_or_que_urls, {label}: {elapsed / runs * 1000:8.2f} ms/playlist, "
+            f"{tracks / max(1, runs - failed):.0f} of {len(playlist['entries'])} tracks, "
+            f"{failed} of {runs} playlists failed"
+        )
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    directory = args[0] if args and not args[0].isdigit() else None
+    iterations = int(args[-1]) if args and args[-1].isdigit() else 20
+    with contextlib.ExitStack() as stack:
+        if directory is None:
+            directory = stack.enter_context(tempfile.TemporaryDirectory())
+            write_synthetic_fixtures(directory)
+        elif not os.path.isdir(directory):
+            sys.exit(f"no fixture directory {directory}")
+        use_ytdl_factory(replay_factory(directory))
+        results: list[str] = []
+        # the resolution path prints per track, keep that out of the output
+        with contextlib.redirect_stdout(io.StringIO()):
+            asyncio.run(bench(directory, iterations, results))
+        print("\n".join(results))
+    extraction_scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    main()
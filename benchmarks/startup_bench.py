@@ -0,0 +1,108 @@
+# pyright: basic
+"""
+Cold start of the bot process: importing ``muscpy.bot_main``, the deferred
+yt_dlp import with the first ``YoutubeDL`` build, and the command tree check
+``on_ready`` makes before deciding whether to sync.
+
+Imports are timed in fresh interpreters, the median of ``runs`` of each.
+
+    python benchmarks/startup_bench.py [runs]
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+_IMPORT_BOT = """
+import json, sys, time
+started = time.perf_counter()
+import muscpy.bot_main
+print(json.dumps([time.perf_counter() - started, "yt_dlp" in sys.modules]))
+"""
+
+_FIRST_YTDL = """
+import json, time
+import muscpy.bot_main
+from muscpy.ytdl_pool import load_yt_dlp
+from muscpy.yt_dlp_streamer import ytldl_single_url_options
+started = time.perf_counter()
+load_yt_dlp()(ytldl_single_url_options)
+print(json.dumps([time.perf_counter() - started, True]))
+"""
+
+
+def _fresh(code: str, runs: int) -> tuple[float, bool]:
+    seconds: list[float] = []
+    loaded = False
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        # the last line, config loading may print before it
+        elapsed, loaded = json.loads(out.strip().splitlines()[-1])
+        seconds.append(elapsed)
+    return statistics.median(seconds), loaded
+
+
+async def _command_tree(iterations: int, results: list[str]) -> None:
+    from muscpy.bot_main import Manage, bot
+    from muscpy.command_sync import CommandSyncCache, command_tree_hash
+
+    await bot.add_cog(Manage(bot))
+    bot._connection.application_id = 1  # no login, nothing is sent
+    commands = len(bot.tree.get_commands())
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        digest = command_tree_hash(bot.tree)
+    elapsed = time.perf_counter() - start
+    results.append(
+        f"command_tree_hash ({commands} commands)   {elapsed / iterations * 1e3:8.3f} ms"
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = CommandSyncCache(os.path.join(directory, "commands.json"))
+        cache.commands = [
+            (command.name, command.description) for command in bot.tree.get_commands()
+        ]
+        cache._save("1", digest)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            if await cache.sync(bot.tree):
+                sys.exit("the stored hash did not match, sync was attempted")
+        elapsed = time.perf_counter() - start
+    results.append(
+        f"command sync, unchanged tree     {elapsed / iterations * 1e3:8.3f} ms"
+        " (a real sync is a rate limited bulk upsert)"
+    )
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results: list[str] = []
+
+    seconds, loaded = _fresh(_IMPORT_BOT, runs)
+    results.append(
+        f"import muscpy.bot_main           {seconds * 1e3:8.1f} ms"
+        f" (yt_dlp {'imported' if loaded else 'not imported'})"
+    )
+    seconds, _ = _fresh(_FIRST_YTDL, runs)
+    results.append(
+        f"first YoutubeDL, yt_dlp import   {seconds * 1e3:8.1f} ms"
+        " (paid by the warm up thread after login)"
+    )
+
+    asyncio.run(_command_tree(200, results))
+    print("\n".join(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# pyright: basic
+"""
+Bytes per queued track of the old ``@dataclass`` Track vs the slotted Track
+with shared ``TrackInfo``.
+
+Every queue entry is built from its own extraction result (fresh strings, like
+separate guilds resolving the same songs), drawn from a smaller set of unique
+videos. Measured with ``tracemalloc`` after the source dicts are dropped.
+
+    python benchmarks/track_memory_bench.py [entries] [unique videos]
+"""
+
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass
+
+from muscpy.track_queue import TrackQueue
+from muscpy.yt_dlp_streamer import Track
+
+
+@dataclass
+class LegacyTrack:
+    """
+    The Track layout before the compact representation.
+    """
+
+    original_url: str
+    data_url: str
+    title: str | None
+    length: int | None
+    thumbnail: str | None
+    extractor: str | None
+    playlist_url: str | None
+    requester: object | None = None
+    fetched: bool = False
+    acodec: str | None = None
+
+
+class FakeMember:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.display_name = f"user{user_id}"
+
+
+def _fresh(text: str) -> str:
+    # a new string object, as every extraction returns its own
+    return "".join(list(text))
+
+
+def entry(video: int) -> dict:
+    video_id = f"{video:011d}"
+    return {
+        "original_url": _fresh(f"https://www.youtube.com/watch?v={video_id}"),
+        "url": _fresh(f"https://www.youtube.com/watch?v={video_id}"),
+        "title": _fresh(f"Some artist - some fairly long song title number {video}"),
+        "duration": 180 + video % 120,
+        "thumbnail": _fresh(f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"),
+        "extractor": _fresh("youtube"),
+        "playlist": None,
+    }
+
+
+def legacy_track(data: dict, requester: FakeMember) -> LegacyTrack:
+    return LegacyTrack(
+        original_url=data["original_url"],
+        data_url=data["url"],
+        title=data["title"],
+        length=data["duration"],
+        thumbnail=data["thumbnail"],
+        extractor=data["extractor"],
+        playlist_url=data["playlist"],
+        requester=requester,
+    )
+
+
+def compact_track(data: dict, requester: FakeMember) -> Track:
+    return Track.from_dict(data, True, requester=requester)  # type: ignore
+
+
+def measure(build, entries: int, unique: int) -> float:
+    requesters = [FakeMember(i) for i in range(50)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    queue = TrackQueue()
+    for i in range(entries):
+        queue.append(build(entry(i % unique), requesters[i % len(requesters)]))
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del queue
+    return used / entries
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    unique = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    legacy = measure(legacy_track, entries, unique)
+    compact = measure(compact_track, entries, unique)
+    print(f"{entries} queued tracks from {unique} unique videos")
+    print(f"  dataclass Track        {legacy:8.1f} bytes/track")
+    print(f"  slotted Track + info   {compact:8.1f} bytes/track")
+
+
+if __name__ == "__main__":
+    main()
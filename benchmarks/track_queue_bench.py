@@ -0,0 +1,83 @@
+# pyright: basic
+"""
+Queue operations of the old list backed queue vs ``TrackQueue`` on large queues.
+
+The list side does what ``SharedList`` did: ``pop(0)`` per played track and one
+``pop`` per skipped track.
+
+    python benchmarks/track_queue_bench.py [tracks ...]
+"""
+
+import random
+import sys
+import time
+
+from muscpy.track_queue import TrackQueue
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_list(size: int) -> dict[str, float]:
+    items = list(range(size))
+
+    def play_all():
+        while items:
+            _ = items.pop(0)
+
+    def skip_half():
+        for _ in range(size // 2):
+            _ = items.pop(0)
+
+    def insert_middle():
+        for i in range(1000):
+            items.insert(len(items) // 2, i)
+
+    results = {"play all": _timed(play_all)}
+    items.extend(range(size))
+    results["skip half"] = _timed(skip_half)
+    items[:] = range(size)
+    results["1k middle inserts"] = _timed(insert_middle)
+    results["shuffle"] = _timed(lambda: random.shuffle(items))
+    return results
+
+
+def bench_queue(size: int) -> dict[str, float]:
+    queue: TrackQueue[int] = TrackQueue(range(size))
+
+    def play_all():
+        while queue:
+            _ = queue.popleft()
+
+    def insert_middle():
+        for i in range(1000):
+            queue.insert_many(len(queue) // 2, (i,))
+
+    results = {"play all": _timed(play_all)}
+    queue.extend(range(size))
+    results["skip half"] = _timed(lambda: queue.skip(size // 2))
+    queue.clear()
+    queue.extend(range(size))
+    results["1k middle inserts"] = _timed(insert_middle)
+    results["shuffle"] = _timed(queue.shuffle)
+    return results
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 50_000]
+    for size in sizes:
+        as_list = bench_list(size)
+        as_queue = bench_queue(size)
+        print(f"{size} tracks")
+        for op in as_list:
+            print(
+                f"  {op:<18} list {as_list[op]:9.2f} ms"
+                f"  TrackQueue {as_queue[op]:9.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
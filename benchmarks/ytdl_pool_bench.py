@@ -0,0 +1,84 @@
+# pyright: basic
+"""
+Per extraction overhead of a fresh ``YoutubeDL`` per call vs the pooled instances.
+
+Extracts a direct media url served from a local http server (generic extractor),
+so the numbers show construction + request setup cost, not youtube latency.
+
+    python benchmarks/ytdl_pool_bench.py [iterations]
+"""
+
+import http.server
+import sys
+import threading
+import time
+
+from yt_dlp import YoutubeDL
+
+from muscpy.yt_dlp_streamer import ytldl_single_url_options
+from muscpy.ytdl_pool import YoutubeDLPool
+
+PAYLOAD = b"OggS" + b"\0" * 4096
+
+
+class _AudioHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _headers(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/ogg")
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._headers()
+
+    def do_GET(self):
+        self._headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _QuietServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # the generic extractor hangs up after sniffing the first bytes
+        pass
+
+
+def bench(label: str, iterations: int, extract) -> float:
+    extract()  # warm up imports / lazy extractors
+    start = time.perf_counter()
+    for _ in range(iterations):
+        extract()
+    per_call = (time.perf_counter() - start) / iterations
+    print(f"{label:<12} {per_call * 1000:8.2f} ms/extraction")
+    return per_call
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    server = _QuietServer(("127.0.0.1", 0), _AudioHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/track.ogg"
+    options = {**ytldl_single_url_options, "quiet": True, "source_address": None}
+
+    def fresh():
+        with YoutubeDL(options) as ytdl:
+            return ytdl.extract_info(url, download=False)
+
+    pool = YoutubeDLPool(options, size=1)
+
+    before = bench("fresh", iterations, fresh)
+    after = bench("pooled", iterations, lambda: pool.extract_info(url))
+    print(f"speedup      {before / after:8.2f}x")
+
+    pool.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
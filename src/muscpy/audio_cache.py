@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from collections import OrderedDict
+from typing import IO
+
+from muscpy.config import (
+    AUDIO_CACHE_BYTES,
+    AUDIO_CACHE_DIR,
+    AUDIO_CACHE_MAX_TRACK_SECONDS,
+)
+from muscpy.extraction_cache import normalize_video_key
+
+_SUFFIX = ".ogg"
+_PART_SUFFIX = ".ogg.part"
+
+
+class AudioCache:
+    """
+    On disk cache of played tracks as Ogg/Opus files, bounded by a byte budget.
+
+    A file is a copy of the Ogg/Opus stream ffmpeg sends to discord while the track
+    plays (``fill``), so filling the cache downloads nothing of its own. It is
+    written to a ``.part`` file and renamed into place once the track played to
+    the end, so a half written file is never played. The least recently played
+    files are evicted once the budget is exceeded; the LRU order is rebuilt from
+    the file mtimes on ``open``. While the cache is not opened it never hits and
+    stores nothing. The directory belongs to one process, shard clusters each get
+    their own (``cluster.audio_cache_share``).
+    """
+
+    def __init__(self, directory: str, byte_budget: int, max_track_seconds: int):
+        self.directory = directory
+        self.byte_budget = byte_budget
+        self.max_track_seconds = max_track_seconds
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._total_bytes = 0
+        self._fills: dict[str, CacheFill] = {}
+        self._opened = False
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        return hashlib.sha1(normalize_video_key(url).encode()).hexdigest()
+
+    def _path(self, key: str, suffix: str = _SUFFIX) -> str:
+        return os.path.join(self.directory, key + suffix)
+
+    def _part_path(self, key: str) -> str:
+        # tagged with the pid, a restarted cluster may overlap its predecessor
+        return self._path(key, f".{os.getpid()}{_PART_SUFFIX}")
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def open(self) -> None:
+        if self._opened:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        found: list[tuple[float, str, int]] = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(_PART_SUFFIX):
+                if not _filling_process_alive(entry.name):
+                    _remove_quietly(entry.path)
+            elif entry.name.endswith(_SUFFIX):
+                stat = entry.stat()
+                found.append(
+                    (stat.st_mtime, entry.name.removesuffix(_SUFFIX), stat.st_size)
+                )
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._opened = True
+        self._evict()
+
+    def close(self) -> None:
+        for fill in list(self._fills.values()):
+            fill.discard()
+        self._opened = False
+
+    def path_for(self, url: str) -> str | None:
+        if not self._opened or not _cacheable(url):
+            return None
+        key = self.key_for(url)
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            # removed behind our back, a miss
+            self._drop(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return path
+
+    def fill(self, url: str, length: int | None) -> CacheFill | None:
+        """
+        A fill to copy the stream of ``url`` into, None if the track is too long,
+        cached already or being filled by another playback.
+        """
+        if not self._opened or not _cacheable(url):
+            return None
+        if not length or length > self.max_track_seconds:
+            return None
+        key = self.key_for(url)
+        if key in self._entries or key in self._fills:
+            return None
+        try:
+            fill = CacheFill(self, key, self._part_path(key))
+        except OSError as e:
+            print(f"audio cache fill for {key} could not start: {e}")
+            return None
+        self._fills[key] = fill
+        return fill
+
+    def _store(self, fill: CacheFill) -> None:
+        del self._fills[fill.key]
+        size = os.path.getsize(fill.part_path)
+        os.replace(fill.part_path, self._path(fill.key))
+        self._entries[fill.key] = size
+        self._total_bytes += size
+        self._evict()
+
+    def _drop(self, key: str) -> None:
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+            _remove_quietly(self._path(key))
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.byte_budget and self._entries:
+            self._drop(next(iter(self._entries)))
+
+
+class CacheFill:
+    """
+    One track being written to the cache. ``tee`` wraps the stream read by the
+    player thread; ``commit`` keeps the file once all of it went through,
+    ``discard`` (a skipped, failed or resumed stream) removes it.
+    """
+
+    def __init__(self, cache: AudioCache, key: str, part_path: str):
+        self._cache = cache
+        self.key = key
+        self.part_path = part_path
+        self._file: IO[bytes] | None = open(part_path, "wb")  # noqa: SIM115 closed by commit / discard
+        self.failed = False
+
+    def tee(self, stream: IO[bytes]) -> _TeeReader:
+        return _TeeReader(stream, self)
+
+    def write(self, data: bytes) -> None:
+        if self._file is None or self.failed:
+            return
+        try:
+            _ = self._file.write(data)
+        except (OSError, ValueError) as e:
+            # e.g. a full disk, or discarded on shutdown; the track still plays
+            print(f"audio cache fill for {self.key} failed: {e}")
+            self.failed = True
+
+    def commit(self) -> None:
+        if not self._close():
+            return
+        if self.failed:
+            self._discard_file()
+            return
+        try:
+            self._cache._store(self)
+        except OSError as e:
+            print(f"audio cache fill for {self.key} failed: {e}")
+            self._discard_file()
+
+    def discard(self) -> None:
+        if self._close():
+            self._discard_file()
+
+    def _close(self) -> bool:
+        if self._file is None:
+            return False
+        try:
+            self._file.close()
+        except OSError:
+            self.failed = True
+        self._file = None
+        return True
+
+    def _discard_file(self) -> None:
+        _ = self._cache._fills.pop(self.key, None)
+        _remove_quietly(self.part_path)
+
+
+class _TeeReader:
+    def __init__(self, stream: IO[bytes], fill: CacheFill):
+        self._stream = stream
+        self._fill = fill
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._stream.read(size)
+        if data:
+            self._fill.write(data)
+        return data
+
+
+def _cacheable(url: str | None) -> bool:
+    return bool(url) and "Unknown" not in url  # pyright: ignore[reportOperatorIssue]
+
+
+def _filling_process_alive(part_name: str) -> bool:
+    pid = part_name.removesuffix(_PART_SUFFIX).rpartition(".")[2]
+    if not pid.isdigit() or int(pid) == os.getpid():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # exists, owned by someone else
+        return True
+    return True
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+audio_cache = AudioCache(
+    directory=AUDIO_CACHE_DIR,
+    byte_budget=AUDIO_CACHE_BYTES,
+    max_track_seconds=AUDIO_CACHE_MAX_TRACK_SECONDS,
+)
@@ -15,10 +15,42 @@ from discord.abc import Connectable
 from discord.ext import commands
 from discord.shard import EventItem
 
+from muscpy.audio_cache import audio_cache
+from muscpy.cluster import (
+    METRICS_PORT_ENV,
+    audio_cache_share,
+    is_primary_cluster,
+    shard_options,
+)
+from muscpy.command_sync import command_sync
+from muscpy.config import (
+    METRICS_HOST,
+    METRICS_PORT,
+    STARTUP_WARM_UP,
+    TRACE_JSONL_PATH,
+)
 from muscpy.idle_checker import IdleChecker
 from muscpy.load_env import get_env
+from muscpy.metrics import metrics
+from muscpy.outbound import outbound
+from muscpy.tracing import JsonLinesExporter, format_trace, trace_buffer, tracer
+from muscpy.track_store import track_store
 from muscpy.utils import SharedDict, get_voice_client, not_guild
-from muscpy.yt_dlp_streamer import YTDLHandler
+from muscpy.yt_dlp_streamer import (
+    YTDLHandler,
+    extraction_flights,
+    extraction_scheduler,
+    set_requester_lookup,
+    use_ytdl_factory,
+    warm_up,
+    ytdl_pools,
+)
+from muscpy.ytdl_replay import (
+    RECORD_ENV,
+    REPLAY_ENV,
+    recording_factory,
+    replay_factory,
+)
 
 intents = discord.Intents.default()
 intents.message_content = True
@@ -43,12 +75,32 @@ class MusicBot(commands.Bot):
         self.idleChecker = IdleChecker()
 
 
-bot = MusicBot(
+class ShardedMusicBot(commands.AutoShardedBot, MusicBot):
+    """
+    ``MusicBot`` running the shards set by ``MUSCPY_SHARD_COUNT`` / ``MUSCPY_SHARD_IDS``
+    (or ``muscpy.cluster``) in one process.
+    """
+
+
+_shard_options = shard_options()
+bot = (ShardedMusicBot if _shard_options else MusicBot)(
     description="Relatively simple music bot example",
     intents=intents,
+    **_shard_options,
 )
 
 
+def _lookup_requester(user_id: int, guild_id: int | None) -> discord.abc.User | None:
+    # the member carries the guild nickname, the user only the global name
+    guild = bot.get_guild(guild_id) if guild_id is not None else None
+    if guild is not None and (member := guild.get_member(user_id)) is not None:
+        return member
+    return bot.get_user(user_id)
+
+
+set_requester_lookup(_lookup_requester)
+
+
 @bot.tree.command()
 async def echo(interaction: discord.Interaction, message: str) -> None:
     """
@@ -194,7 +246,10 @@ async def help(interaction: discord.Interaction) -> None:
     interaction : discord.Interaction
         The interaction object.
     """
-    slash_commands = await bot.tree.fetch_commands()
+    # the commands of the last sync, before it the local definitions
+    slash_commands = command_sync.commands or [
+        (command.name, command.description) for command in bot.tree.get_commands()
+    ]
     # create a embed message
 
     embed = discord.Embed(
@@ -202,10 +257,8 @@ async def help(interaction: discord.Interaction) -> None:
         description="List of all commands",
         color=discord.Color.green(),
     )
-    for command in slash_commands:
-        embed = embed.add_field(
-            name=command.name, value=command.description, inline=False
-        )
+    for name, description in slash_commands:
+        embed = embed.add_field(name=name, value=description, inline=False)
     await interaction.response.send_message(embed=embed, ephemeral=True)
 
 
@@ -263,14 +316,14 @@ class Manage(commands.Cog):
         )
 
         if not isinstance(interaction.channel, discord.TextChannel):
-            _ = await interaction.edit_original_response(
-                content="This command only works in text channels."
+            _ = await outbound.edit(
+                interaction, content="This command only works in text channels."
             )
             return
 
         if limit > 100:
-            _ = await interaction.edit_original_response(
-                content="You can only delete up to 100 messages at a time."
+            _ = await outbound.edit(
+                interaction, content="You can only delete up to 100 messages at a time."
             )
             return
         if limit < 1:
@@ -283,8 +336,8 @@ class Manage(commands.Cog):
         messages_snfl = [message async for message in messages]
         try:
             await interaction.channel.delete_messages(messages_snfl)
-            _ = await interaction.edit_original_response(
-                content=f"Deleted {len(messages_snfl)} messages."
+            _ = await outbound.edit(
+                interaction, content=f"Deleted {len(messages_snfl)} messages."
             )
         except (
             discord.errors.Forbidden,
@@ -293,9 +346,52 @@ class Manage(commands.Cog):
             discord.errors.ClientException,
         ) as e:
             # only response with the error type
-            _ = await interaction.edit_original_response(
-                content=f"An error occurred: {e}"
-            )
+            _ = await outbound.edit(interaction, content=f"An error occurred: {e}")
+
+    @group.command(name="trace", description="Shows the latest request traces")
+    async def trace(
+        self,
+        interaction: discord.Interaction,
+        count: int = 3,
+        trace_id: str | None = None,
+    ) -> None:
+        """
+        shows the spans of the latest traces, e.g. where a /play spent its time
+
+        Parameters
+        ----------
+        interaction : discord.Interaction
+            The interaction object.
+        count : int
+            How many of the latest traces to show.
+        trace_id : str | None
+            Show only this trace.
+        """
+        traces = trace_buffer.traces(max(1, count), trace_id=trace_id)
+        text = "\n\n".join(format_trace(spans) for spans in traces) or "No traces"
+        if len(text) > 1900:
+            # the newest traces are at the end
+            text = "...\n" + text[-1900:]
+        await interaction.response.send_message(f"```\n{text}\n```", ephemeral=True)
+
+    @group.command(
+        name="extraction_stats",
+        description="Shows queue wait and execution time of extractions",
+    )
+    async def extraction_stats(self, interaction: discord.Interaction) -> None:
+        """
+        shows extraction scheduler stats per priority class
+
+        Parameters
+        ----------
+        interaction : discord.Interaction
+            The interaction object.
+        """
+        await interaction.response.send_message(
+            f"```\n{extraction_scheduler.report()}\n{extraction_flights.report()}\n"
+            f"{outbound.report()}\n```",
+            ephemeral=True,
+        )
 
 
 ###########
@@ -322,6 +418,7 @@ async def play_cmd(
     return await play(interaction, query_or_url=query_or_url, voice_ch=voice_ch)
 
 
+@tracer.traced("play")
 async def play(
     interaction: discord.Interaction,
     query_or_url: str | None = None,
@@ -331,8 +428,10 @@ async def play(
     if await not_guild(interaction):
         return None
     guild_id = str(interaction.guild_id)  # type: ignore
+    tracer.annotate(guild=guild_id, interaction=interaction.id, query=query_or_url)
 
-    voice_client = await get_voice_client(interaction, voice_ch, quiet=True)
+    with tracer.span("get_voice_client"):
+        voice_client = await get_voice_client(interaction, voice_ch, quiet=True)
 
     if voice_client is None:
         if not edit_msg:
@@ -351,7 +450,12 @@ async def play(
 
     if guild_music_hndlr is None:
         try:
-            guild_music_hndlr = YTDLHandler(bot=bot, voice_client=voice_client)  # type: ignore
+            guild_music_hndlr = YTDLHandler(
+                bot=bot,
+                voice_client=voice_client,
+                guild_id=guild_id,
+                on_playback_change=bot.idleChecker.playback_changed,
+            )  # type: ignore
         except Exception:
             if not edit_msg:
                 await interaction.response.send_message(
@@ -361,7 +465,10 @@ async def play(
                 content="Error initializing music handler"
             )
             return None
-        await bot.musicHandlerPool.set(guild_id, guild_music_hndlr)
+        # a concurrent /play for the same guild may have registered one meanwhile
+        guild_music_hndlr = await bot.musicHandlerPool.setdefault(
+            guild_id, guild_music_hndlr
+        )
 
     if not guild_music_hndlr.voice_client.is_connected():  # pyright: ignore[reportAttributeAccessIssue,reportUnknownMemberType]
         guild_music_hndlr.voice_client.cleanup()
@@ -379,7 +486,8 @@ async def play(
     try:
         await guild_music_hndlr.play(interaction=interaction, query_or_url=query_or_url)
     except Exception as e:
-        print(e)
+        span = tracer.current()
+        print(f"{e} (trace {span.trace_id if span else None})")
         await interaction.response.edit_message(content="Error playing the song")
         return None
     return None
@@ -541,12 +649,21 @@ async def on_ready():
         print("Bot is not logged in")
         exit(1)
     print(f"Logged in as {bot.user} (ID: {bot.user.id})")
-    bot_commands = await bot.tree.sync()
-    print("Command tree synced with Discord")
+    if isinstance(bot, ShardedMusicBot):
+        print(f"Running shards {sorted(bot.shards)} of {bot.shard_count}")
+    if not is_primary_cluster():
+        # every cluster shares the application's commands, cluster 0 syncs them
+        print("Command tree is synced by cluster 0")
+    elif await command_sync.sync(bot.tree):
+        print("Command tree synced with Discord")
+    else:
+        print("Command tree unchanged since the last sync, not synced")
     print("------ Bot is ready ------")
     print(" all commands")
-    print(bot_commands)
+    print([name for name, _ in command_sync.commands])
     print("------")
+    if STARTUP_WARM_UP:
+        warm_up()
 
     game = discord.Game("with the variables and processes")
     await bot.change_presence(status=discord.Status.idle, activity=game)
@@ -554,6 +671,26 @@ async def on_ready():
     await bot.idleChecker.run_idle_loop()
 
 
+@bot.event
+async def on_voice_state_update(
+    member: Member, before: discord.VoiceState, after: discord.VoiceState
+):
+    if before.channel == after.channel:
+        # mute / deafen changes
+        return
+    guild_id = str(member.guild.id)
+    if bot.user is not None and member.id == bot.user.id and after.channel is None:
+        await bot.idleChecker.deinit_idlestate_of_client(guild_id)
+        return
+    voice_client = member.guild.voice_client
+    if voice_client is None or not isinstance(voice_client.channel, VoiceChannel):
+        return
+    if voice_client.channel not in (before.channel, after.channel):
+        return
+    humans = sum(1 for m in voice_client.channel.members if not m.bot)
+    bot.idleChecker.listeners_changed(guild_id, humans)
+
+
 @bot.event
 async def on_error(event: EventItem, *args: Iterable[Any], **kwargs: dict[Any, Any]):
     print(f"An error occurred in {event}: {args} {kwargs}")
@@ -561,9 +698,36 @@ async def on_error(event: EventItem, *args: Iterable[Any], **kwargs: dict[Any, A
 
 async def main():
     bot_token = get_env("DCBOT_TOKEN", ".env")
-    async with bot:
-        await bot.add_cog(Manage(bot))
-        await bot.start(bot_token)
+    if replay_dir := get_env(REPLAY_ENV, ".env"):
+        print(f"answering extractions from the fixtures in {replay_dir}")
+        use_ytdl_factory(replay_factory(replay_dir))
+    elif record_dir := get_env(RECORD_ENV, ".env"):
+        print(f"recording extractions to {record_dir}")
+        use_ytdl_factory(recording_factory(record_dir))
+    track_store.open()
+    audio_cache.directory, audio_cache.byte_budget = audio_cache_share(
+        audio_cache.directory, audio_cache.byte_budget
+    )
+    audio_cache.open()
+    metrics_port = int(get_env(METRICS_PORT_ENV, ".env") or METRICS_PORT)
+    if metrics_port:
+        await metrics.serve(METRICS_HOST, metrics_port)
+    trace_file = JsonLinesExporter(TRACE_JSONL_PATH) if TRACE_JSONL_PATH else None
+    if trace_file is not None:
+        tracer.exporters.append(trace_file)
+    try:
+        async with bot:
+            await bot.add_cog(Manage(bot))
+            await bot.start(bot_token)
+    finally:
+        audio_cache.close()
+        await metrics.close()
+        if trace_file is not None:
+            trace_file.close()
+        extraction_scheduler.shutdown()
+        track_store.close()
+        for pool in ytdl_pools.values():
+            pool.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,218 @@
+"""
+Runs the bot as several processes ("clusters"), each owning a range of shards.
+
+Every cluster is a plain ``python -m muscpy`` process with its own gateway
+connections, music handlers, idle checker, extraction workers and GIL; the
+supervisor only spawns them and restarts the ones that crash.
+
+    python -m muscpy.cluster
+
+``MUSCPY_SHARD_COUNT`` sets the total shard count (default: what Discord
+recommends for the token), ``MUSCPY_CLUSTERS`` the process count (default:
+one per cpu, at most one per shard). With ``MUSCPY_METRICS_PORT`` set, cluster
+``n`` serves its metrics on that port + ``n``. Cluster ``n`` keeps its audio
+cache in ``AUDIO_CACHE_DIR/cluster-n`` with an equal share of the byte budget.
+"""
+
+import asyncio
+import os
+import signal
+import sys
+import time
+from typing import Any
+
+import aiohttp
+
+from muscpy.config import (
+    CLUSTER_RESTART_DELAY,
+    CLUSTER_RESTART_DELAY_MAX,
+    CLUSTER_STABLE_SECONDS,
+)
+from muscpy.load_env import get_env
+
+SHARD_COUNT_ENV = "MUSCPY_SHARD_COUNT"
+SHARD_IDS_ENV = "MUSCPY_SHARD_IDS"
+CLUSTERS_ENV = "MUSCPY_CLUSTERS"
+CLUSTER_ID_ENV = "MUSCPY_CLUSTER_ID"
+METRICS_PORT_ENV = "MUSCPY_METRICS_PORT"
+
+_GATEWAY_BOT_URL = "https://discord.com/api/v10/gateway/bot"
+
+
+def shard_options() -> dict[str, Any]:
+    """
+    ``AutoShardedBot`` keyword arguments of this process, empty when no shard
+    layout is configured and the bot runs unsharded.
+    """
+    options: dict[str, Any] = {}
+    shard_count = get_env(SHARD_COUNT_ENV, ".env")
+    shard_ids = get_env(SHARD_IDS_ENV, ".env")
+    if shard_count:
+        options["shard_count"] = int(shard_count)
+    if shard_ids:
+        if "shard_count" not in options:
+            raise ValueError(f"{SHARD_IDS_ENV} needs {SHARD_COUNT_ENV} to be set")
+        options["shard_ids"] = [int(shard_id) for shard_id in shard_ids.split(",")]
+    return options
+
+
+def is_primary_cluster() -> bool:
+    """
+    Whether this process does the work every cluster would otherwise repeat,
+    like syncing the command tree: cluster 0, or the only process.
+    """
+    return (get_env(CLUSTER_ID_ENV, ".env") or "0") == "0"
+
+
+def audio_cache_share(directory: str, byte_budget: int) -> tuple[str, int]:
+    """
+    Audio cache directory and byte budget of this process. Clusters get their
+    own subdirectory and an equal share of the budget, so together they stay
+    within it and never evict a file another cluster lists as cached.
+    """
+    cluster_id = get_env(CLUSTER_ID_ENV, ".env")
+    if not cluster_id:
+        return directory, byte_budget
+    clusters = int(get_env(CLUSTERS_ENV, ".env") or 1)
+    return os.path.join(directory, f"cluster-{cluster_id}"), byte_budget // clusters
+
+
+def split_shards(shard_count: int, clusters: int) -> list[list[int]]:
+    """
+    Contiguous, near equal shard ranges, one per cluster.
+    """
+    clusters = max(1, min(clusters, shard_count))
+    per_cluster, extra = divmod(shard_count, clusters)
+    ranges: list[list[int]] = []
+    start = 0
+    for cluster_id in range(clusters):
+        stop = start + per_cluster + (1 if cluster_id < extra else 0)
+        ranges.append(list(range(start, stop)))
+        start = stop
+    return ranges
+
+
+async def recommended_shard_count(token: str) -> int:
+    async with (
+        aiohttp.ClientSession() as session,
+        session.get(
+            _GATEWAY_BOT_URL, headers={"Authorization": f"Bot {token}"}
+        ) as response,
+    ):
+        response.raise_for_status()
+        data = await response.json()
+    return int(data["shards"])
+
+
+class ClusterSupervisor:
+    """
+    Keeps one child process per shard range alive.
+
+    A cluster exiting with a non zero code is restarted after a delay that
+    doubles on every crash in a row (capped at ``CLUSTER_RESTART_DELAY_MAX``)
+    and resets once the cluster stayed up for ``CLUSTER_STABLE_SECONDS``.
+    A clean exit is not restarted.
+    """
+
+    def __init__(
+        self,
+        shard_count: int,
+        shard_ranges: list[list[int]],
+        command: list[str] | None = None,
+    ):
+        self.shard_count = shard_count
+        self.shard_ranges = shard_ranges
+        self.command = command or [sys.executable, "-m", "muscpy"]
+        self._processes: dict[int, asyncio.subprocess.Process] = {}
+        self._stopping = asyncio.Event()
+        self.restarts = 0
+
+    def _cluster_env(self, cluster_id: int) -> dict[str, str]:
+        env = {
+            **os.environ,
+            SHARD_COUNT_ENV: str(self.shard_count),
+            SHARD_IDS_ENV: ",".join(map(str, self.shard_ranges[cluster_id])),
+            CLUSTER_ID_ENV: str(cluster_id),
+            CLUSTERS_ENV: str(len(self.shard_ranges)),
+        }
+        if metrics_port := get_env(METRICS_PORT_ENV, ".env"):
+            env[METRICS_PORT_ENV] = str(int(metrics_port) + cluster_id)
+        return env
+
+    async def _keep_alive(self, cluster_id: int) -> None:
+        shard_ids = self.shard_ranges[cluster_id]
+        delay = CLUSTER_RESTART_DELAY
+        while not self._stopping.is_set():
+            started_at = time.monotonic()
+            process = await asyncio.create_subprocess_exec(
+                *self.command, env=self._cluster_env(cluster_id)
+            )
+            self._processes[cluster_id] = process
+            print(
+                f"cluster {cluster_id} (shards {shard_ids}) started, pid {process.pid}"
+            )
+            returncode = await process.wait()
+            del self._processes[cluster_id]
+            if self._stopping.is_set():
+                return
+            if returncode == 0:
+                print(f"cluster {cluster_id} exited cleanly, not restarting")
+                return
+            if time.monotonic() - started_at >= CLUSTER_STABLE_SECONDS:
+                delay = CLUSTER_RESTART_DELAY
+            print(
+                f"cluster {cluster_id} exited with {returncode}, restarting in {delay}s"
+            )
+            self.restarts += 1
+            try:
+                _ = await asyncio.wait_for(self._stopping.wait(), delay)
+            except TimeoutError:
+                pass
+            delay = min(delay * 2, CLUSTER_RESTART_DELAY_MAX)
+
+    def stop(self) -> None:
+        self._stopping.set()
+        for process in self._processes.values():
+            if process.returncode is None:
+                process.terminate()
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except NotImplementedError:
+                # windows, KeyboardInterrupt still reaches asyncio.run
+                pass
+        try:
+            _ = await asyncio.gather(
+                *(
+                    self._keep_alive(cluster_id)
+                    for cluster_id in range(len(self.shard_ranges))
+                )
+            )
+        finally:
+            self.stop()
+            for process in list(self._processes.values()):
+                try:
+                    _ = await asyncio.wait_for(process.wait(), 10)
+                except TimeoutError:
+                    process.kill()
+
+
+async def main():
+    shard_count = get_env(SHARD_COUNT_ENV, ".env")
+    if shard_count:
+        total_shards = int(shard_count)
+    else:
+        total_shards = await recommended_shard_count(get_env("DCBOT_TOKEN", ".env"))
+    clusters = get_env(CLUSTERS_ENV, ".env")
+    shard_ranges = split_shards(
+        total_shards, int(clusters) if clusters else os.cpu_count() or 1
+    )
+    print(f"running {total_shards} shards in {len(shard_ranges)} clusters")
+    await ClusterSupervisor(total_shards, shard_ranges).run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+Command tree sync that is skipped while the local definitions are unchanged.
+
+``on_ready`` runs on every start and reconnect of every cluster, and each
+``CommandTree.sync`` is a rate limited bulk overwrite of the application's
+commands. The hash of the payload last synced and the commands Discord answered
+with are kept per application in ``COMMAND_SYNC_CACHE_PATH``; ``/help`` lists
+those too. Deleting the file forces the next start to sync.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any
+
+from discord import app_commands
+
+from muscpy.config import COMMAND_SYNC_CACHE_PATH
+
+
+def command_tree_hash(tree: app_commands.CommandTree[Any]) -> str:
+    """
+    sha256 of the global commands of ``tree`` as they would be synced.
+    """
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands()),
+        key=lambda command: (command.get("type", 1), command["name"]),
+    )
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class CommandSyncCache:
+    def __init__(self, path: str):
+        self.path = path
+        # (name, description) of the synced top level commands
+        self.commands: list[tuple[str, str]] = []
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save(self, application_id: str, digest: str) -> None:
+        data = self._load()
+        data[application_id] = {"hash": digest, "commands": self.commands}
+        # clusters may sync at the same time, never leave a torn file
+        part_path = f"{self.path}.{os.getpid()}.part"
+        try:
+            with open(part_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(part_path, self.path)
+        except OSError as e:
+            print(f"storing the command tree hash failed: {e}")
+
+    async def sync(
+        self, tree: app_commands.CommandTree[Any], force: bool = False
+    ) -> bool:
+        """
+        Sync ``tree`` globally unless the stored hash of its application matches.
+        ``commands`` is filled either way. Returns whether a sync happened.
+        """
+        application_id = str(tree.client.application_id)
+        digest = command_tree_hash(tree)
+        stored = self._load().get(application_id)
+        if not force and isinstance(stored, dict) and stored.get("hash") == digest:
+            self.commands = [
+                (str(name), str(description))
+                for name, description in stored.get("commands", [])
+            ]
+            return False
+        synced = await tree.sync()
+        self.commands = [(command.name, command.description) for command in synced]
+        self._save(application_id, digest)
+        return True
+
+
+command_sync = CommandSyncCache(COMMAND_SYNC_CACHE_PATH)
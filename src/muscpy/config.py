@@ -1,6 +1,78 @@
 IDLE_TIMEOUT = 10 * 60  # 10 mins = 600 seconds
 # IDLE_TIMEOUT = 30  # seconds
-IDLE_CHECK_TIMEOUT = 10  # seconds
+IDLE_EMPTY_CHANNEL_TIMEOUT = 60  # seconds, leave a voice channel without humans
+
+EXTRACTION_CACHE_SIZE = 512  # entries
+EXTRACTION_CACHE_TTL = 30 * 60  # seconds, for results without a stream url
+STREAM_EXPIRY_MARGIN = 60  # seconds before expire= a stream url is treated as dead
+SEARCH_CACHE_TTL = 6 * 60 * 60  # seconds a search result is reused
+SPECULATIVE_RESOLVE_COUNT = 1  # top search results resolved before a button is clicked
+
+TRACK_STORE_PATH = "muscpy_tracks.sqlite3"
+COMMAND_SYNC_CACHE_PATH = "muscpy_commands.json"  # hash of the last synced command tree
+
+STARTUP_WARM_UP = True  # import yt_dlp in a background thread once logged in
+
+QUEUE_PAGE_SIZE = 10  # queue entries per page of /queue
+
+PREFETCH_COUNT = 2  # queued tracks whose stream url is resolved ahead of time
+
+AUDIO_CACHE_DIR = "audio_cache"
+AUDIO_CACHE_BYTES = 2 * 1024**3  # 2 GiB of played audio kept on disk
+AUDIO_CACHE_MAX_TRACK_SECONDS = 20 * 60  # longer tracks are always streamed
+
+PLAYBACK_OPUS_PASSTHROUGH = True  # send opus packets from ffmpeg instead of PCM
+
+PLAYLIST_HYDRATE_CONCURRENCY = 4  # playlist entries resolved at once
+PLAYLIST_BATCH_SIZE = 10  # playlist tracks appended to the queue at once
+OUTBOUND_TARGET_BURST = 5  # edits / sends one message or channel may make back to back
+OUTBOUND_TARGET_PER_SECOND = 1.0  # sustained edits / sends per message or channel
+OUTBOUND_GLOBAL_PER_SECOND = 45  # all outbound calls, under Discord's global 50/s
+
+PROGRESS_EDIT_INTERVAL = 1.0  # seconds between progress edits of one interaction
+PLAYLIST_WINDOW_SIZE = 50  # playlist entries extracted per window as the queue drains
+PLAYLIST_MAX_TRACKS = 5000  # playlist entries past this are never expanded
+PLAYLIST_SUMMARY_LINES = 20  # titles listed once a playlist is queued
+
+TRACE_BUFFER_SPANS = 2048  # finished spans kept in memory for /manage trace
+TRACE_JSONL_PATH = ""  # spans are also appended here as JSON lines, empty disables
+
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 0  # /metrics in the Prometheus text format, 0 disables metrics
+
+YTDL_POOL_SIZE = 4  # YoutubeDL instances kept per option profile
+EXTRACTION_WORKERS = 4  # threads running extractions
+EXTRACTION_MAX_PER_GUILD = 2  # extractions one guild may run at once
+
+CLUSTER_RESTART_DELAY = 2  # seconds before a crashed cluster is restarted
+CLUSTER_RESTART_DELAY_MAX = 60  # restart delay cap, doubled on every crash in a row
+CLUSTER_STABLE_SECONDS = 5 * 60  # uptime after which the restart delay resets
 
 if IDLE_TIMEOUT <= 0:
     raise ImportError("IDLE_TIMEOUT can't be below or equal to 0")
+if IDLE_EMPTY_CHANNEL_TIMEOUT <= 0:
+    raise ImportError("IDLE_EMPTY_CHANNEL_TIMEOUT can't be below or equal to 0")
+
+if CLUSTER_RESTART_DELAY <= 0 or CLUSTER_RESTART_DELAY_MAX < CLUSTER_RESTART_DELAY:
+    raise ImportError(
+        "CLUSTER_RESTART_DELAY must be above 0 and not above CLUSTER_RESTART_DELAY_MAX"
+    )
+
+if PLAYLIST_WINDOW_SIZE <= 0 or PLAYLIST_MAX_TRACKS < PLAYLIST_WINDOW_SIZE:
+    raise ImportError(
+        "PLAYLIST_WINDOW_SIZE must be above 0 and not above PLAYLIST_MAX_TRACKS"
+    )
+
+if OUTBOUND_TARGET_BURST < 1 or OUTBOUND_TARGET_PER_SECOND <= 0:
+    raise ImportError(
+        "OUTBOUND_TARGET_BURST must be at least 1 and OUTBOUND_TARGET_PER_SECOND above 0"
+    )
+
+if EXTRACTION_WORKERS <= 0:
+    raise ImportError("EXTRACTION_WORKERS can't be below or equal to 0")
+
+if YTDL_POOL_SIZE <= 0:
+    raise ImportError("YTDL_POOL_SIZE can't be below or equal to 0")
+
+if EXTRACTION_CACHE_SIZE <= 0:
+    raise ImportError("EXTRACTION_CACHE_SIZE can't be below or equal to 0")
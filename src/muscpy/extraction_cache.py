@@ -0,0 +1,137 @@
+import time
+from collections import OrderedDict
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+_YOUTUBE_HOSTS = {
+    "youtube.com",
+    "www.youtube.com",
+    "m.youtube.com",
+    "music.youtube.com",
+    "youtube-nocookie.com",
+    "www.youtube-nocookie.com",
+}
+
+_YOUTU_BE_HOSTS = {"youtu.be", "www.youtu.be"}
+
+_VIDEO_PATH_PREFIXES = ("/shorts/", "/embed/", "/live/", "/v/")
+
+
+def normalize_video_key(url: str, keep_playlist: bool = False) -> str:
+    """
+    Reduce a url to the identity of the video (or playlist) it points at.
+
+    youtu.be, music.youtube.com, ``&t=`` and ``&list=`` variants of one video
+    all map to ``youtube:<video_id>``. ``keep_playlist`` keeps the ``list=``
+    part for extractions that expand playlists, where it changes the result.
+    Urls that are not youtube are returned stripped, as is.
+    """
+    stripped = url.strip()
+    parsed = urlparse(stripped)
+    host = (parsed.hostname or "").lower()
+
+    video_id: str | None = None
+    if host in _YOUTU_BE_HOSTS:
+        video_id = parsed.path.lstrip("/").split("/")[0] or None
+    elif host in _YOUTUBE_HOSTS:
+        if parsed.path == "/watch":
+            video_id = parse_qs(parsed.query).get("v", [None])[0]
+        elif parsed.path.startswith(_VIDEO_PATH_PREFIXES):
+            video_id = parsed.path.split("/")[2] or None
+    else:
+        return stripped
+
+    playlist_id = parse_qs(parsed.query).get("list", [None])[0]
+    if playlist_id and (keep_playlist or video_id is None):
+        if video_id:
+            return f"youtube:playlist:{playlist_id}:{video_id}"
+        return f"youtube:playlist:{playlist_id}"
+    if video_id:
+        return f"youtube:{video_id}"
+    return stripped
+
+
+def normalize_search_query(query: str) -> str:
+    """
+    Case and whitespace insensitive form of a search query.
+    """
+    return " ".join(query.casefold().split())
+
+
+def stream_url_expiry(url: str | None) -> float | None:
+    """
+    Unix timestamp from the ``expire=`` parameter of a googlevideo stream url.
+    """
+    if not url:
+        return None
+    parsed = urlparse(url)
+    expire = parse_qs(parsed.query).get("expire", [None])[0]
+    if expire is None:
+        # some stream urls carry their parameters in the path (/expire/<ts>/)
+        parts = parsed.path.split("/")
+        if "expire" in parts and parts.index("expire") + 1 < len(parts):
+            expire = parts[parts.index("expire") + 1]
+    try:
+        return float(expire) if expire is not None else None
+    except ValueError:
+        return None
+
+
+class ExtractionCache:
+    """
+    Size bounded LRU cache of ``extract_info`` results with a per entry TTL.
+
+    Entries holding a stream url live until shortly before that url expires,
+    everything else lives for ``default_ttl`` seconds.
+    Only used from the event loop, so no locking is done.
+    """
+
+    def __init__(self, max_entries: int, default_ttl: float, expiry_margin: float):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.expiry_margin = expiry_margin
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl_for(self, data: Any) -> float:
+        expiry = None
+        if isinstance(data, dict):
+            expiry = stream_url_expiry(data.get("url"))  # pyright: ignore[reportUnknownMemberType,reportUnknownArgumentType]
+        if expiry is None:
+            return self.default_ttl
+        return max(0.0, expiry - time.time() - self.expiry_margin)
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        deadline, data = entry
+        if deadline <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def set(self, key: str, data: Any, ttl: float | None = None) -> None:
+        if ttl is None:
+            ttl = self.ttl_for(data)
+        if ttl <= 0:
+            _ = self._entries.pop(key, None)
+            return
+        self._entries[key] = (time.monotonic() + ttl, data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            _ = self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        _ = self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
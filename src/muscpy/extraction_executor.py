@@ -0,0 +1,220 @@
+import asyncio
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any
+
+from muscpy.metrics import metrics
+
+queue_wait_seconds = metrics.histogram(
+    "muscpy_extraction_queue_wait_seconds",
+    "extractions waiting for a worker thread, by priority",
+)
+
+
+class ExtractionPriority(IntEnum):
+    INTERACTIVE = 0  # single url or search from a command
+    REFRESH = 1  # stream url of the track about to play
+    BACKGROUND = 2  # playlist expansion
+
+
+@dataclass(eq=False)
+class _Job:
+    fn: Callable[..., Any]
+    args: tuple[Any, ...]
+    future: asyncio.Future[Any]
+    loop: asyncio.AbstractEventLoop
+    guild_id: str
+    priority: ExtractionPriority
+    key: str | None = None
+    submitted_at: float = field(default_factory=time.perf_counter)
+
+
+@dataclass
+class PriorityStats:
+    count: int = 0
+    wait_total: float = 0.0
+    exec_total: float = 0.0
+    wait_max: float = 0.0
+    exec_max: float = 0.0
+
+    def record(self, wait: float, exec: float) -> None:
+        self.count += 1
+        self.wait_total += wait
+        self.exec_total += exec
+        self.wait_max = max(self.wait_max, wait)
+        self.exec_max = max(self.exec_max, exec)
+
+
+class ExtractionScheduler:
+    """
+    Dedicated worker threads for blocking extraction, replacing the default loop executor.
+
+    Jobs are picked strictly by ``ExtractionPriority``; inside one priority the
+    guilds with pending jobs are served round robin and a guild never runs more
+    than ``max_per_guild`` jobs at once, so a big playlist can't take every worker.
+    A job submitted with a ``key`` can be moved to a higher priority while queued.
+    """
+
+    def __init__(self, workers: int, max_per_guild: int):
+        self.workers = workers
+        self.max_per_guild = max(1, min(max_per_guild, workers))
+        self._pending: dict[ExtractionPriority, OrderedDict[str, deque[_Job]]] = {
+            priority: OrderedDict() for priority in ExtractionPriority
+        }
+        self._running: Counter[str] = Counter()
+        self._queued: dict[str, _Job] = {}
+        self._cond = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._shutdown = False
+        self.stats: dict[ExtractionPriority, PriorityStats] = {
+            priority: PriorityStats() for priority in ExtractionPriority
+        }
+
+    def _start(self) -> None:
+        for indx in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f"muscpy-extract-{indx}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        priority: ExtractionPriority = ExtractionPriority.INTERACTIVE,
+        guild_id: str | None = None,
+        key: str | None = None,
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        job = _Job(
+            fn=fn,
+            args=args,
+            future=loop.create_future(),
+            loop=loop,
+            guild_id=guild_id or "",
+            priority=priority,
+            key=key,
+        )
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("extraction scheduler is shut down")
+            if not self._threads:
+                self._start()
+            guilds = self._pending[priority]
+            if job.guild_id not in guilds:
+                guilds[job.guild_id] = deque()
+            guilds[job.guild_id].append(job)
+            if key is not None:
+                self._queued[key] = job
+            self._cond.notify()
+        return await job.future
+
+    def promote(self, key: str, priority: ExtractionPriority) -> bool:
+        """
+        Move the queued job submitted with ``key`` up to ``priority``, e.g. when
+        a command joins a prefetch of the same url. False if no such job waits.
+        """
+        with self._cond:
+            job = self._queued.get(key)
+            if job is None or job.priority <= priority:
+                return False
+            old = self._pending[job.priority]
+            old[job.guild_id].remove(job)
+            if not old[job.guild_id]:
+                del old[job.guild_id]
+            job.priority = priority
+            guilds = self._pending[priority]
+            if job.guild_id not in guilds:
+                guilds[job.guild_id] = deque()
+            guilds[job.guild_id].append(job)
+            return True
+
+    def _next_job(self) -> _Job | None:
+        for guilds in self._pending.values():
+            for guild_id, jobs in guilds.items():
+                if self._running[guild_id] >= self.max_per_guild:
+                    continue
+                job = jobs.popleft()
+                if job.key is not None and self._queued.get(job.key) is job:
+                    del self._queued[job.key]
+                if jobs:
+                    guilds.move_to_end(guild_id)
+                else:
+                    del guilds[guild_id]
+                return job
+        return None
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None and not self._shutdown:
+                    _ = self._cond.wait()
+                    job = self._next_job()
+                if job is None:
+                    return
+                self._running[job.guild_id] += 1
+            try:
+                if job.future.cancelled():
+                    continue
+                started = time.perf_counter()
+                try:
+                    result = job.fn(*job.args)
+                except BaseException as e:  # noqa: BLE001 re-raised by the awaiting future
+                    job.loop.call_soon_threadsafe(_set_exception, job.future, e)
+                else:
+                    job.loop.call_soon_threadsafe(_set_result, job.future, result)
+                finished = time.perf_counter()
+                queue_wait_seconds.observe(
+                    started - job.submitted_at, priority=job.priority.name.lower()
+                )
+                with self._cond:
+                    self.stats[job.priority].record(
+                        started - job.submitted_at, finished - started
+                    )
+            finally:
+                with self._cond:
+                    self._running[job.guild_id] -= 1
+                    if self._running[job.guild_id] <= 0:
+                        del self._running[job.guild_id]
+                    self._cond.notify_all()
+
+    def report(self) -> str:
+        lines: list[str] = []
+        with self._cond:
+            for priority, stats in self.stats.items():
+                queued = sum(len(jobs) for jobs in self._pending[priority].values())
+                if stats.count == 0:
+                    lines.append(f"{priority.name}: no jobs, {queued} queued")
+                    continue
+                lines.append(
+                    f"{priority.name}: {stats.count} jobs, {queued} queued, "
+                    f"wait avg {stats.wait_total / stats.count * 1000:.1f}ms "
+                    f"max {stats.wait_max * 1000:.1f}ms, "
+                    f"exec avg {stats.exec_total / stats.count * 1000:.1f}ms "
+                    f"max {stats.exec_max * 1000:.1f}ms"
+                )
+        return "\n".join(lines)
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+
+
+def _set_result(future: asyncio.Future[Any], result: Any) -> None:
+    if not future.done():
+        future.set_result(result)
+
+
+def _set_exception(future: asyncio.Future[Any], exc: BaseException) -> None:
+    if not future.done():
+        future.set_exception(exc)
@@ -1,22 +1,72 @@
 import asyncio
+import heapq
+import time
 from dataclasses import dataclass
 import discord
+from muscpy.metrics import metrics
+from muscpy.outbound import outbound
 from muscpy.utils import SharedDict
-from muscpy.config import IDLE_CHECK_TIMEOUT, IDLE_TIMEOUT
+from muscpy.config import IDLE_EMPTY_CHANNEL_TIMEOUT, IDLE_TIMEOUT
 from muscpy.yt_dlp_streamer import YTDLHandler
 
+idle_disconnects = metrics.counter(
+    "muscpy_idle_disconnects_total", "voice channels left by the idle checker"
+)
+
 
 @dataclass
 class GuildTimerData:
-    timeout: float
     voice_client: discord.VoiceClient | discord.VoiceProtocol | None
     text_channel: discord.TextChannel
     music_handler: YTDLHandler | None
+    deadline: float | None = None  # time.monotonic(), None while not idle
+    playing: bool = False
+    alone: bool = False
 
 
 class IdleChecker:
+    """
+    Disconnects guilds whose voice client stayed idle past their deadline.
+
+    Deadlines live in a min-heap and are only touched by events: joining,
+    playback starting or stopping and members entering or leaving the channel.
+    Replaced deadlines stay in the heap and are skipped when popped, so the loop
+    only wakes for the earliest deadline or when an earlier one is armed.
+    """
+
     def __init__(self):
         self._timers: SharedDict[str, GuildTimerData] = SharedDict()
+        self._deadlines: list[tuple[float, str]] = []
+        self._wakeup = asyncio.Event()
+        self._expiring: set[asyncio.Task[None]] = set()
+        _ = metrics.gauge(
+            "muscpy_voice_sessions",
+            "guilds with a voice client, by playback state",
+            collect=self._sessions,
+        )
+        _ = metrics.gauge(
+            "muscpy_queue_depth",
+            "queued entries per guild, a playlist cursor counts once",
+            collect=self._queue_depths,
+        )
+
+    def _sessions(self) -> list[tuple[dict[str, str], float]]:
+        states = {"playing": 0, "idle": 0, "alone": 0}
+        for _, guild_data in self._timers.snapshot():
+            if guild_data.alone:
+                states["alone"] += 1
+            elif guild_data.playing:
+                states["playing"] += 1
+            else:
+                states["idle"] += 1
+        return [({"state": state}, count) for state, count in states.items()]
+
+    def _queue_depths(self) -> list[tuple[dict[str, str], float]]:
+        return [
+            ({"guild": guild_id}, len(guild_data.music_handler.queue))
+            for guild_id, guild_data in self._timers.snapshot()
+            if guild_data.music_handler is not None
+        ]
 
     async def init_idle_state_for_client(
         self,
@@ -30,56 +80,123 @@ class IdleChecker:
         When the timer expires, the bot will be disconnected from the voice channel.
         """
         print("IdleChecker init_idle_state_for_client")
-        prev_data = await self._timers.get(guild_id)
-        if prev_data:
-            prev_data.timeout = IDLE_TIMEOUT
-            prev_data.voice_client = voice_client
-        else:
-            await self._timers.set(
-                guild_id,
-                GuildTimerData(
-                    timeout=IDLE_TIMEOUT,
+        async with self._timers.lock(guild_id):
+            guild_data = await self._timers.get(guild_id)
+            if guild_data:
+                guild_data.voice_client = voice_client
+                if music_handler is not None:
+                    guild_data.music_handler = music_handler
+            else:
+                guild_data = GuildTimerData(
                     voice_client=voice_client,
                     music_handler=music_handler,
                     text_channel=text_channel,
-                ),
-            )
+                )
+                await self._timers.set(guild_id, guild_data)
+            guild_data.playing = bool(voice_client.is_playing())  # pyright: ignore[reportAttributeAccessIssue,reportUnknownMemberType]
+            guild_data.alone = False
+            self._rearm(guild_id, guild_data)
 
     async def deinit_idlestate_of_client(self, guild_id: str):
-        await self._timers.delete(guild_id)
+        async with self._timers.lock(guild_id):
+            await self._timers.delete(guild_id)
+
+    def playback_changed(self, guild_id: str, playing: bool) -> None:
+        """
+        Called by the music handler when a track starts, ends or is paused.
+        """
+        guild_data = self._timers.peek(guild_id)
+        if guild_data is None or guild_data.playing == playing:
+            return
+        guild_data.playing = playing
+        self._rearm(guild_id, guild_data)
+
+    def listeners_changed(self, guild_id: str, humans: int) -> None:
+        """
+        Called on voice state updates with the humans left in the bot's channel.
+        """
+        guild_data = self._timers.peek(guild_id)
+        if guild_data is None or guild_data.alone == (humans == 0):
+            return
+        guild_data.alone = humans == 0
+        self._rearm(guild_id, guild_data)
+
+    def _rearm(self, guild_id: str, guild_data: GuildTimerData) -> None:
+        if guild_data.alone:
+            # nobody is listening, leave soon even while playing
+            self._arm(guild_id, guild_data, IDLE_EMPTY_CHANNEL_TIMEOUT)
+        elif guild_data.playing:
+            guild_data.deadline = None
+        else:
+            self._arm(guild_id, guild_data, IDLE_TIMEOUT)
+
+    def _arm(self, guild_id: str, guild_data: GuildTimerData, timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        guild_data.deadline = deadline
+        heapq.heappush(self._deadlines, (deadline, guild_id))
+        if self._deadlines[0] == (deadline, guild_id):
+            self._wakeup.set()
+
+    def _is_due(self, deadline: float, guild_id: str) -> bool:
+        guild_data = self._timers.peek(guild_id)
+        return guild_data is not None and guild_data.deadline == deadline
+
+    def _next_delay(self) -> float | None:
+        """
+        Seconds until the earliest live deadline, dropping replaced ones.
+        """
+        while self._deadlines:
+            deadline, guild_id = self._deadlines[0]
+            if self._is_due(deadline, guild_id):
+                return deadline - time.monotonic()
+            _ = heapq.heappop(self._deadlines)
+        return None
 
     async def _idle_loop(self):
         """
-        Continuously check for expired idle timers.
+        Sleep until the earliest deadline, or until an earlier one is armed.
         """
         while True:
-            expired_guids: list[str] = []
-            async for guild_id, guild_data in self._timers.items():
-                if guild_data.voice_client is None:
-                    expired_guids.append(guild_id)
+            self._wakeup.clear()
+            delay = self._next_delay()
+            if delay is None or delay > 0:
+                try:
+                    _ = await asyncio.wait_for(self._wakeup.wait(), delay)
+                except TimeoutError:
+                    pass
+                continue
+            _, guild_id = heapq.heappop(self._deadlines)
+            # a slow disconnect must not hold back the next deadline
+            task = asyncio.create_task(self._expire(guild_id))
+            self._expiring.add(task)
+            task.add_done_callback(self._expiring.discard)
+
+    async def _expire(self, guild_id: str):
+        async with self._timers.lock(guild_id):
+            guild_data = await self._timers.get(guild_id)
+            if (
+                guild_data is None
+                or guild_data.deadline is None
+                or guild_data.deadline > time.monotonic()
+            ):
+                # re-armed or disarmed while waiting for the lock
+                return
+            if guild_data.voice_client is not None:
+                # Disconnect from the voice channel
+                if guild_data.music_handler:
+                    await guild_data.music_handler.disconnect()
                 else:
-                    if guild_data.voice_client.is_playing():  # pyright: ignore[reportAttributeAccessIssue,reportUnknownMemberType]
-                        guild_data.timeout = IDLE_TIMEOUT
-                    if guild_data.timeout <= 0:
-                        # Disconnect from the voice channel
-                        # await guild_data.voice_client.disconnect()
-                        if guild_data.music_handler:
-                            await guild_data.music_handler.disconnect()
-                        else:
-                            await guild_data.voice_client.disconnect()
-                            guild_data.voice_client.cleanup()
-                        expired_guids.append(guild_id)
-                    else:
-                        guild_data.timeout -= IDLE_CHECK_TIMEOUT
-            for guild_id in expired_guids:
-                guild_data = await self._timers.get(guild_id)
-                if guild_data:
-                    _ = await guild_data.text_channel.send(
-                        content=f"disconnected because of idling for {IDLE_TIMEOUT / 60} mins",
-                        delete_after=10,
-                    )
-                await self._timers.delete(str(guild_id))
-            await asyncio.sleep(IDLE_CHECK_TIMEOUT)
+                    await guild_data.voice_client.disconnect()
+                    guild_data.voice_client.cleanup()
+            idle_disconnects.inc(reason="alone" if guild_data.alone else "idle")
+            if guild_data.alone:
+                content = "disconnected because everyone left the voice channel"
+            else:
+                content = f"disconnected because of idling for {IDLE_TIMEOUT / 60} mins"
+            _ = await outbound.send(
+                guild_data.text_channel, content=content, delete_after=10
+            )
+            await self._timers.delete(guild_id)
 
     async def run_idle_loop(self):
         print("IdleChecker loop started")
@@ -0,0 +1,262 @@
+"""
+Process local metrics, exposed in the Prometheus text format.
+
+Metrics are declared at import time next to the code they measure and record
+nothing until ``metrics.serve`` turns the registry on, so a bot running
+without ``METRICS_PORT`` pays one attribute check per observation.
+
+    curl http://127.0.0.1:9464/metrics
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+
+from aiohttp import web
+
+Labels = tuple[tuple[str, str], ...]
+
+# seconds, from a cached lookup to a slow playlist page
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels: Labels, extra: tuple[str, str] | None = None) -> str:
+    pairs = [*labels, extra] if extra is not None else list(labels)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help: str):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        # observations may come from extraction workers and the player thread
+        self._lock = threading.Lock()
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self.samples()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help: str):
+        super().__init__(registry, name, help)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        if not self.registry.enabled:
+            return
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """
+    Either ``set`` by the code it describes or, with ``collect``, read at scrape
+    time from state that already exists (queue lengths, cache counters).
+    ``collect`` yields ``(labels, value)`` pairs.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        registry: "MetricsRegistry",
+        name: str,
+        help: str,
+        collect: Callable[[], Iterable[tuple[dict[str, str], float]]] | None = None,
+    ):
+        super().__init__(registry, name, help)
+        self.collect = collect
+        self._values: dict[Labels, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[_labels(labels)] = value
+
+    def samples(self) -> Iterator[str]:
+        if self.collect is not None:
+            values = [(_labels(labels), value) for labels, value in self.collect()]
+        else:
+            with self._lock:
+                values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * (buckets + 1)  # the last one is +Inf
+        self.sum = 0.0
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        registry: "MetricsRegistry",
+        name: str,
+        help: str,
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(registry, name, help)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[Labels, _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        if not self.registry.enabled:
+            return
+        key = _labels(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets))
+            series.counts[bisect_left(self.buckets, value)] += 1
+            series.sum += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """
+        Observe the seconds spent in the ``with`` block.
+        """
+        if not self.registry.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            series = [
+                (labels, list(data.counts), data.sum)
+                for labels, data in self._series.items()
+            ]
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = ("le", _format_value(bound))
+                yield f"{self.name}_bucket{_format_labels(labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(labels)} {cumulative}"
+
+
+class MetricsRegistry:
+    """
+    Every metric of the process and the http endpoint serving them.
+
+    Declaring a name again returns the existing metric (a ``collect`` passed
+    again replaces the old one), so modules and instances may declare freely.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._metrics: dict[str, _Metric] = {}
+        self._runner: web.AppRunner | None = None
+
+    def _declare[M: _Metric](self, kind: type[M], name: str, metric: M) -> M:
+        existing = self._metrics.get(name)
+        if existing is None:
+            self._metrics[name] = metric
+            return metric
+        if not isinstance(existing, kind):
+            raise TypeError(f"{name} is already a {existing.kind}")
+        return existing
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._declare(Counter, name, Counter(self, name, help))
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        collect: Callable[[], Iterable[tuple[dict[str, str], float]]] | None = None,
+    ) -> Gauge:
+        gauge = self._declare(Gauge, name, Gauge(self, name, help, collect))
+        if collect is not None:
+            gauge.collect = collect
+        return gauge
+
+    def histogram(
+        self, name: str, help: str, buckets: Iterable[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._declare(Histogram, name, Histogram(self, name, help, buckets))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception as e:  # noqa: BLE001
+                # a broken collector must not take the other metrics down
+                print(f"metrics: rendering {metric.name} failed: {e}")
+        return "\n".join(lines) + "\n"
+
+    async def _handle(self, _: web.Request) -> web.Response:
+        return web.Response(
+            body=self.render().encode(), headers={"Content-Type": _CONTENT_TYPE}
+        )
+
+    async def serve(self, host: str, port: int) -> None:
+        """
+        Start recording and serve ``/metrics`` on ``host:port``.
+        """
+        self.enabled = True
+        app = web.Application()
+        _ = app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        print(f"metrics served on http://{host}:{port}/metrics")
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        self.enabled = False
+
+
+metrics = MetricsRegistry()
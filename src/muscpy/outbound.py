@@ -0,0 +1,247 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import discord
+
+from muscpy.config import (
+    OUTBOUND_GLOBAL_PER_SECOND,
+    OUTBOUND_TARGET_BURST,
+    OUTBOUND_TARGET_PER_SECOND,
+)
+
+
+class TokenBucket:
+    """
+    ``capacity`` requests back to back, refilled at ``rate`` per second.
+    """
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def delay(self) -> float:
+        """
+        Seconds until a request may go out, 0 if one may go now.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        wait = max(0.0, self._blocked_until - now)
+        if self._tokens < 1:
+            wait = max(wait, (1 - self._tokens) / self.rate)
+        return wait
+
+    def take(self) -> None:
+        self._tokens -= 1
+
+    def block(self, seconds: float) -> None:
+        """
+        Discord answered 429, nothing goes out for ``seconds``.
+        """
+        self._tokens = 0
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    @property
+    def idle(self) -> bool:
+        return self.delay() == 0 and self._tokens >= self.capacity
+
+
+@dataclass(slots=True)
+class _Op:
+    call: Callable[..., Awaitable[Any]]
+    kwargs: dict[str, Any]
+    coalesce: bool
+    waiters: list[asyncio.Future[Any]] = field(default_factory=list)
+    skip: Callable[[], bool] | None = None
+
+
+@dataclass(slots=True)
+class _Target:
+    bucket: TokenBucket
+    ops: deque[_Op] = field(default_factory=deque)
+    worker: asyncio.Task[None] | None = None
+
+
+class OutboundScheduler:
+    """
+    Single way out for message edits and channel sends.
+
+    Every target (an interaction's original response, a text channel) has its
+    own FIFO queue drained by one worker, and its own token bucket sized to
+    Discord's per route limits; a global bucket keeps the sum under the global
+    limit. An edit queued behind a not yet sent edit of the same response
+    replaces it: only the latest content goes out and every caller is answered
+    with its result. A 429 that still reaches us blocks the target's bucket
+    for the advertised time instead of retrying right away.
+    """
+
+    def __init__(
+        self,
+        target_burst: float = OUTBOUND_TARGET_BURST,
+        target_rate: float = OUTBOUND_TARGET_PER_SECOND,
+        global_rate: float = OUTBOUND_GLOBAL_PER_SECOND,
+        max_idle_targets: int = 256,
+    ):
+        self.target_burst = target_burst
+        self.target_rate = target_rate
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.max_idle_targets = max_idle_targets
+        self._targets: OrderedDict[tuple[str, int], _Target] = OrderedDict()
+        self.sent = 0
+        self.superseded = 0
+        self.rate_limited = 0
+
+    async def edit(
+        self, interaction: discord.Interaction, **kwargs: Any
+    ) -> discord.InteractionMessage | None:
+        """
+        ``interaction.edit_original_response(**kwargs)``, coalesced with pending edits.
+        Resolves to ``None`` if the interaction expired before it could be sent.
+        """
+        return await self._submit(
+            ("interaction", interaction.id),
+            _Op(
+                interaction.edit_original_response,
+                kwargs,
+                coalesce=True,
+                skip=interaction.is_expired,
+            ),
+        )
+
+    async def send(
+        self, channel: discord.abc.Messageable, **kwargs: Any
+    ) -> discord.Message:
+        """
+        ``channel.send(**kwargs)``, every send goes out in order.
+        """
+        return await self._submit(
+            ("channel", getattr(channel, "id", id(channel))),
+            _Op(channel.send, kwargs, coalesce=False),
+        )
+
+    def edit_threadsafe(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        interaction: discord.Interaction,
+        **kwargs: Any,
+    ) -> None:
+        """
+        ``edit`` from a thread (e.g. a voice client's ``after`` callback), fire and forget.
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self.edit(interaction, **kwargs), loop
+        )
+        future.add_done_callback(_log_failure)
+
+    def _target(self, key: tuple[str, int]) -> _Target:
+        target = self._targets.get(key)
+        if target is None:
+            self._prune()
+            target = self._targets[key] = _Target(
+                TokenBucket(self.target_burst, self.target_rate)
+            )
+        else:
+            self._targets.move_to_end(key)
+        return target
+
+    def _prune(self) -> None:
+        # forget the oldest targets once their bucket has refilled
+        while len(self._targets) >= self.max_idle_targets:
+            key, target = next(iter(self._targets.items()))
+            if target.ops or not target.bucket.idle:
+                break
+            del self._targets[key]
+
+    async def _submit(self, key: tuple[str, int], op: _Op) -> Any:
+        waiter: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        target = self._target(key)
+        pending = target.ops[-1] if target.ops else None
+        if op.coalesce and pending is not None and pending.coalesce:
+            # the queued edit was never sent, send only the newest content
+            pending.kwargs = {**pending.kwargs, **op.kwargs}
+            pending.waiters.append(waiter)
+            self.superseded += 1
+        else:
+            op.waiters.append(waiter)
+            target.ops.append(op)
+        if target.worker is None or target.worker.done():
+            target.worker = asyncio.create_task(self._drain(target))
+        return await waiter
+
+    async def _drain(self, target: _Target) -> None:
+        while target.ops:
+            while (delay := max(target.bucket.delay(), self.global_bucket.delay())) > 0:
+                await asyncio.sleep(delay)
+            op = target.ops.popleft()
+            if op.skip is not None and op.skip():
+                _resolve(op.waiters, result=None)
+                continue
+            target.bucket.take()
+            self.global_bucket.take()
+            try:
+                result = await op.call(**op.kwargs)
+            except discord.RateLimited as e:
+                self._rate_limited(target, op, e.retry_after)
+                continue
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    self._rate_limited(target, op, _retry_after(e))
+                    continue
+                _resolve(op.waiters, error=e)
+            except Exception as e:  # noqa: BLE001 re-raised to every waiter
+                _resolve(op.waiters, error=e)
+            else:
+                self.sent += 1
+                _resolve(op.waiters, result=result)
+
+    def _rate_limited(self, target: _Target, op: _Op, retry_after: float) -> None:
+        self.rate_limited += 1
+        target.bucket.block(retry_after)
+        target.ops.appendleft(op)
+
+    def report(self) -> str:
+        return (
+            f"outbound: {self.sent} sent, {self.superseded} edits superseded, "
+            f"{self.rate_limited} rate limited, {len(self._targets)} targets"
+        )
+
+
+def _retry_after(error: discord.HTTPException) -> float:
+    try:
+        return float(error.response.headers.get("Retry-After", 1))
+    except (AttributeError, TypeError, ValueError):
+        return 1.0
+
+
+def _resolve(
+    waiters: list[asyncio.Future[Any]],
+    result: Any = None,
+    error: BaseException | None = None,
+) -> None:
+    for waiter in waiters:
+        if waiter.done():
+            continue
+        if error is not None:
+            waiter.set_exception(error)
+        else:
+            waiter.set_result(result)
+
+
+def _log_failure(future: Any) -> None:
+    if not future.cancelled() and (error := future.exception()) is not None:
+        print(f"outbound edit failed: {error}")
+
+
+outbound = OutboundScheduler()
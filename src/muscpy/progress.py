@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+import discord
+
+from muscpy.config import PROGRESS_EDIT_INTERVAL
+from muscpy.outbound import outbound
+
+
+class ProgressReporter:
+    """
+    Debounced progress edits of one interaction's response.
+
+    ``update`` only records the latest content; it is sent at most once per
+    ``interval`` seconds, intermediate states are dropped. ``close`` sends the
+    final content right away.
+    """
+
+    def __init__(
+        self, interaction: discord.Interaction, interval: float = PROGRESS_EDIT_INTERVAL
+    ):
+        self.interaction = interaction
+        self.interval = interval
+        self._latest: str | None = None
+        self._last_sent = float("-inf")
+        self._flush_task: asyncio.Task[None] | None = None
+        self.edits = 0
+
+    def update(self, content: str) -> None:
+        self._latest = content
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        delay = self._last_sent + self.interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # close() cancels the wait, never an edit already on its way
+        await asyncio.shield(self._send())
+
+    async def _send(self) -> None:
+        content, self._latest = self._latest, None
+        if content is None or self.interaction.is_expired():
+            return
+        self._last_sent = time.monotonic()
+        self.edits += 1
+        try:
+            _ = await outbound.edit(self.interaction, content=content)
+        except discord.HTTPException as e:
+            print(f"progress update failed: {e}")
+
+    async def close(self, content: str | None = None) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            _ = self._flush_task.cancel()
+        if content is not None:
+            self._latest = content
+        await self._send()
@@ -0,0 +1,127 @@
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+import discord
+
+from muscpy.config import QUEUE_PAGE_SIZE
+from muscpy.track_queue import TrackQueue
+
+# embed field values are limited to 1024 characters
+_FIELD_LIMIT = 1024
+
+
+class _Titled(Protocol):
+    @property
+    def title(self) -> str | None: ...
+
+
+@dataclass(slots=True)
+class _RenderedPage:
+    titles: tuple[str | None, ...]
+    text: str
+
+
+class QueuePages:
+    """
+    Rendered pages of a guild queue, cached between ``/queue`` and ``/status`` calls.
+
+    A cached page is reused while the titles at its positions are unchanged, so
+    appending only re-renders the last page, and a title filled in by a fetch
+    re-renders its page without the queue changing. Checking and rendering a
+    page only slice its ``page_size`` entries, whatever the length of the queue.
+    """
+
+    def __init__(
+        self, queue: TrackQueue[Any], page_size: int = QUEUE_PAGE_SIZE
+    ) -> None:
+        self.queue = queue
+        self.page_size = page_size
+        self._pages: dict[int, _RenderedPage] = {}
+        self.renders = 0
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-len(self.queue) // self.page_size))
+
+    def clamp(self, page: int) -> int:
+        return min(max(page, 0), self.page_count - 1)
+
+    def render(self, page: int) -> str:
+        page = self.clamp(page)
+        start = page * self.page_size
+        entries: list[_Titled] = self.queue.slice(start, start + self.page_size)
+        titles = tuple(entry.title for entry in entries)
+        cached = self._pages.get(page)
+        if cached is not None and cached.titles == titles:
+            return cached.text
+        text = self._render(start, titles)
+        self._pages[page] = _RenderedPage(titles, text)
+        if len(self._pages) > 64:
+            # pages far from where people look, rendered again on demand
+            self._pages = {page: self._pages[page]}
+        return text
+
+    def _render(self, start: int, titles: tuple[str | None, ...]) -> str:
+        self.renders += 1
+        if not titles:
+            return "Empty"
+        # the lines and the newlines joining them share the field
+        line_limit = (_FIELD_LIMIT - (self.page_size - 1)) // self.page_size
+        lines: list[str] = []
+        for indx, title in enumerate(titles, start + 1):
+            line = f"{indx}. {title or 'Unknown'}"
+            if len(line) > line_limit:
+                line = line[: line_limit - 1] + "…"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def field_name(self, page: int) -> str:
+        page = self.clamp(page)
+        return f"Queue ({len(self.queue)} tracks, page {page + 1}/{self.page_count})"
+
+
+class QueuePageView(discord.ui.View):
+    """
+    Prev / next buttons paging through ``QueuePages`` by editing the message.
+    """
+
+    def __init__(
+        self, pages: QueuePages, now_playing: str | None, page: int = 0
+    ) -> None:
+        super().__init__(timeout=180)
+        self.pages = pages
+        self.now_playing = now_playing
+        self.page = pages.clamp(page)
+        self._sync_buttons()
+
+    def embed(self) -> discord.Embed:
+        return (
+            discord.Embed(title="Queue", color=discord.Color.blurple())
+            .add_field(name="Currently playing", value=self.now_playing or "Nothing")
+            .add_field(
+                name=self.pages.field_name(self.page),
+                value=self.pages.render(self.page),
+                inline=False,
+            )
+        )
+
+    def _sync_buttons(self) -> None:
+        self.prev_page.disabled = self.page <= 0
+        self.next_page.disabled = self.page >= self.pages.page_count - 1
+
+    async def _show(self, interaction: discord.Interaction, page: int) -> None:
+        self.page = self.pages.clamp(page)
+        self._sync_buttons()
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    @discord.ui.button(label="Prev", style=discord.ButtonStyle.secondary)
+    async def prev_page(
+        self, interaction: discord.Interaction, _: discord.ui.Button["QueuePageView"]
+    ) -> None:
+        await self._show(interaction, self.page - 1)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
+    async def next_page(
+        self, interaction: discord.Interaction, _: discord.ui.Button["QueuePageView"]
+    ) -> None:
+        await self._show(interaction, self.page + 1)
@@ -0,0 +1,48 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one in flight task.
+
+    Every caller awaits the shared task through ``asyncio.shield``, so a caller
+    that is cancelled (for example an expired interaction) only stops waiting,
+    the extraction keeps running for the others.
+    """
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task[Any]] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self.started += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task[Any]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # mark the exception retrieved when every caller gave up
+            _ = task.exception()
+
+    def report(self) -> str:
+        return (
+            f"single-flight: {self.started} extractions started, "
+            f"{self.coalesced} saved by coalescing, {len(self)} in flight"
+        )
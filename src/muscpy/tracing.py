@@ -0,0 +1,242 @@
+"""
+Per request trace spans, e.g. ``/play`` until the first audio packet.
+
+The current span lives in a context variable, so it follows awaits and the
+tasks created under it; every span of one request shares the root's
+``trace_id``, the correlation id. Finished spans go to the tracer's exporters:
+an in-memory ring buffer dumped by ``/manage trace`` and, with
+``TRACE_JSONL_PATH`` set, a JSON lines file.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Coroutine, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import IO, Any, Protocol
+
+from muscpy.config import TRACE_BUFFER_SPANS
+
+
+@dataclass(slots=True, eq=False)
+class Span:
+    tracer: "Tracer" = field(repr=False)
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    name: str
+    attrs: dict[str, Any]
+    started_at: float = field(default_factory=time.time)
+    duration: float | None = None
+    error: str | None = None
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def end(self, error: str | None = None) -> None:
+        """
+        Finish and export the span, later calls do nothing.
+        May be called from any thread (e.g. the voice player's).
+        """
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._started
+        if error is not None:
+            self.error = error
+        self.tracer.export(self)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "error": self.error,
+            "attrs": self.attrs,
+        }
+
+
+class SpanExporter(Protocol):
+    def export(self, span: Span) -> None: ...
+
+
+class RingBufferExporter:
+    """
+    The last ``size`` finished spans, grouped back into traces on demand.
+    """
+
+    def __init__(self, size: int):
+        self._spans: deque[Span] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def traces(self, limit: int, trace_id: str | None = None) -> list[list[Span]]:
+        """
+        Spans of the ``limit`` most recently finished traces, oldest first.
+        """
+        with self._lock:
+            spans = list(self._spans)
+        grouped: dict[str, list[Span]] = {}
+        for span in reversed(spans):
+            if trace_id is not None and span.trace_id != trace_id:
+                continue
+            if span.trace_id not in grouped:
+                if len(grouped) >= limit:
+                    continue
+                grouped[span.trace_id] = []
+            grouped[span.trace_id].append(span)
+        return [
+            sorted(trace, key=lambda span: span.started_at)
+            for trace in reversed(grouped.values())
+        ]
+
+
+class JsonLinesExporter:
+    """
+    Appends every finished span to ``path`` as one JSON object per line.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file: IO[str] | None = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                # kept open across spans, closed in close()
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1)  # noqa: SIM115
+            _ = self._file.write(line)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_current_span: ContextVar[Span | None] = ContextVar("muscpy_span", default=None)
+
+
+class Tracer:
+    def __init__(self):
+        self.exporters: list[SpanExporter] = []
+
+    def current(self) -> Span | None:
+        return _current_span.get()
+
+    def start_span(self, name: str, **attrs: Any) -> Span:
+        """
+        A span under the current one, or the root of a new trace. Not made
+        current; ``end`` it yourself, from any thread.
+        """
+        parent = _current_span.get()
+        return Span(
+            tracer=self,
+            trace_id=parent.trace_id if parent else os.urandom(8).hex(),
+            span_id=os.urandom(4).hex(),
+            parent_id=parent.span_id if parent else None,
+            name=name,
+            attrs=attrs,
+        )
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Span]:
+        """
+        A span current for the ``with`` block, ended with it.
+        """
+        span = self.start_span(name, **attrs)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = repr(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def traced[**P, R](
+        self, name: str
+    ) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Coroutine[Any, Any, R]]]:
+        """
+        Run every call of the decorated coroutine function in a span.
+        """
+
+        def decorate(
+            fn: Callable[P, Awaitable[R]],
+        ) -> Callable[P, Coroutine[Any, Any, R]]:
+            @functools.wraps(fn)
+            async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+                with self.span(name):
+                    return await fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorate
+
+    def annotate(self, **attrs: Any) -> None:
+        """
+        Add attributes to the current span, if there is one.
+        """
+        if (span := _current_span.get()) is not None:
+            span.set(**attrs)
+
+    def export(self, span: Span) -> None:
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:  # noqa: BLE001 keep the other exporters going
+                print(f"exporting span {span.name} failed: {e}")
+
+
+def format_trace(spans: list[Span]) -> str:
+    """
+    One line per span, indented under its parent, offsets from the trace start.
+    """
+    if not spans:
+        return ""
+    start = min(span.started_at for span in spans)
+    children: dict[str | None, list[Span]] = {}
+    known = {span.span_id for span in spans}
+    for span in spans:
+        # parents still running (or evicted) are not in the buffer
+        parent = span.parent_id if span.parent_id in known else None
+        children.setdefault(parent, []).append(span)
+    lines = [f"trace {spans[0].trace_id}"]
+
+    def walk(parent: str | None, depth: int) -> None:
+        for span in children.get(parent, []):
+            duration = (span.duration or 0) * 1000
+            attrs = " ".join(f"{key}={value}" for key, value in span.attrs.items())
+            line = (
+                f"{'  ' * depth}+{(span.started_at - start) * 1000:.0f}ms "
+                f"{span.name} {duration:.1f}ms"
+            )
+            if attrs:
+                line += f" {attrs}"
+            if span.error:
+                line += f" error={span.error}"
+            lines.append(line)
+            walk(span.span_id, depth + 1)
+
+    walk(None, 1)
+    return "\n".join(lines)
+
+
+tracer = Tracer()
+
+trace_buffer = RingBufferExporter(TRACE_BUFFER_SPANS)
+tracer.exporters.append(trace_buffer)
@@ -0,0 +1,266 @@
+import random
+from collections import deque
+from collections.abc import Iterable, Iterator
+from itertools import chain, islice
+from typing import Generic, TypeVar
+
+queue_V = TypeVar("queue_V")
+
+
+class TrackQueue(Generic[queue_V]):
+    """
+    Guild play queue stored as a deque of bounded blocks.
+
+    Push and pop at both ends are O(1); indexed access, insertion and range
+    removal only walk the block list and touch one or two blocks, so they stay
+    cheap for queues of tens of thousands of tracks. Every method is synchronous
+    and runs on the event loop without awaiting, which makes each call (a whole
+    skip, batch insert or shuffle included) atomic for the other coroutines.
+    ``version`` changes on every mutation.
+    """
+
+    BLOCK_SIZE = 256
+
+    def __init__(self, items: Iterable[queue_V] = ()) -> None:
+        self._blocks: deque[deque[queue_V]] = deque()
+        self._len = 0
+        self.version = 0
+        self.extend(items)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __bool__(self) -> bool:
+        return self._len > 0
+
+    def __iter__(self) -> Iterator[queue_V]:
+        # like a deque, raises RuntimeError if mutated while iterating
+        return chain.from_iterable(self._blocks)
+
+    def __getitem__(self, index: int) -> queue_V:
+        block_index, offset = self._locate(index)
+        return self._blocks[block_index][offset]
+
+    def __repr__(self) -> str:
+        return f"TrackQueue(len={self._len})"
+
+    def _normalize(self, index: int) -> int:
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("TrackQueue index out of range")
+        return index
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        """
+        Block index and offset inside that block of queue position ``index``.
+        """
+        index = self._normalize(index)
+        if index >= self._len // 2:
+            # walk from the back for the second half
+            remaining = self._len - index
+            block_index = len(self._blocks)
+            for block in reversed(self._blocks):
+                block_index -= 1
+                if remaining <= len(block):
+                    return block_index, len(block) - remaining
+                remaining -= len(block)
+        for block_index, block in enumerate(self._blocks):
+            if index < len(block):
+                return block_index, index
+            index -= len(block)
+        raise IndexError("TrackQueue index out of range")
+
+    def _chunks(self, items: list[queue_V]) -> list[deque[queue_V]]:
+        return [
+            deque(items[i : i + self.BLOCK_SIZE])
+            for i in range(0, len(items), self.BLOCK_SIZE)
+        ]
+
+    def _replace_block(self, block_index: int, blocks: list[deque[queue_V]]) -> None:
+        self._blocks.rotate(-block_index)
+        _ = self._blocks.popleft()
+        for block in reversed(blocks):
+            if block:
+                self._blocks.appendleft(block)
+        self._blocks.rotate(block_index)
+
+    def _changed(self) -> None:
+        self.version += 1
+
+    def snapshot(self) -> list[queue_V]:
+        return list(self)
+
+    def slice(self, start: int, stop: int) -> list[queue_V]:
+        start = max(0, start)
+        stop = min(self._len, stop)
+        if start >= stop:
+            return []
+        items: list[queue_V] = []
+        skip = start
+        for block in self._blocks:
+            if skip >= len(block):
+                skip -= len(block)
+                continue
+            items.extend(islice(block, skip, skip + stop - start - len(items)))
+            skip = 0
+            if len(items) >= stop - start:
+                break
+        return items
+
+    def head(self, count: int) -> list[queue_V]:
+        return self.slice(0, count)
+
+    def append(self, item: queue_V) -> None:
+        if not self._blocks or len(self._blocks[-1]) >= self.BLOCK_SIZE:
+            self._blocks.append(deque())
+        self._blocks[-1].append(item)
+        self._len += 1
+        self._changed()
+
+    def appendleft(self, item: queue_V) -> None:
+        if not self._blocks or len(self._blocks[0]) >= self.BLOCK_SIZE:
+            self._blocks.appendleft(deque())
+        self._blocks[0].appendleft(item)
+        self._len += 1
+        self._changed()
+
+    def extend(self, items: Iterable[queue_V]) -> None:
+        added = 0
+        for item in items:
+            if not self._blocks or len(self._blocks[-1]) >= self.BLOCK_SIZE:
+                self._blocks.append(deque())
+            self._blocks[-1].append(item)
+            added += 1
+        if added:
+            self._len += added
+            self._changed()
+
+    def insert_many(self, index: int, items: Iterable[queue_V]) -> None:
+        """
+        Insert ``items`` in order before position ``index``.
+        """
+        if index >= self._len:
+            self.extend(items)
+            return
+        index = max(0, index if index >= 0 else index + self._len)
+        new_items = list(items)
+        if not new_items:
+            return
+        if index == 0:
+            for block in reversed(self._chunks(new_items)):
+                self._blocks.appendleft(block)
+        else:
+            block_index, offset = self._locate(index)
+            block = self._blocks[block_index]
+            if len(block) + len(new_items) <= self.BLOCK_SIZE:
+                # small inserts stay inside the block instead of splitting it
+                for item in reversed(new_items):
+                    block.insert(offset, item)
+                self._len += len(new_items)
+                self._changed()
+                return
+            self._replace_block(
+                block_index,
+                [
+                    deque(islice(block, offset)),
+                    *self._chunks(new_items),
+                    deque(islice(block, offset, None)),
+                ],
+            )
+        self._len += len(new_items)
+        self._changed()
+
+    def popleft(self) -> queue_V | None:
+        if not self._blocks:
+            return None
+        first = self._blocks[0]
+        item = first.popleft()
+        if not first:
+            _ = self._blocks.popleft()
+        self._len -= 1
+        self._changed()
+        return item
+
+    def pop(self, index: int = -1) -> queue_V | None:
+        if not self._len:
+            return None
+        if index == 0:
+            return self.popleft()
+        try:
+            block_index, offset = self._locate(index)
+        except IndexError:
+            return None
+        block = self._blocks[block_index]
+        item = block[offset]
+        del block[offset]
+        if not block:
+            del self._blocks[block_index]
+        self._len -= 1
+        self._changed()
+        return item
+
+    def remove(self, item: queue_V) -> None:
+        for block_index, block in enumerate(self._blocks):
+            try:
+                block.remove(item)
+            except ValueError:
+                continue
+            if not block:
+                del self._blocks[block_index]
+            self._len -= 1
+            self._changed()
+            return
+        raise ValueError("item not in TrackQueue")
+
+    def remove_range(self, start: int, stop: int) -> list[queue_V]:
+        """
+        Remove and return the items in ``[start, stop)``.
+        """
+        start = max(0, start)
+        stop = min(self._len, stop)
+        if start >= stop:
+            return []
+        removed: list[queue_V] = []
+        kept: deque[deque[queue_V]] = deque()
+        position = 0
+        for block in self._blocks:
+            block_start, block_stop = position, position + len(block)
+            position = block_stop
+            if block_stop <= start or block_start >= stop:
+                kept.append(block)
+                continue
+            lo = max(start, block_start) - block_start
+            hi = min(stop, block_stop) - block_start
+            if lo == 0 and hi == len(block):
+                removed.extend(block)
+                continue
+            items = list(block)
+            removed.extend(items[lo:hi])
+            kept.append(deque(items[:lo] + items[hi:]))
+        self._blocks = kept
+        self._len -= len(removed)
+        self._changed()
+        return removed
+
+    def skip(self, count: int) -> list[queue_V]:
+        """
+        Remove and return the first ``count`` items.
+        """
+        return self.remove_range(0, count)
+
+    def move(self, src: int, dst: int) -> None:
+        item = self.pop(self._normalize(src))
+        if item is not None:
+            self.insert_many(dst, (item,))
+
+    def shuffle(self) -> None:
+        items = self.snapshot()
+        random.shuffle(items)
+        self._blocks = deque(self._chunks(items))
+        self._changed()
+
+    def clear(self) -> None:
+        self._blocks.clear()
+        self._len = 0
+        self._changed()
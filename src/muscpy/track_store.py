@@ -0,0 +1,217 @@
+import asyncio
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from muscpy.config import STREAM_EXPIRY_MARGIN, TRACK_STORE_PATH
+from muscpy.extraction_cache import normalize_video_key, stream_url_expiry
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    video_id TEXT PRIMARY KEY,
+    canonical_url TEXT NOT NULL,
+    title TEXT,
+    duration INTEGER,
+    thumbnail TEXT,
+    extractor TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tracks_canonical_url ON tracks (canonical_url);
+CREATE TABLE IF NOT EXISTS stream_urls (
+    video_id TEXT PRIMARY KEY,
+    data_url TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    acodec TEXT
+);
+"""
+
+_METADATA_KEYS = ("title", "duration", "thumbnail", "extractor")
+
+_STOP = object()
+
+
+def canonical_url_of(data: dict[str, Any]) -> str | None:
+    for key in ("original_url", "webpage_url", "url"):
+        value = data.get(key)
+        if isinstance(value, str) and value and "Unknown" != value:
+            return value
+    return None
+
+
+class TrackStore:
+    """
+    SQLite (WAL) store of resolved track metadata that survives restarts.
+
+    Reads are single indexed lookups run in a worker thread, so one waiting on
+    a checkpoint of the writer never stalls the event loop. Writes are queued
+    and committed in batches by a background thread. Stream urls are kept in
+    their own table together with their expiry and are only handed out while
+    still valid.
+    While the store is not opened every lookup misses and writes are dropped.
+    """
+
+    def __init__(self, path: str, batch_size: int = 64):
+        self.path = path
+        self.batch_size = batch_size
+        self._read_conn: sqlite3.Connection | None = None
+        self._read_lock = threading.Lock()
+        self._writes: queue.Queue[Any] = queue.Queue()
+        self._writer: threading.Thread | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._read_conn is not None
+
+    def open(self) -> None:
+        if self.is_open:
+            return
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        _ = conn.execute("PRAGMA journal_mode=WAL")
+        _ = conn.executescript(_SCHEMA)
+        conn.commit()
+        self._read_conn = conn
+        self._writer = threading.Thread(
+            target=self._write_loop, name="muscpy-track-store", daemon=True
+        )
+        self._writer.start()
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writes.put(_STOP)
+            self._writer.join()
+            self._writer = None
+        if self._read_conn is not None:
+            self._read_conn.close()
+            self._read_conn = None
+
+    async def get_metadata(self, url: str) -> dict[str, Any] | None:
+        if self._read_conn is None:
+            return None
+        return await asyncio.to_thread(self._read_metadata, url)
+
+    def _read_metadata(self, url: str) -> dict[str, Any] | None:
+        if self._read_conn is None:
+            return None
+        with self._read_lock:
+            row = self._read_conn.execute(
+                "SELECT canonical_url, title, duration, thumbnail, extractor FROM tracks"
+                " WHERE video_id = ? OR canonical_url = ? LIMIT 1",
+                (normalize_video_key(url), url),
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("original_url", *_METADATA_KEYS), row))
+
+    async def get_stream(self, url: str) -> tuple[str, str | None] | None:
+        """
+        Still valid stream url and its audio codec, if one is stored.
+        """
+        if self._read_conn is None:
+            return None
+        return await asyncio.to_thread(self._read_stream, url)
+
+    def _read_stream(self, url: str) -> tuple[str, str | None] | None:
+        if self._read_conn is None:
+            return None
+        with self._read_lock:
+            row = self._read_conn.execute(
+                "SELECT data_url, acodec FROM stream_urls WHERE video_id = ? AND expires_at > ?",
+                (normalize_video_key(url), time.time() + STREAM_EXPIRY_MARGIN),
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    async def hydrate(self, data: dict[str, Any]) -> dict[str, Any]:
+        """
+        Fill the metadata missing from an extraction result from the store.
+        """
+        canonical_url = canonical_url_of(data)
+        if canonical_url is None or all(key in data for key in _METADATA_KEYS):
+            return data
+        stored = await self.get_metadata(canonical_url)
+        if stored is None:
+            return data
+        return {
+            **{k: v for k, v in stored.items() if v is not None},
+            **{k: v for k, v in data.items() if v is not None},
+        }
+
+    def put(self, data: dict[str, Any]) -> None:
+        """
+        Queue the metadata (and stream url, if it has one) of a resolved track.
+        """
+        if not self.is_open:
+            return
+        canonical_url = canonical_url_of(data)
+        if canonical_url is None:
+            return
+        self._writes.put((canonical_url, {k: data.get(k) for k in _METADATA_KEYS}))
+        stream_url = data.get("url")
+        if isinstance(stream_url, str):
+            self.put_stream_url(canonical_url, stream_url, data.get("acodec"))
+
+    def put_stream_url(
+        self, url: str, stream_url: str, acodec: str | None = None
+    ) -> None:
+        if not self.is_open:
+            return
+        expires_at = stream_url_expiry(stream_url)
+        if expires_at is None:
+            return
+        self._writes.put((url, stream_url, expires_at, acodec))
+
+    def _write_loop(self) -> None:
+        conn = sqlite3.connect(self.path)
+        try:
+            stop = False
+            while not stop:
+                batch = [self._writes.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._writes.get_nowait())
+                    except queue.Empty:
+                        break
+                if _STOP in batch:
+                    stop = True
+                    batch = [item for item in batch if item is not _STOP]
+                try:
+                    with conn:
+                        for item in batch:
+                            self._write(conn, item)
+                except sqlite3.Error as e:
+                    print(f"track store write of {len(batch)} items failed: {e}")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, item: tuple[Any, ...]) -> None:
+        if len(item) == 2:
+            canonical_url, meta = item
+            _ = conn.execute(
+                "INSERT INTO tracks (video_id, canonical_url, title, duration, thumbnail, extractor, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (video_id) DO UPDATE SET"
+                " canonical_url = excluded.canonical_url,"
+                " title = COALESCE(excluded.title, title),"
+                " duration = COALESCE(excluded.duration, duration),"
+                " thumbnail = COALESCE(excluded.thumbnail, thumbnail),"
+                " extractor = COALESCE(excluded.extractor, extractor),"
+                " updated_at = excluded.updated_at",
+                (
+                    normalize_video_key(canonical_url),
+                    canonical_url,
+                    *(meta[k] for k in _METADATA_KEYS),
+                    time.time(),
+                ),
+            )
+        else:
+            url, stream_url, expires_at, acodec = item
+            _ = conn.execute(
+                "INSERT OR REPLACE INTO stream_urls (video_id, data_url, expires_at, acodec)"
+                " VALUES (?, ?, ?, ?)",
+                (normalize_video_key(url), stream_url, expires_at, acodec),
+            )
+
+
+track_store = TrackStore(TRACK_STORE_PATH)
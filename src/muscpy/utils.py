@@ -1,5 +1,7 @@
 import asyncio
+from collections import Counter
 from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Generic, TypeVar
 
 import discord
@@ -9,79 +11,94 @@ pool_V = TypeVar("pool_V")
 
 
 class SharedDict(Generic[pool_K, pool_V]):
+    """
+    Guild keyed registry shared by the commands and the background loops.
+
+    Everything runs on the one event loop, so reads are plain dict lookups
+    without a lock. Iteration walks an immutable snapshot that is rebuilt at
+    most once per mutation, so a consumer may await (e.g. a voice disconnect)
+    between items without holding anything. Read-modify-write sequences take
+    the lock of their key only, other guilds are never blocked by them.
+    """
+
     def __init__(self) -> None:
-        self._lock = asyncio.Lock()
         self._pool: dict[pool_K, pool_V] = {}
+        self._key_locks: dict[pool_K, asyncio.Lock] = {}
+        self._key_lock_users: Counter[pool_K] = Counter()
+        self._version = 0
+        self._snapshot: tuple[tuple[pool_K, pool_V], ...] = ()
+        self._snapshot_version = 0
+
+    def __len__(self) -> int:
+        return len(self._pool)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._pool
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @asynccontextmanager
+    async def lock(self, key: pool_K) -> AsyncIterator[None]:
+        """
+        Hold the lock of ``key`` for a read-modify-write of that entry.
+        """
+        key_lock = self._key_locks.get(key)
+        if key_lock is None:
+            key_lock = self._key_locks[key] = asyncio.Lock()
+        self._key_lock_users[key] += 1
+        try:
+            async with key_lock:
+                yield
+        finally:
+            # drop locks nobody holds or waits on, the registry may see many keys
+            self._key_lock_users[key] -= 1
+            if not self._key_lock_users[key]:
+                del self._key_lock_users[key]
+                del self._key_locks[key]
+
+    def _changed(self) -> None:
+        self._version += 1
+
+    def peek(self, key: pool_K) -> pool_V | None:
+        """
+        ``get`` for callbacks that can't await.
+        """
+        return self._pool.get(key)
 
     async def get(self, key: pool_K) -> pool_V | None:
-        async with self._lock:
-            return self._pool.get(key)
+        return self._pool.get(key)
 
     async def set(self, key: pool_K, value: pool_V) -> None:
-        async with self._lock:
+        self._pool[key] = value
+        self._changed()
+
+    async def setdefault(self, key: pool_K, value: pool_V) -> pool_V:
+        """
+        Store ``value`` unless ``key`` already has one, return the stored value.
+        """
+        async with self.lock(key):
+            if key in self._pool:
+                return self._pool[key]
             self._pool[key] = value
+            self._changed()
+            return value
 
     async def delete(self, key: pool_K) -> None:
-        async with self._lock:
-            if key in self._pool:
-                del self._pool[key]
-
-    async def items(self) -> AsyncIterator[tuple[pool_K, pool_V]]:
-        async with self._lock:
-            for key, value in self._pool.items():
-                yield (key, value)
-
-
-class SharedList(Generic[pool_V]):
-    def __init__(self) -> None:
-        super().__init__()
-        self._lock = asyncio.Lock()
-        self._pool: list[pool_V] = []
-
-    def __getitem__(self, index: int) -> pool_V | None:
-        return asyncio.run(self.get(index))
+        if key in self._pool:
+            del self._pool[key]
+            self._changed()
 
-    def __setitem__(self, index: int, value: pool_V):
-        asyncio.run(self.set(index, value))
+    def snapshot(self) -> tuple[tuple[pool_K, pool_V], ...]:
+        if self._snapshot_version != self._version:
+            self._snapshot = tuple(self._pool.items())
+            self._snapshot_version = self._version
+        return self._snapshot
 
-    def __delitem__(self, value: pool_V):
-        asyncio.run(self.remove(value))
-
-    def __len__(self) -> int:
-        return len(self._pool)
-
-    def __iter__(self):
-        return iter(self._pool)
-
-    async def get(self, index: int) -> pool_V | None:
-        async with self._lock:
-            try:
-                return self._pool[index]
-            except IndexError:
-                return None
-
-    async def set(self, index: int, value: pool_V):
-        async with self._lock:
-            self._pool[index] = value
-
-    async def append(self, value: pool_V):
-        async with self._lock:
-            self._pool.append(value)
-
-    async def remove(self, value: pool_V):
-        async with self._lock:
-            self._pool.remove(value)
-
-    async def pop(self, index: int) -> pool_V | None:
-        async with self._lock:
-            try:
-                return self._pool.pop(index)
-            except IndexError:
-                return None
-
-    async def clear(self):
-        async with self._lock:
-            self._pool.clear()
+    async def items(self) -> AsyncIterator[tuple[pool_K, pool_V]]:
+        for item in self.snapshot():
+            yield item
 
 
 async def not_guild(interaction: discord.Interaction) -> bool:
@@ -7,13 +7,29 @@ from __future__ import annotations
 
 import asyncio
 
-from collections.abc import AsyncGenerator, Coroutine, Iterable
+import inspect
 
-from dataclasses import dataclass
+import os
+
+import re
+
+import threading
+
+import time
+
+import weakref
+
+from collections import deque
+
+from collections.abc import AsyncGenerator, Callable, Coroutine, Iterable
+
+from dataclasses import dataclass, field
+
+import sys
 
 from sys import stderr
 
-from typing import Any, override
+from typing import IO, Any, override
 
 from urllib.parse import urlparse
 
@@ -22,12 +38,42 @@ import discord
 
 import discord.ext.commands
 
-from muscpy.utils import SharedList
-from yt_dlp import YoutubeDL
-
-from yt_dlp import std_headers as ytdl_headers
-
-from yt_dlp.utils.networking import random_user_agent
+from discord.oggparse import OggStream
+
+from muscpy.audio_cache import CacheFill, audio_cache
+from muscpy.config import (
+    EXTRACTION_CACHE_SIZE,
+    EXTRACTION_CACHE_TTL,
+    EXTRACTION_MAX_PER_GUILD,
+    EXTRACTION_WORKERS,
+    PLAYLIST_BATCH_SIZE,
+    PLAYBACK_OPUS_PASSTHROUGH,
+    PLAYLIST_HYDRATE_CONCURRENCY,
+    PLAYLIST_MAX_TRACKS,
+    PLAYLIST_SUMMARY_LINES,
+    PLAYLIST_WINDOW_SIZE,
+    PREFETCH_COUNT,
+    SEARCH_CACHE_TTL,
+    SPECULATIVE_RESOLVE_COUNT,
+    STREAM_EXPIRY_MARGIN,
+    YTDL_POOL_SIZE,
+)
+from muscpy.extraction_cache import (
+    ExtractionCache,
+    normalize_search_query,
+    normalize_video_key,
+    stream_url_expiry,
+)
+from muscpy.extraction_executor import ExtractionPriority, ExtractionScheduler
+from muscpy.metrics import metrics
+from muscpy.outbound import outbound
+from muscpy.progress import ProgressReporter
+from muscpy.queue_view import QueuePages, QueuePageView
+from muscpy.single_flight import SingleFlight
+from muscpy.track_queue import TrackQueue
+from muscpy.track_store import track_store
+from muscpy.tracing import Span, tracer
+from muscpy.ytdl_pool import YoutubeDLPool
 
 
 class PlayButton(discord.ui.Button["PlayButtonView"]):
@@ -71,9 +117,6 @@ class PlayButtonView(discord.ui.View):
             _ = self.add_item(PlayButton(ytdl_handler, track, indx))
 
 
-ytdl_headers["User-Agent"] = random_user_agent()
-
-
 common_ytdl_options = {
     "format": "bestaudio/best",
     "outtmpl": "%(extractor)s-%(id)s-%(title)s.%(ext)s",
@@ -99,7 +142,7 @@ ytdl_search_options = {
 
 ytdl_glbl_format_options = {
     "noplaylist": False,
-    "playlist_items": "1-100",
+    "playlist_items": f"1-{PLAYLIST_WINDOW_SIZE}",
     "default_search": "auto",
     "extract_flat": True,
     "flat_playlist": True,
@@ -110,35 +153,375 @@ ytdl_glbl_format_options = {
 ytldl_single_url_options = {"noplaylist": True, **common_ytdl_options}
 
 
+ytdl_option_profiles: dict[str, dict[str, Any]] = {
+    "search": ytdl_search_options,
+    "playlist": ytdl_glbl_format_options,
+    "single": ytldl_single_url_options,
+}
+
+
+ytdl_pools: dict[str, YoutubeDLPool] = {
+    profile: YoutubeDLPool(options, size=YTDL_POOL_SIZE)
+    for profile, options in ytdl_option_profiles.items()
+}
+
+
+def use_ytdl_factory(factory: Callable[[dict[str, Any]], Any]) -> None:
+    """
+    Rebuild every option profile's pool with ``factory`` instead of ``YoutubeDL``
+    (e.g. the record / replay stand-ins of ``muscpy.ytdl_replay``).
+    """
+    for profile, options in ytdl_option_profiles.items():
+        ytdl_pools[profile].close()
+        ytdl_pools[profile] = YoutubeDLPool(
+            options, size=YTDL_POOL_SIZE, factory=factory
+        )
+    extraction_cache.clear()
+
+
+def warm_up() -> None:
+    """
+    Import yt_dlp and build one ``YoutubeDL`` per option profile in a daemon
+    thread, so the first extraction after start doesn't pay for them.
+    """
+
+    def run() -> None:
+        started = time.perf_counter()
+        try:
+            for pool in list(ytdl_pools.values()):
+                pool.warm()
+        except Exception as e:  # noqa: BLE001 the first extraction builds them instead
+            print(f"yt_dlp warm up failed: {e}")
+            return
+        print(f"yt_dlp warmed up in {time.perf_counter() - started:.2f}s")
+
+    threading.Thread(target=run, name="ytdl-warm-up", daemon=True).start()
+
+
+extraction_scheduler = ExtractionScheduler(
+    workers=EXTRACTION_WORKERS, max_per_guild=EXTRACTION_MAX_PER_GUILD
+)
+
+
+extraction_flights = SingleFlight()
+
+
+# the most urgent priority asked of each extraction in flight, joiners raise it
+_flight_priorities: dict[str, ExtractionPriority] = {}
+
+
+extraction_cache = ExtractionCache(
+    max_entries=EXTRACTION_CACHE_SIZE,
+    default_ttl=EXTRACTION_CACHE_TTL,
+    expiry_margin=STREAM_EXPIRY_MARGIN,
+)
+
+
+extraction_seconds = metrics.histogram(
+    "muscpy_extraction_seconds",
+    "extract_info calls missing the cache, executor queue wait included",
+)
+track_fetch_seconds = metrics.histogram(
+    "muscpy_track_fetch_seconds", "Track.fetch resolving a stream url"
+)
+play_seconds = metrics.histogram(
+    "muscpy_play_seconds", "/play from the loading message to playback started"
+)
+ffmpeg_spawn_seconds = metrics.histogram(
+    "muscpy_ffmpeg_spawn_seconds", "creating the ffmpeg audio source of a track"
+)
+first_packet_seconds = metrics.histogram(
+    "muscpy_first_packet_seconds",
+    "play_next picking a track until its first audio packet is read",
+)
+track_gap_seconds = metrics.histogram(
+    "muscpy_track_gap_seconds",
+    "end of a track until the first audio packet of the next one",
+)
+stream_refreshes = metrics.counter(
+    "muscpy_stream_refreshes_total",
+    "stream urls resolved again before expiry, or after ffmpeg was refused",
+)
+
+
+def _cache_hit_ratios() -> Iterable[tuple[dict[str, str], float]]:
+    for name, cache in (("extraction", extraction_cache), ("audio", audio_cache)):
+        lookups = cache.hits + cache.misses
+        if lookups:
+            yield {"cache": name}, cache.hits / lookups
+
+
+_ = metrics.gauge(
+    "muscpy_cache_hit_ratio",
+    "hits / lookups of the extraction and audio caches",
+    collect=_cache_hit_ratios,
+)
+
+
+def extraction_cache_key(url: str, profile: str) -> str:
+    if profile == "search":
+        return f"{profile}|{url}"
+    return f"{profile}|{normalize_video_key(url, keep_playlist=profile == 'playlist')}"
+
+
+async def extract_info(
+    url: str,
+    profile: str,
+    refresh: bool = False,
+    priority: ExtractionPriority = ExtractionPriority.INTERACTIVE,
+    guild_id: str | None = None,
+    playlist_items: str | None = None,
+) -> Any:
+    """
+    Run ``YoutubeDL.extract_info`` with the options of ``profile`` on the extraction
+    scheduler, answering from the shared extraction cache when the same video was
+    resolved before. ``refresh`` skips the cached result and replaces it.
+    Concurrent calls for the same key share one extraction.
+    ``playlist_items`` replaces the profile's playlist window for this call.
+    """
+    cache_key = extraction_cache_key(url, profile)
+    overrides: dict[str, Any] = {}
+    if playlist_items is not None:
+        cache_key += f"|{playlist_items}"
+        overrides["playlist_items"] = playlist_items
+    if refresh:
+        extraction_cache.invalidate(cache_key)
+    elif (cached := extraction_cache.get(cache_key)) is not None:
+        return cached
+
+    if cache_key not in extraction_flights:
+        _flight_priorities[cache_key] = priority
+    elif priority < _flight_priorities.get(cache_key, priority):
+        # joining a prefetch, a command must not wait behind the background queue
+        _flight_priorities[cache_key] = priority
+        _ = extraction_scheduler.promote(cache_key, priority)
+
+    async def extract() -> Any:
+        try:
+            with (
+                extraction_seconds.time(profile=profile),
+                tracer.span("extract", profile=profile),
+            ):
+                data = await extraction_scheduler.run(
+                    ytdl_pools[profile].extract_info,
+                    url,
+                    overrides,
+                    priority=_flight_priorities.get(cache_key, priority),
+                    guild_id=guild_id,
+                    key=cache_key,
+                )
+        finally:
+            _ = _flight_priorities.pop(cache_key, None)
+        if data is not None:
+            extraction_cache.set(
+                cache_key, data, ttl=SEARCH_CACHE_TTL if profile == "search" else None
+            )
+        return data
+
+    return await extraction_flights.do(cache_key, extract)
+
+
 ffmpeg_options = {
     "options": "-vn",
     "before_options": "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5",
 }
 
 
-@dataclass
-class Track:
-    original_url: str
-    data_url: str
+ffmpeg_local_options = {"options": "-vn"}
 
-    title: str | None
 
-    length: int | None
+@dataclass(frozen=True, slots=True, weakref_slot=True)
+class TrackInfo:
+    """
+    Immutable metadata of one video, shared by every queue entry of it.
+    """
 
+    original_url: str
+    title: str | None
+    length: int | None
     thumbnail: str | None
-
     extractor: str | None
-
     playlist_url: str | None
 
-    requester: discord.Member | discord.User | None = None
+    @classmethod
+    def intern(
+        cls,
+        original_url: str,
+        title: str | None,
+        length: int | None,
+        thumbnail: str | None,
+        extractor: str | None,
+        playlist_url: str | None,
+    ) -> TrackInfo:
+        info = cls(
+            original_url,
+            title,
+            length,
+            thumbnail,
+            sys.intern(extractor) if extractor else extractor,
+            playlist_url,
+        )
+        shared = _track_infos.get(original_url)
+        if shared == info:
+            return shared  # pyright: ignore[reportReturnType]
+        # new or changed metadata, entries holding the old info keep it
+        _track_infos[original_url] = info
+        return info
+
+    def with_changes(self, **changes: Any) -> TrackInfo:
+        return TrackInfo.intern(
+            **{
+                name: changes.get(name, getattr(self, name))
+                for name in self.__dataclass_fields__
+            }
+        )
+
+
+# a video queued in many guilds (or many times) keeps one TrackInfo alive
+_track_infos: weakref.WeakValueDictionary[str, TrackInfo] = (
+    weakref.WeakValueDictionary()
+)
+
+# resolves (user id, guild id) back to the member, see set_requester_lookup
+requester_lookup: Callable[[int, int | None], discord.abc.User | None] | None = None
+
+
+def set_requester_lookup(
+    lookup: Callable[[int, int | None], discord.abc.User | None],
+) -> None:
+    global requester_lookup
+    requester_lookup = lookup
+
+
+@dataclass(frozen=True, slots=True, weakref_slot=True)
+class Requester:
+    """
+    Who queued an entry, shared by every entry one member queued in a guild.
+    ``name`` is the display name at request time, shown when the member can't be
+    resolved any more.
+    """
+
+    user_id: int
+    guild_id: int | None
+    name: str
+
+    @classmethod
+    def of(cls, user: discord.abc.User) -> Requester:
+        guild = getattr(user, "guild", None)
+        guild_id: int | None = guild.id if guild is not None else None
+        shared = _requesters.get((user.id, guild_id))
+        if shared is not None and shared.name == user.display_name:
+            return shared
+        requester = cls(user.id, guild_id, user.display_name)
+        _requesters[(user.id, guild_id)] = requester
+        return requester
+
+    @property
+    def display_name(self) -> str:
+        if requester_lookup is not None:
+            user = requester_lookup(self.user_id, self.guild_id)
+            if user is not None:
+                return user.display_name
+        return self.name
+
+
+_requesters: weakref.WeakValueDictionary[tuple[int, int | None], Requester] = (
+    weakref.WeakValueDictionary()
+)
+
+
+class _Requested:
+    """
+    ``requester`` of a queue entry, kept as a shared ``Requester`` and resolved
+    back to the member (for the guild nickname) when shown.
+    """
+
+    __slots__ = ()
+
+    requested_by: Requester | None
+
+    @property
+    def requester(self) -> discord.abc.User | None:
+        requested_by = self.requested_by
+        if requested_by is None or requester_lookup is None:
+            return None
+        return requester_lookup(requested_by.user_id, requested_by.guild_id)
+
+    @requester.setter
+    def requester(self, user: discord.abc.User | None) -> None:
+        self.requested_by = Requester.of(user) if user is not None else None
+
+    @property
+    def requester_name(self) -> str:
+        if self.requested_by is None:
+            return "Unknown"
+        return self.requested_by.display_name
+
+
+def _info_property(name: str) -> Any:
+    def get(track: Track) -> Any:
+        return getattr(track.info, name)
+
+    def set_(track: Track, value: Any) -> None:
+        track.info = track.info.with_changes(**{name: value})
+
+    return property(get, set_)
+
+
+@dataclass(slots=True, eq=False)
+class Track(_Requested):
+    """
+    One queue entry: the shared ``TrackInfo`` plus what is per entry,
+    the stream url and the requester.
+    """
+
+    info: TrackInfo
+
+    data_url: str
+
+    requested_by: Requester | None = None
 
     fetched: bool = False
 
+    acodec: str | None = None
+
+    # the url expire= was last parsed from, parsed again when data_url changes
+    _expiry_of: str | None = field(default=None, init=False, repr=False)
+
+    _expires_at: float | None = field(default=None, init=False, repr=False)
+
+    original_url = _info_property("original_url")
+    title = _info_property("title")
+    length = _info_property("length")
+    thumbnail = _info_property("thumbnail")
+    extractor = _info_property("extractor")
+    playlist_url = _info_property("playlist_url")
+
+    @property
+    def is_opus(self) -> bool:
+        return self.acodec == "opus"
+
+    @property
+    def expires_at(self) -> float | None:
+        """
+        Unix timestamp ``data_url`` stops working at, None if it doesn't say.
+        """
+        if self._expiry_of is not self.data_url:
+            self._expiry_of = self.data_url
+            self._expires_at = stream_url_expiry(self.data_url)
+        return self._expires_at
+
+    def expires_before(self, deadline: float) -> bool:
+        """
+        Whether ``data_url`` is within ``STREAM_EXPIRY_MARGIN`` of expiry at ``deadline``.
+        """
+        expires_at = self.expires_at
+        return expires_at is not None and expires_at - STREAM_EXPIRY_MARGIN < deadline
+
     def msg_embed(
         self,
         position: float | None = None,
-        queue: SharedList[Track] | None = None,
+        queue: QueuePages | None = None,
         title: str = "Track Info",
     ) -> discord.Embed:
         embed = discord.Embed(
@@ -149,7 +532,7 @@ class Track:
             embed.set_thumbnail(url=self.thumbnail)
             .add_field(
                 name="Requester",
-                value=self.requester.display_name if self.requester else "Unknown",
+                value=self.requester_name,
             )
             .add_field(name="Length", value=f"{self.length}s")
         )
@@ -158,23 +541,18 @@ class Track:
         if self.playlist_url:
             embed = embed.add_field(name="orginal playlist", value=self.playlist_url)
 
-        if queue:
-            embed = embed.add_field(
-                name="Queue",
-                value="\n".join(
-                    [f"{i+1}. {track.title}" for i, track in enumerate(queue)]
-                ),
-            )
+        if queue and queue.queue:
+            embed = embed.add_field(name=queue.field_name(0), value=queue.render(0))
 
         return embed
 
     @override
     def __str__(self):
-        return f"{self.title} requested by {self.requester.display_name if self.requester else 'Unknown'}"
+        return f"{self.title} requested by {self.requester_name}"
 
     @override
     def __repr__(self):
-        return f"{self.title} requested by {self.requester.display_name if self.requester else 'Unknown'}\n og_url : {self.original_url}"
+        return f"{self.title} requested by {self.requester_name}\n og_url : {self.original_url}"
 
     @override
     def __eq__(self, other: object):
@@ -190,64 +568,288 @@ class Track:
         fetch_sts: bool,
         requester: discord.Member | None = None,
     ) -> Track:
-        return cls(
+        info = TrackInfo.intern(
             original_url=data.get("original_url", "Unknown"),  # pyright: ignore[reportAny]
-            data_url=data["url"],  # pyright: ignore[reportAny]
             title=data.get("title", "Unknown"),  # pyright: ignore[reportAny]
             length=data.get("duration", 0),  # pyright: ignore[reportAny]
             thumbnail=data.get("thumbnail", None),  # pyright: ignore[reportAny]
             extractor=data.get("extractor", None),  # pyright: ignore[reportAny]
             playlist_url=data.get("playlist", None),
+        )
+        data_url: str = data["url"]  # pyright: ignore[reportAny]
+        return cls(
+            info=info,
+            # unresolved entries point at their page, share that string
+            data_url=info.original_url if data_url == info.original_url else data_url,
             fetched=fetch_sts,
-            requester=requester,
+            requested_by=Requester.of(requester) if requester is not None else None,
+            acodec=data.get("acodec", None),
         )
 
-    async def fetch(self):
+    @tracer.traced("track.fetch")
+    async def fetch(
+        self,
+        priority: ExtractionPriority = ExtractionPriority.REFRESH,
+        guild_id: str | None = None,
+    ):
         print(f"fetch_called for {self.original_url} {self.data_url}")
-        loop = asyncio.get_event_loop()
-        with YoutubeDL(ytldl_single_url_options) as ytdl:
-            if self.original_url is None or "" == self.original_url:
-                data = await loop.run_in_executor(
-                    None,
-                    lambda: ytdl.extract_info(self.original_url, download=False),
-                )
-            elif self.data_url is None or "" == self.original_url:
-                return None
-            else:
-                self.original_url = self.data_url
-                data = await loop.run_in_executor(
-                    None,
-                    lambda: ytdl.extract_info(self.data_url, download=False),
-                )
-            if data is None:
-                return
-            if "enttries" in data:
-                data = data["entries"][0]
-            if isinstance(data, dict):
-                self.original_url = data.get("original_url", self.original_url)  # pyright: ignore
-                self.data_url = data["url"]  # pyright: ignore
-                self.title = data.get("title", self.title)  # pyright: ignore
-                self.length = data.get("duration", self.length)  # pyright: ignore
-                self.thumbnail = data.get("thumbnail", self.thumbnail)  # pyright: ignore
-                self.extractor = data.get("extractor", self.extractor)  # pyright: ignore
-                self.playlist_url = data.get("playlist", self.playlist_url)  # pyright: ignore
-                self.fetched = True
-                self.requester = self.requester
-                return True
+        tracer.annotate(url=self.original_url)
+        if self.data_url and (stream := await track_store.get_stream(self.data_url)):
+            self.data_url, self.acodec = stream
+            self.fetched = True
+            return True
+        with track_fetch_seconds.time():
+            return await self._fetch(priority, guild_id)
+
+    async def _fetch(self, priority: ExtractionPriority, guild_id: str | None):
+        if self.original_url is None or "" == self.original_url:
+            data = await extract_info(
+                self.original_url, "single", priority=priority, guild_id=guild_id
+            )
+        elif self.data_url is None or "" == self.original_url:
+            return None
+        else:
+            self.original_url = self.data_url
+            data = await extract_info(
+                self.data_url, "single", priority=priority, guild_id=guild_id
+            )
+        if data is None:
+            return
+        if "entries" in data:
+            data = data["entries"][0]
+        if isinstance(data, dict):
+            track_store.put(data)  # pyright: ignore[reportUnknownArgumentType]
+            self.info = self.info.with_changes(
+                original_url=data.get("original_url", self.original_url),  # pyright: ignore
+                title=data.get("title", self.title),  # pyright: ignore
+                length=data.get("duration", self.length),  # pyright: ignore
+                thumbnail=data.get("thumbnail", self.thumbnail),  # pyright: ignore
+                extractor=data.get("extractor", self.extractor),  # pyright: ignore
+                playlist_url=data.get("playlist", self.playlist_url),  # pyright: ignore
+            )
+            self.data_url = data["url"]  # pyright: ignore
+            self.acodec = data.get("acodec", self.acodec)  # pyright: ignore
+            self.fetched = True
+            return True
         return False
 
 
+@dataclass(slots=True, eq=False)
+class PlaylistCursor(_Requested):
+    """
+    Queue entry standing for the rest of a playlist that is not extracted yet.
+
+    When it reaches the front of the queue the next ``PLAYLIST_WINDOW_SIZE``
+    entries are extracted with a windowed ``playlist_items`` and put in front
+    of it; it stays queued until the playlist (or ``PLAYLIST_MAX_TRACKS``) ends.
+    """
+
+    url: str
+
+    playlist_title: str | None
+
+    next_index: int  # 1 based, as playlist_items counts
+
+    total: int | None = None
+
+    requested_by: Requester | None = None
+
+    @classmethod
+    def after_window(
+        cls, url: str, data: dict[str, Any], window_end: int, entries: int
+    ) -> PlaylistCursor | None:
+        """
+        Cursor for the entries after ``window_end``, if the playlist may have more.
+        """
+        total: int | None = data.get("playlist_count")
+        if entries < window_end or (total is not None and total <= window_end):
+            return None
+        return cls(
+            url=data.get("webpage_url") or url,
+            playlist_title=data.get("title"),
+            next_index=window_end + 1,
+            total=total,
+        )
+
+    @property
+    def original_url(self) -> str:
+        return self.url
+
+    @property
+    def title(self) -> str:
+        remaining = f"{self.total - self.next_index + 1} more" if self.total else "more"
+        return f"{self.playlist_title or 'playlist'} ({remaining} tracks)"
+
+    @property
+    def length(self) -> None:
+        return None
+
+    @property
+    def exhausted(self) -> bool:
+        if self.next_index > PLAYLIST_MAX_TRACKS:
+            return True
+        return self.total is not None and self.next_index > self.total
+
+    def window(self) -> str:
+        end = min(self.next_index + PLAYLIST_WINDOW_SIZE, PLAYLIST_MAX_TRACKS + 1)
+        return f"{self.next_index}-{end - 1}"
+
+    def advance(self, entries: int) -> None:
+        if entries < PLAYLIST_WINDOW_SIZE:
+            # a short window is the end of the playlist
+            self.total = self.next_index + entries - 1
+        self.next_index += entries
+
+
+QueueEntry = Track | PlaylistCursor
+
+
+class _FirstPacketTimer(discord.AudioSource):
+    """
+    Passes ``source`` through, counting its 20ms packets, and calls
+    ``on_first_packet`` once audio flows.
+    """
+
+    def __init__(
+        self,
+        source: discord.AudioSource,
+        on_first_packet: Callable[[], None] | None = None,
+    ):
+        self.source = source
+        self._on_first_packet = on_first_packet
+        self.packets = 0
+        # the source ended by itself, rather than being stopped
+        self.ran_dry = False
+
+    def read(self) -> bytes:
+        data = self.source.read()
+        if not data:
+            self.ran_dry = True
+            return data
+        self.packets += 1
+        if self._on_first_packet is not None:
+            on_first_packet, self._on_first_packet = self._on_first_packet, None
+            on_first_packet()
+        return data
+
+    @property
+    def position(self) -> float:
+        """
+        Seconds of audio read so far.
+        """
+        return self.packets * discord.opus.Encoder.FRAME_LENGTH / 1000
+
+    def is_opus(self) -> bool:
+        return self.source.is_opus()
+
+    def cleanup(self) -> None:
+        self.source.cleanup()
+
+
+class _CachingOpusAudio(discord.FFmpegOpusAudio):
+    """
+    An opus stream whose Ogg output is also copied into ``fill`` as it's read.
+    """
+
+    def __init__(self, source: str, fill: CacheFill, **kwargs: Any):
+        super().__init__(source, **kwargs)
+        self._packet_iter = OggStream(fill.tee(self._stdout)).iter_packets()  # pyright: ignore[reportArgumentType]
+
+
+# seconds a completely read stream may fall short of its rounded length
+_FILL_LENGTH_SLACK = 2.0
+
+
+# ffmpeg's http protocol on a refused request, e.g. an expired stream url
+_HTTP_REFUSED = re.compile(rb"(?:HTTP error|Server returned) (403|410)")
+
+
+class _FFmpegStderr:
+    """
+    A pipe for ffmpeg's stderr, copied to ours by a daemon thread that
+    remembers the first HTTP 403 / 410 in it.
+    """
+
+    def __init__(self):
+        read_fd, write_fd = os.pipe()
+        # both ends outlive __init__: the writer goes to ffmpeg, the reader to
+        # the copy thread, which closes it at EOF
+        self._reader = open(read_fd, "rb", buffering=0)  # noqa: SIM115
+        self.writer = open(write_fd, "wb", buffering=0)  # noqa: SIM115
+        self.http_status: int | None = None
+        self._thread = threading.Thread(
+            target=self._copy, name="ffmpeg-stderr", daemon=True
+        )
+
+    def start(self) -> None:
+        """
+        Call once ffmpeg is spawned; it holds its own copy of the write end,
+        ours must go for the copy thread to see EOF when ffmpeg exits.
+        """
+        self.writer.close()
+        self._thread.start()
+
+    def wait(self, timeout: float) -> int | None:
+        """
+        ``http_status`` once ffmpeg's last words are read, or ``timeout`` passed.
+        """
+        self._thread.join(timeout)
+        return self.http_status
+
+    def close(self) -> None:
+        self.writer.close()
+        self._reader.close()
+
+    def _copy(self) -> None:
+        tail = b""
+        with self._reader:
+            while data := self._reader.read(4096):
+                if self.http_status is None and (
+                    match := _HTTP_REFUSED.search(tail + data)
+                ):
+                    self.http_status = int(match[1])
+                # a message may straddle two reads
+                tail = data[-64:]
+                _ = stderr.buffer.write(data)
+                stderr.buffer.flush()
+
+
+def _close_unstarted(coroutine: Any) -> None:
+    """
+    Close ``coroutine`` if nothing ever awaited it, instead of leaving it to
+    warn "never awaited" when collected.
+    """
+    if (
+        inspect.iscoroutine(coroutine)
+        and inspect.getcoroutinestate(coroutine) == inspect.CORO_CREATED
+    ):
+        coroutine.close()
+
+
+async def _ready[T](value: T) -> T:
+    return value
+
+
 class YTDLHandler:
     def __init__(
         self,
         bot: discord.ext.commands.Bot,
         voice_client: discord.VoiceClient | discord.VoiceProtocol,
+        guild_id: str | None = None,
+        on_playback_change: Callable[[str, bool], None] | None = None,
     ):
         self.bot = bot
 
+        self.guild_id = guild_id
+
+        # told when audio starts (True) or stops / pauses (False)
+        self.on_playback_change = on_playback_change
+
         self.voice_client = voice_client
 
-        self.queue: SharedList[Track] = SharedList()
+        self.queue: TrackQueue[QueueEntry] = TrackQueue()
+
+        self.queue_pages = QueuePages(self.queue)
 
         self.active_track = None
 
@@ -255,36 +857,88 @@ class YTDLHandler:
 
         self.loop = False
 
+        self._playback_started_at: float | None = None
+
+        # perf_counter() of the track end that started play_next, for the gap metric
+        self._track_ended_at: float | None = None
+
+        # time to first audio of the active track, still open until audio flows
+        self._first_packet_span: Span | None = None
+
+        # stderr of the active track's ffmpeg when streamed, see _play_next
+        self._ffmpeg_stderr: _FFmpegStderr | None = None
+
+        # seconds into the active track its current source started at
+        self._resumed_at = 0.0
+
+        self._stream_resumed = False
+
+        # the active track's stream copied into the audio cache, see _play_next
+        self._cache_fill: CacheFill | None = None
+
+        self._prefetches: dict[int, asyncio.Task[None]] = {}
+
+    @tracer.traced("tracks_from_search")
     async def tracks_from_search(self, query: str):
         """
         Search for a query and return the first 5 results
         """
 
-        loop = asyncio.get_event_loop()
-
         print("Searching for:", query)
 
-        with YoutubeDL(ytdl_search_options) as ytdl:
-            data: Any | dict[str, Any | list[Any]] = await loop.run_in_executor(
-                None, lambda: ytdl.extract_info(f"ytsearch5:{query}", download=False)
-            )
-            if data and "entries" in data:
-                return [
-                    await self.create_track(track, fetch_sts=False)
-                    for track in data["entries"]
-                ]  # pyright: ignore[reportAny]
+        data: Any | dict[str, Any | list[Any]] = await extract_info(
+            f"ytsearch5:{normalize_search_query(query)}",
+            "search",
+            guild_id=self.guild_id,
+        )
+        if data and "entries" in data:
+            return [
+                await self.create_track(track, fetch_sts=False)
+                for track in data["entries"]
+            ]  # pyright: ignore[reportAny]
 
         return None
 
     @staticmethod
-    async def create_track(dict_data: dict[str, Any], fetch_sts=True) -> Track | None:
+    async def create_track(
+        dict_data: dict[str, Any],
+        fetch_sts=True,
+        resolve_missing: bool = False,
+        guild_id: str | None = None,
+    ) -> Track | None:
+        """
+        ``resolve_missing`` extracts entries the flat extraction gave no duration for,
+        instead of dropping them.
+        """
         try:
             if not dict_data:
                 return None
+            dict_data = await track_store.hydrate(dict_data)
             # TODO: maybe need to more key checking
+            if "duration" not in dict_data and resolve_missing and dict_data.get("url"):
+                resolved = await extract_info(
+                    dict_data["url"],
+                    "single",
+                    priority=ExtractionPriority.BACKGROUND,
+                    guild_id=guild_id,
+                )
+                if isinstance(resolved, dict):
+                    dict_data = resolved
+                    fetch_sts = True
             if "duration" not in dict_data:
                 return None
-            new_trck = Track.from_dict(dict_data, fetch_sts=fetch_sts)
+            stream = (
+                None
+                if fetch_sts
+                else await track_store.get_stream(dict_data.get("url", ""))
+            )
+            if stream is not None:
+                dict_data = {**dict_data, "url": stream[0], "acodec": stream[1]}
+            new_trck = Track.from_dict(
+                dict_data, fetch_sts=fetch_sts or stream is not None
+            )
+            if fetch_sts:
+                track_store.put(dict_data)
             print(f"{new_trck=}")
             return new_trck
         except Exception as e:
@@ -295,66 +949,76 @@ class YTDLHandler:
     @staticmethod
     async def generate_track_or_que_urls(
         url: str,
-    ) -> AsyncGenerator[tuple[Coroutine[Any, Any, Track | None], bool], None]:
-        loop = asyncio.get_event_loop()
+        guild_id: str | None = None,
+        priority: ExtractionPriority = ExtractionPriority.INTERACTIVE,
+    ) -> AsyncGenerator[tuple[Coroutine[Any, Any, QueueEntry | None], bool], None]:
+        """
+        Only the first playlist window is extracted, the rest is yielded as one
+        ``PlaylistCursor`` after its tracks.
+        """
         secondary_plist_url: None | str = None
         secondary_plist_first_track = None
 
-        with YoutubeDL(ytdl_glbl_format_options) as ytdl:
+        with tracer.span("extract_url", url=url):
             data_of_urls: (
                 Any | dict[str, str | list[Any] | dict[str, Any]]
-            ) = await loop.run_in_executor(
-                None,
-                lambda: ytdl.extract_info(url, download=False),
-            )
-            if data_of_urls:
-                extraction_type = data_of_urls.get("_type", None)
-                print(f"{extraction_type=} on url {url=}")
-                if "audio_ext" in data_of_urls:
-                    print("i think its single file")
+            ) = await extract_info(
+                url, "playlist", priority=priority, guild_id=guild_id
+            )
+        if data_of_urls:
+            extraction_type = data_of_urls.get("_type", None)
+            print(f"{extraction_type=} on url {url=}")
+            if "audio_ext" in data_of_urls:
+                print("i think its single file")
+                try:
+                    if nw_track := YTDLHandler.create_track(
+                        data_of_urls, fetch_sts=True
+                    ):
+                        yield nw_track, False
+                except Exception as e:
+                    print(
+                        f"Failed to get track info: probably its not a url: {url} with error: {e}"
+                    )
+            if "playlist" == extraction_type:
+                print("i think its plylist")
+                entries = data_of_urls["entries"]
+                for entry in entries:
                     try:
+                        if not isinstance(
+                            entry,
+                            dict,
+                        ):
+                            continue
+                        print(f"has entry {entry=}")
                         if nw_track := YTDLHandler.create_track(
-                            data_of_urls, fetch_sts=True
+                            entry,
+                            fetch_sts=False,
+                            resolve_missing=True,
+                            guild_id=guild_id,
                         ):
-                            yield nw_track, False
+                            yield nw_track, True
                     except Exception as e:
                         print(
-                            f"Failed to get track info: probably its not a url: {url} with error: {e}"
+                            f"Failed to get track info: probably its not a url: {entry} with error: {e}"
                         )
-                if "playlist" == extraction_type:
-                    print("i think its plylist")
-                    for entry in data_of_urls["entries"]:
-                        try:
-                            if not isinstance(
-                                entry,
-                                dict,
-                            ):
-                                continue
-                            print(f"has entry {entry=}")
-                            if nw_track := YTDLHandler.create_track(
-                                entry, fetch_sts=False
-                            ):
-                                yield nw_track, True
-                        except Exception as e:
-                            print(
-                                f"Failed to get track info: probably its not a url: {entry} with error: {e}"
-                            )
-                elif extraction_type == "url" and "playlist?" in data_of_urls.get(
-                    "url", ""
+                if cursor := PlaylistCursor.after_window(
+                    url, data_of_urls, PLAYLIST_WINDOW_SIZE, len(entries)
                 ):
-                    print("i think its plylist from item url")
-                    temp_url = data_of_urls.get("url", None)
-                    if isinstance(temp_url, str):
-                        secondary_plist_url = temp_url
-                    secondary_plist_first_track = None
-                    if "watch?v=" in data_of_urls.get("webpage_url", ""):
-                        secondary_plist_first_track = data_of_urls.get(
-                            "webpage_url", ""
-                        )
-                        if isinstance(secondary_plist_first_track, str):
-                            secondary_plist_first_track = (
-                                secondary_plist_first_track.split("&list")[0]
-                            )
+                    yield _ready(cursor), True
+            elif extraction_type == "url" and "playlist?" in data_of_urls.get(
+                "url", ""
+            ):
+                print("i think its plylist from item url")
+                temp_url = data_of_urls.get("url", None)
+                if isinstance(temp_url, str):
+                    secondary_plist_url = temp_url
+                secondary_plist_first_track = None
+                if "watch?v=" in data_of_urls.get("webpage_url", ""):
+                    secondary_plist_first_track = data_of_urls.get("webpage_url", "")
+                    if isinstance(secondary_plist_first_track, str):
+                        secondary_plist_first_track = secondary_plist_first_track.split(
+                            "&list"
+                        )[0]
 
         if secondary_plist_url:
             results_for_single = None
@@ -362,59 +1026,183 @@ class YTDLHandler:
                 results_for_single = (
                     result
                     async for result in YTDLHandler.generate_track_or_que_urls(
-                        secondary_plist_first_track
+                        secondary_plist_first_track, guild_id=guild_id
                     )
                 )
             for tasks in [
                 results_for_single,
-                YTDLHandler.generate_track_or_que_urls(secondary_plist_url),
+                YTDLHandler.generate_track_or_que_urls(
+                    secondary_plist_url,
+                    guild_id=guild_id,
+                    priority=ExtractionPriority.BACKGROUND,
+                ),
             ]:
                 if tasks:
-                    for task in tasks:
+                    async for task in tasks:
                         yield task
 
     @staticmethod
-    async def get_new_stream_url(original_url) -> str | None:
-        loop = asyncio.get_event_loop()
+    async def get_new_stream_url(
+        original_url, guild_id: str | None = None
+    ) -> tuple[str, str | None] | None:
+        """
+        A freshly extracted stream url of ``original_url`` and its acodec, None if
+        the extraction gave no playable url.
+        """
         if any([invalid in original_url for invalid in ["Unknown"]]):
             return
-        with YoutubeDL(ytldl_single_url_options) as ytdl:
-            print(f"getting new stream for {original_url=}")
-            data = await loop.run_in_executor(
-                None,
-                lambda: ytdl.extract_info(original_url, download=False),
-            )
-            if data is None:
-                return
-            if "enttries" in data:
-                raise NotImplementedError("f")
-            if isinstance(data, dict):
-                new_url = data.get("url", None)
-                if new_url:
-                    if "Unknown" in new_url:
-                        raise NotImplementedError("f")
-                    if isinstance(new_url, str):
-                        return new_url
+        data = await extract_info(
+            original_url,
+            "single",
+            refresh=True,
+            priority=ExtractionPriority.REFRESH,
+            guild_id=guild_id,
+        )
+        if not isinstance(data, dict) or "entries" in data:
+            return
+        new_url = data.get("url", None)
+        if not isinstance(new_url, str) or "Unknown" in new_url:
+            return
+        acodec = data.get("acodec")
+        track_store.put_stream_url(original_url, new_url, acodec)  # pyright: ignore[reportUnknownArgumentType]
+        return new_url, acodec  # pyright: ignore[reportUnknownVariableType]
+
+    def _remaining_active_time(self) -> float:
+        if self.active_track is None or self._playback_started_at is None:
+            return 0.0
+        elapsed = time.monotonic() - self._playback_started_at
+        return max(0.0, (self.active_track.length or 0) - elapsed)
+
+    def schedule_prefetch(self) -> None:
+        """
+        Resolve the stream urls of the next ``PREFETCH_COUNT`` queued tracks in the
+        background, so starting them doesn't wait on extraction.
+        A track is resolved again if its url would expire before it is expected to end.
+        """
+        expected_start = time.time() + self._remaining_active_time()
+        for track in self.queue.head(PREFETCH_COUNT):
+            if isinstance(track, PlaylistCursor):
+                # extract the next window into the cache, nothing after it is known yet
+                self._start_prefetch(track)
+                break
+            if self._needs_fetch(track, expected_start):
+                self._start_prefetch(track)
+            expected_start += track.length or 0
+
+    def _start_prefetch(self, track: QueueEntry) -> asyncio.Task[None]:
+        key = id(track)
+        if (task := self._prefetches.get(key)) is not None:
+            return task
+        task = asyncio.create_task(self._prefetch(track))
+        self._prefetches[key] = task
+        task.add_done_callback(lambda _: self._prefetches.pop(key, None))
+        return task
+
+    @staticmethod
+    def _needs_fetch(track: Track, expected_start: float) -> bool:
+        if not track.fetched or not track.data_url or "Unknown" in track.data_url:
+            return True
+        return track.expires_before(expected_start + (track.length or 0))
+
+    async def _prefetch(self, track: QueueEntry) -> None:
+        try:
+            if isinstance(track, PlaylistCursor):
+                _ = await self._extract_window(track, ExtractionPriority.BACKGROUND)
+            elif not track.fetched:
+                _ = await track.fetch(guild_id=self.guild_id)
+            elif stream := await self.get_new_stream_url(
+                track.original_url, guild_id=self.guild_id
+            ):
+                track.data_url, track.acodec = stream
+                stream_refreshes.inc(reason="expiring")
+        except Exception as e:  # noqa: BLE001 play_next fetches it again
+            print(f"prefetch of {track.original_url} failed: {e}")
+
+    async def _extract_window(
+        self, cursor: PlaylistCursor, priority: ExtractionPriority
+    ) -> list[dict[str, Any]]:
+        data = await extract_info(
+            cursor.url,
+            "playlist",
+            priority=priority,
+            guild_id=self.guild_id,
+            playlist_items=cursor.window(),
+        )
+        if not isinstance(data, dict):
+            return []
+        return [entry for entry in data.get("entries") or [] if isinstance(entry, dict)]
+
+    async def _expand_playlist(self, cursor: PlaylistCursor) -> QueueEntry | None:
+        """
+        Put the next window of ``cursor`` in front of the queue and pop its first entry.
+        """
+        if prefetch := self._prefetches.get(id(cursor)):
+            await prefetch
+        try:
+            entries = await self._extract_window(cursor, ExtractionPriority.INTERACTIVE)
+        except Exception as e:  # noqa: BLE001 the cursor is skipped, not the queue
+            print(f"expanding playlist {cursor.url} failed: {e}")
+            entries = []
+        tracer.annotate(playlist_items=cursor.window(), playlist_entries=len(entries))
+        cursor.advance(len(entries))
+        hydrate_limit = asyncio.Semaphore(PLAYLIST_HYDRATE_CONCURRENCY)
+
+        async def hydrate(entry: dict[str, Any]) -> Track | None:
+            async with hydrate_limit:
+                return await self.create_track(
+                    entry, fetch_sts=False, resolve_missing=True, guild_id=self.guild_id
+                )
 
+        tracks = [
+            track
+            for track in await asyncio.gather(*(hydrate(entry) for entry in entries))
+            if track
+        ]
+        for track in tracks:
+            track.requested_by = cursor.requested_by
+        if entries and not cursor.exhausted:
+            self.queue.appendleft(cursor)
+        self.queue.insert_many(0, tracks)
+        return self.queue.popleft()
+
+    @tracer.traced("search_and_display_buttons")
     async def search_and_display_buttons(
         self, interaction: discord.Interaction, query: str
     ):
         tracks = await self.tracks_from_search(query)
 
         if tracks:
-            view = PlayButtonView(ytdl_handler=self, tracks=filter(None, tracks))
+            tracks = [track for track in tracks if track]
+            view = PlayButtonView(ytdl_handler=self, tracks=tracks)
             content = "\n".join(view.trk_list)
 
-            await interaction.edit_original_response(content=content, view=view)
+            await outbound.edit(interaction, content=content, view=view)
+            # resolve the likely picks while the buttons are on screen,
+            # play_next awaits these instead of extracting again
+            for track in tracks[:SPECULATIVE_RESOLVE_COUNT]:
+                self._start_prefetch(track)
         else:
-            await interaction.edit_original_response(content="No results found.")
+            await outbound.edit(interaction, content="No results found.")
 
+    def enqueue(
+        self, tracks: Iterable[QueueEntry], requester: discord.abc.User | None
+    ) -> int:
+        """
+        Append ``tracks`` in one queue operation and return how many were added.
+        Starting playback is up to the caller, one ``play_next`` per batch.
+        """
+        added = list(tracks)
+        for track in added:
+            track.requester = requester
+        self.queue.extend(added)
+        self.schedule_prefetch()
+        return len(added)
+
+    @tracer.traced("handle_track")
     async def handle_track(
         self, interaction: discord.Interaction, track: Track
     ) -> None:
-        track.requester = interaction.user
-
-        await self.queue.append(track)
+        _ = self.enqueue((track,), interaction.user)
         try:
             await interaction.response.send_message(
                 content=f"Added to queue: {track.title} now queue has {len(self.queue)} tracks",
@@ -422,68 +1210,137 @@ class YTDLHandler:
             )
 
         except discord.errors.InteractionResponded:
-            await interaction.edit_original_response(
-                content=f"Added to queue: {track.title} now queue has {len(self.queue)} tracks"
+            await outbound.edit(
+                interaction,
+                content=f"Added to queue: {track.title} now queue has {len(self.queue)} tracks",
             )
 
         await self.play_next(interaction)
 
+    @tracer.traced("handle_url")
     async def handle_url(
         self,
         interaction: discord.Interaction,
         url: str,
     ) -> None:
-        counter = 0
-
+        """
+        Queue the track or playlist behind ``url``.
+
+        Playlist entries are hydrated concurrently (at most
+        ``PLAYLIST_HYDRATE_CONCURRENCY`` at once) while the entries are still being
+        walked, and appended to the queue in playlist order in batches of
+        ``PLAYLIST_BATCH_SIZE``. The first batch is flushed as soon as the first
+        entry resolves, so playback starts without waiting for the rest.
+        Past the first window the playlist is queued as one ``PlaylistCursor``.
+        Progress edits go through a ``ProgressReporter``, at most one per
+        ``PROGRESS_EDIT_INTERVAL``.
+        """
         added_trk_list: list[str | None] = []
-
-        async for new_track_cr, is_plist in self.generate_track_or_que_urls(url):
-            new_track = await new_track_cr
-
-            if interaction.is_expired():
+        reporter = ProgressReporter(interaction)
+
+        hydrate_limit = asyncio.Semaphore(PLAYLIST_HYDRATE_CONCURRENCY)
+        # hydrate tasks with the coroutine each one awaits, to close the ones
+        # that never started
+        pending: deque[
+            tuple[
+                asyncio.Task[QueueEntry | None],
+                Coroutine[Any, Any, QueueEntry | None],
+            ]
+        ] = deque()
+        batch: list[QueueEntry] = []
+
+        async def hydrate(
+            track_cr: Coroutine[Any, Any, QueueEntry | None],
+        ) -> QueueEntry | None:
+            async with hydrate_limit:
+                return await track_cr
+
+        async def flush() -> None:
+            if not batch:
                 return
+            first = not added_trk_list
+            _ = self.enqueue(batch, interaction.user)
+            added_trk_list.extend(track.title for track in batch)
+            batch.clear()
+            reporter.update(
+                f"added {len(added_trk_list)} tracks from playlist, now queue has {len(self.queue)} tracks"
+            )
+            if first:
+                # the one kick for the playlist, the player picks up later batches
+                await self.play_next(interaction)
+
+        async def collect(wait: bool) -> None:
+            while pending and (wait or pending[0][0].done()):
+                new_track = await pending.popleft()[0]
+                if not new_track:
+                    continue
+                batch.append(new_track)
+                if len(batch) >= PLAYLIST_BATCH_SIZE or not added_trk_list:
+                    await flush()
 
-            if not new_track:
-                await interaction.edit_original_response(
-                    content="Failed to get track info."
-                )
-                continue
-            if is_plist:
-                counter += 1
-
-                if counter >= 100:
-                    await interaction.edit_original_response(
-                        content="Playlist is too large, only the first 100 tracks have been added."
-                    )
-                    break
+        try:
+            async for new_track_cr, is_plist in self.generate_track_or_que_urls(
+                url, guild_id=self.guild_id
+            ):
+                if interaction.is_expired():
+                    _close_unstarted(new_track_cr)
+                    return
+
+                if not is_plist:
+                    new_track = await new_track_cr
+                    if not isinstance(new_track, Track):
+                        await outbound.edit(
+                            interaction, content="Failed to get track info."
+                        )
+                        continue
+                    await self.handle_track(interaction, new_track)
+                    continue
 
-            await self.handle_track(interaction, new_track)
+                pending.append(
+                    (asyncio.create_task(hydrate(new_track_cr)), new_track_cr)
+                )
+                await collect(wait=False)
 
-            added_trk_list.append(new_track.title)
+            await collect(wait=True)
+            if interaction.is_expired():
+                return
+            await flush()
+        finally:
+            for task, track_cr in pending:
+                _ = task.cancel()
+                _close_unstarted(track_cr)
+            if interaction.is_expired():
+                # drop the pending edit, it can't be sent anymore
+                await reporter.close()
 
         if len(added_trk_list) > 1:
-            await interaction.edit_original_response(
-                content=" added tracks to que from playlist\n"
-                + "\n".join(
-                    f"{indx}. {title}" for indx, title in enumerate(added_trk_list)
-                )
+            listed = "\n".join(
+                f"{indx}. {title}"
+                for indx, title in enumerate(added_trk_list[:PLAYLIST_SUMMARY_LINES])
             )
+            if len(added_trk_list) > PLAYLIST_SUMMARY_LINES:
+                listed += (
+                    f"\n... and {len(added_trk_list) - PLAYLIST_SUMMARY_LINES} more"
+                )
+            await reporter.close(" added tracks to que from playlist\n" + listed)
+        else:
+            await reporter.close()
 
-            await self.play_next(interaction)
-
+    @tracer.traced("handler.play")
     async def play(
         self, interaction: discord.Interaction, query_or_url: str | None = None
     ) -> None:
-        await interaction.edit_original_response(content="Loading...")
+        await outbound.edit(interaction, content="Loading...")
 
-        if query_or_url:
-            is_url = urlparse(query_or_url).scheme
-            if is_url:
-                await self.handle_url(interaction, query_or_url)
-            else:
-                await self.search_and_display_buttons(interaction, query_or_url)
+        with play_seconds.time():
+            if query_or_url:
+                is_url = urlparse(query_or_url).scheme
+                if is_url:
+                    await self.handle_url(interaction, query_or_url)
+                else:
+                    await self.search_and_display_buttons(interaction, query_or_url)
 
-        await self.resume_playback(interaction)
+            await self.resume_playback(interaction)
 
     async def resume_playback(self, interaction: discord.Interaction):
         self.paused = False
@@ -491,42 +1348,83 @@ class YTDLHandler:
         if self.queue and not self.voice_client.is_playing():  # pyright: ignore[reportAttributeAccessIssue]
             await self.play_next(interaction)
 
+    @tracer.traced("play_next")
     async def play_next(self, interaction: discord.Interaction) -> None:
+        try:
+            await self._start_next(interaction)
+        finally:
+            # the idle deadline is only armed by playback stopping, every way
+            # out that didn't start audio has to say so
+            if not self.voice_client.is_playing():  # pyright: ignore[reportAttributeAccessIssue]
+                self._notify_playback(False)
+
+    async def _start_next(self, interaction: discord.Interaction) -> None:
         if not self.queue:
-            print(f"{len(self.queue)=} and {self.queue=} is empty")
-
-            await interaction.edit_original_response(content="Queue is empty.")
+            await outbound.edit(interaction, content="Queue is empty.")
             return
 
         if not self.voice_client.is_connected():  # pyright: ignore[reportAttributeAccessIssue]
-            await interaction.edit_original_response(
-                content="Not connected to a voice channel."
+            await outbound.edit(
+                interaction, content="Not connected to a voice channel."
             )
             return
 
         if self.voice_client.is_playing():  # pyright: ignore[reportAttributeAccessIssue]
             return
 
-        self.active_track = await self.queue.pop(0)
+        picked_at = time.perf_counter()
+        entry = self.queue.popleft()
+        while isinstance(entry, PlaylistCursor):
+            entry = await self._expand_playlist(entry)
+        self.active_track = entry
+        self._resumed_at = 0.0
+        self._stream_resumed = False
 
         if not self.active_track:
-            await interaction.edit_original_response(content="No track to play.")
+            await outbound.edit(interaction, content="No track to play.")
             return
-        if (
-            self.active_track.data_url is None
-            or "Unknown" in self.active_track.data_url
-            or not self.active_track.fetched
+        tracer.annotate(url=self.active_track.original_url)
+        # ended by the player thread once audio flows, or by _play_next
+        first_packet = tracer.start_span("first_packet")
+        self._first_packet_span = first_packet
+        cached_path = audio_cache.path_for(self.active_track.original_url)
+        if cached_path is None:
+            if prefetch := self._prefetches.get(id(self.active_track)):
+                await prefetch
+            if (
+                self.active_track.data_url is None
+                or "Unknown" in self.active_track.data_url
+                or not self.active_track.fetched
+            ):
+                if not await self.active_track.fetch(guild_id=self.guild_id):
+                    await outbound.edit(
+                        interaction, content="have some struggles with youtube"
+                    )
+            # ffmpeg keeps the url it starts with and reconnects mid track to
+            # it, so it has to last until the end; prefetch refreshes such urls
+            # ahead of time, this only waits if that didn't happen
+            if self.active_track.expires_before(
+                time.time() + (self.active_track.length or 0)
+            ):
+                await self._start_prefetch(self.active_track)
+
+        source = "cache" if cached_path else "stream"
+        first_packet.set(source=source)
+        if cached_path is None and PLAYBACK_OPUS_PASSTHROUGH:
+            # a PCM stream has no Ogg/Opus bytes to copy, it stays uncached
+            self._cache_fill = audio_cache.fill(
+                self.active_track.original_url, self.active_track.length
+            )
+        with (
+            ffmpeg_spawn_seconds.time(source=source),
+            tracer.span("ffmpeg_spawn", source=source),
         ):
-            if not await self.active_track.fetch():
-                await interaction.edit_original_response(
-                    content="have some struggles with youtube"
-                )
-
-        self.active_playback = discord.FFmpegPCMAudio(
-            self.active_track.data_url,
-            pipe=False,
-            stderr=stderr.buffer,
-            **ffmpeg_options,
+            self.active_playback = self._spawn_source(
+                self.active_track, cached_path, fill=self._cache_fill
+            )
+        self.active_playback = _FirstPacketTimer(
+            self.active_playback,
+            lambda: self._first_packet(picked_at, source, first_packet),
         )
         try:
             self.voice_client.play(  # pyright: ignore[reportAttributeAccessIssue]
@@ -534,21 +1432,20 @@ class YTDLHandler:
             )
 
             self.paused = False
+            self._playback_started_at = time.monotonic()
+            self._notify_playback(True)
+            self.schedule_prefetch()
 
-            await interaction.edit_original_response(
-                content=f"Playing: {self.active_track.title}"
+            await outbound.edit(
+                interaction, content=f"Playing: {self.active_track.title}"
             )
 
         except Exception as e:
             print(f"Failed to play track: {e}")
-            asyncio.run(
-                interaction.edit_original_response(
-                    content="have networking issue retrying"
-                )
-            )
+            await outbound.edit(interaction, content="have networking issue retrying")
 
             if "http" in str(e):
-                await self.active_track.fetch()
+                await self.active_track.fetch(guild_id=self.guild_id)
             try:
                 self.voice_client.play(  # pyright: ignore[reportAttributeAccessIssue]
                     self.active_playback,
@@ -556,42 +1453,222 @@ class YTDLHandler:
                 )
 
                 self.paused = False
+                self._notify_playback(True)
 
-                await interaction.edit_original_response(
-                    content=f"Playing: {self.active_track.title}"
+                await outbound.edit(
+                    interaction, content=f"Playing: {self.active_track.title}"
                 )
 
             except Exception as e:
                 print(f"Failed to play track after refreshing data URL: {e}")
-            else:
-                await interaction.edit_original_response(
-                    content="Failed to play track."
-                )
+                await outbound.edit(interaction, content="Failed to play track.")
+                if self._cache_fill is not None:
+                    self._cache_fill.discard()
+                    self._cache_fill = None
+
+    def _spawn_source(
+        self,
+        track: Track,
+        cached_path: str | None,
+        start: float = 0.0,
+        fill: CacheFill | None = None,
+    ) -> discord.AudioSource:
+        """
+        The audio source of ``track``; a streamed one has its ffmpeg stderr
+        watched for a refused url, in ``_ffmpeg_stderr``.
+        """
+        ffmpeg_stderr = None if cached_path else _FFmpegStderr()
+        try:
+            source = self._audio_source(
+                track,
+                cached_path,
+                ffmpeg_stderr.writer if ffmpeg_stderr else stderr.buffer,
+                start,
+                fill,
+            )
+        except BaseException:
+            if ffmpeg_stderr is not None:
+                ffmpeg_stderr.close()
+            raise
+        if ffmpeg_stderr is not None:
+            ffmpeg_stderr.start()
+        self._ffmpeg_stderr = ffmpeg_stderr
+        return source
+
+    @staticmethod
+    def _audio_source(
+        track: Track,
+        cached_path: str | None,
+        ffmpeg_stderr: IO[bytes],
+        start: float = 0.0,
+        fill: CacheFill | None = None,
+    ) -> discord.AudioSource:
+        """
+        Cached files and opus streams are remuxed to Ogg/Opus without decoding and
+        sent as is; anything else is transcoded to opus by ffmpeg. With
+        ``PLAYBACK_OPUS_PASSTHROUGH`` off, ffmpeg decodes to PCM and discord.py encodes.
+        A stream is read from ``start`` seconds in, and its Ogg output copied
+        into ``fill``.
+        """
+        options = ffmpeg_local_options if cached_path else ffmpeg_options
+        if start and not cached_path:
+            options = {
+                **options,
+                "before_options": f"-ss {start:.2f} {options['before_options']}",
+            }
+        if not PLAYBACK_OPUS_PASSTHROUGH:
+            return discord.FFmpegPCMAudio(
+                cached_path or track.data_url,
+                pipe=False,
+                stderr=ffmpeg_stderr,
+                **options,
+            )
+        if cached_path is not None:
+            return discord.FFmpegOpusAudio(
+                cached_path,
+                codec="copy",
+                stderr=ffmpeg_stderr,
+                **options,
+            )
+        if fill is not None:
+            return _CachingOpusAudio(
+                track.data_url,
+                fill,
+                codec="copy" if track.is_opus else None,
+                stderr=ffmpeg_stderr,
+                **options,
+            )
+        return discord.FFmpegOpusAudio(
+            track.data_url,
+            codec="copy" if track.is_opus else None,
+            stderr=ffmpeg_stderr,
+            **options,
+        )
+
+    def _first_packet(self, picked_at: float, source: str, span: Span) -> None:
+        # player thread
+        span.end()
+        now = time.perf_counter()
+        first_packet_seconds.observe(now - picked_at, source=source)
+        ended_at, self._track_ended_at = self._track_ended_at, None
+        if ended_at is not None:
+            track_gap_seconds.observe(now - ended_at)
 
     def _play_next(self, interaction: discord.Interaction, error):
+        if self._first_packet_span is not None:
+            # no-op if audio flowed
+            self._first_packet_span.end(
+                error=str(error) if error else "stopped before any audio"
+            )
+            self._first_packet_span = None
+        if (fill := self._cache_fill) is not None:
+            self._cache_fill = None
+            playback = self.active_playback
+            played_out = (
+                not error
+                and self.active_track is not None
+                and isinstance(playback, _FirstPacketTimer)
+                and playback.ran_dry
+                and playback.position
+                >= (self.active_track.length or 0) - _FILL_LENGTH_SLACK
+            )
+            # a skipped, failed or refused stream ends short of the track length
+            self.bot.loop.call_soon_threadsafe(
+                fill.commit if played_out else fill.discard
+            )
+        if self._refused_stream_resumed(interaction):
+            return
         if error:
-            asyncio.run(
-                interaction.edit_original_response(
-                    content="probably networking (youtube) issue"
-                )
+            outbound.edit_threadsafe(
+                self.bot.loop,
+                interaction,
+                content="probably networking (youtube) issue",
             )
             print(f"Player error: {error}")
 
-        if self.loop and self.active_track:
-            _ = asyncio.run_coroutine_threadsafe(
-                self.queue.append(self.active_track), self.bot.loop
-            )
+        looped = self.loop and self.active_track is not None
+        if looped:
+            self.bot.loop.call_soon_threadsafe(self.queue.append, self.active_track)
 
-        if self.queue:
+        if self.queue or looped:
+            self._track_ended_at = time.perf_counter()
             asyncio.run_coroutine_threadsafe(
                 self.play_next(interaction=interaction), self.bot.loop
             )
+        else:
+            self.bot.loop.call_soon_threadsafe(self._notify_playback, False)
+
+    def _refused_stream_resumed(self, interaction: discord.Interaction) -> bool:
+        """
+        Whether the active track's stream ran dry because ffmpeg got an HTTP
+        403 / 410 (the url expired or was revoked) and is resumed from where it
+        stopped on a new url, once per track. Player thread.
+        """
+        playback, ffmpeg_stderr = self.active_playback, self._ffmpeg_stderr
+        if (
+            self._stream_resumed
+            or self.active_track is None
+            or ffmpeg_stderr is None
+            or not isinstance(playback, _FirstPacketTimer)
+            or not playback.ran_dry
+        ):
+            return False
+        # stdout closed, ffmpeg is exiting; its error may still be in the pipe
+        status = ffmpeg_stderr.wait(timeout=1.0)
+        if status is None:
+            return False
+        self._stream_resumed = True
+        _ = asyncio.run_coroutine_threadsafe(
+            self._resume_stream(
+                interaction,
+                self.active_track,
+                status,
+                self._resumed_at + playback.position,
+            ),
+            self.bot.loop,
+        )
+        return True
+
+    @tracer.traced("stream_resume")
+    async def _resume_stream(
+        self,
+        interaction: discord.Interaction,
+        track: Track,
+        status: int,
+        position: float,
+    ) -> None:
+        stream_refreshes.inc(reason=f"http_{status}")
+        tracer.annotate(url=track.original_url, status=status, position=int(position))
+        try:
+            stream = await self.get_new_stream_url(
+                track.original_url, guild_id=self.guild_id
+            )
+            if stream is None:
+                raise RuntimeError("no new stream url")
+            # the new format may differ, e.g. no longer opus to copy
+            track.data_url, track.acodec = stream
+            self._resumed_at = position
+            self.active_playback = _FirstPacketTimer(
+                self._spawn_source(track, None, start=position)
+            )
+            self.voice_client.play(  # pyright: ignore[reportAttributeAccessIssue]
+                self.active_playback, after=lambda e: self._play_next(interaction, e)
+            )
+            self._playback_started_at = time.monotonic() - position
+            self._notify_playback(True)
+        except Exception as e:  # noqa: BLE001 handed to _play_next like a player error
+            self._play_next(interaction, e)
+
+    def _notify_playback(self, playing: bool) -> None:
+        if self.on_playback_change is not None and self.guild_id is not None:
+            self.on_playback_change(self.guild_id, playing)
 
     async def pause(self, interaction: discord.Interaction):
         if self.voice_client.is_playing():  # pyright: ignore[reportAttributeAccessIssue]
             self.voice_client.pause()  # pyright: ignore[reportAttributeAccessIssue]
 
             self.paused = True
+            self._notify_playback(False)
 
             if self.active_track:
                 await interaction.response.send_message(
@@ -609,6 +1686,7 @@ class YTDLHandler:
             self.voice_client.resume()  # pyright: ignore[reportAttributeAccessIssue]
 
             self.paused = False
+            self._notify_playback(bool(self.voice_client.is_playing()))  # pyright: ignore[reportAttributeAccessIssue]
 
             if self.active_track:
                 await interaction.response.send_message(
@@ -628,7 +1706,7 @@ class YTDLHandler:
         if self.voice_client.is_playing() or self.voice_client.is_paused():  # pyright: ignore[reportAttributeAccessIssue]
             self.voice_client.stop()  # pyright: ignore[reportAttributeAccessIssue]
 
-            await self.queue.clear()
+            self.queue.clear()
 
             self.paused = True
 
@@ -659,16 +1737,18 @@ class YTDLHandler:
                     "Skipped: " + trk_title, ephemeral=True
                 )
             else:
-                trk_titles: list[str] = []
-
                 if count > 0:
-                    element_range = range(count - 1)
+                    # the playing track is the first one skipped
+                    first_indx = 0
+                    skipped_trks = self.queue.skip(count - 1)
                 else:
-                    element_range = range(len(self.queue) - 1, count, -1)
-                for indx in element_range:
-                    skipped_trk = await self.queue.pop(indx)
-                    if skipped_trk:
-                        trk_titles.append(f"{indx}. {skipped_trk.title or 'Unknown'}")
+                    # negative counts drop tracks from the end of the queue
+                    first_indx = max(0, len(self.queue) + count)
+                    skipped_trks = self.queue.remove_range(first_indx, len(self.queue))
+                trk_titles = [
+                    f"{indx}. {skipped_trk.title or 'Unknown'}"
+                    for indx, skipped_trk in enumerate(skipped_trks, first_indx)
+                ]
 
                 await interaction.response.send_message(
                     f"first {count} items skipped from queuee \n"
@@ -710,7 +1790,7 @@ class YTDLHandler:
             embed_msg = self.active_track.msg_embed(
                 position=pos,
                 title=embd_title,
-                queue=self.queue,
+                queue=self.queue_pages,
             )
         else:
             embed_msg = embed_msg.add_field(name="Currently playing", value="Nothing")
@@ -720,28 +1800,28 @@ class YTDLHandler:
     async def show_queue(
         self, interaction: discord.Interaction, is_followup: bool = False
     ) -> None:
-        embed = discord.Embed(title="Queue", color=discord.Color.blurple())
-
-        if self.queue:
-            embed = embed.add_field(
-                name="Currently playing",
-                value=self.active_track.title if self.active_track else "Nothing",
-            ).add_field(
-                name="Queue",
-                value="\n".join(
-                    [f"{i+1}. {track.title}" for i, track in enumerate(self.queue)]
-                ),
-            )
-        else:
-            embed = embed.add_field(name="Queue", value="Empty")
+        if not self.queue:
+            embed = discord.Embed(
+                title="Queue", color=discord.Color.blurple()
+            ).add_field(name="Queue", value="Empty")
+            if is_followup:
+                await interaction.followup.send(embed=embed)
+                return
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
 
+        view = QueuePageView(
+            self.queue_pages, self.active_track.title if self.active_track else None
+        )
         if is_followup:
-            await interaction.followup.send(embed=embed)
+            await interaction.followup.send(embed=view.embed(), view=view)
             return
 
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.response.send_message(
+            embed=view.embed(), view=view, ephemeral=True
+        )
 
     async def clear_queue(self, interaction: discord.Interaction) -> None:
-        await self.queue.clear()
+        self.queue.clear()
 
         await interaction.response.send_message("Queue cleared.", ephemeral=True)
@@ -0,0 +1,125 @@
+import queue
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+_UNSET = object()
+
+_yt_dlp_lock = threading.Lock()
+
+_youtube_dl_class: Any = None
+
+
+def load_yt_dlp() -> Any:
+    """
+    The ``YoutubeDL`` class, importing ``yt_dlp`` on first use; the import
+    (extractor registry, networking, cookies) is most of the bot's cold start.
+    Every instance built after it sends a random user agent.
+    """
+    global _youtube_dl_class
+    with _yt_dlp_lock:
+        if _youtube_dl_class is None:
+            import yt_dlp
+            from yt_dlp.utils.networking import random_user_agent
+
+            yt_dlp.std_headers["User-Agent"] = random_user_agent()
+            _youtube_dl_class = yt_dlp.YoutubeDL
+        return _youtube_dl_class
+
+
+def youtube_dl(options: dict[str, Any]) -> Any:
+    return load_yt_dlp()(options)
+
+
+class YoutubeDLPool:
+    """
+    Bounded pool of long lived ``YoutubeDL`` instances sharing one option dict.
+
+    Building a ``YoutubeDL`` sets up the extractor registry, cookie jar, request
+    handlers and headers; keeping the instances around pays that once and lets
+    each instance's request handler keep its HTTP connections to a host alive.
+    An instance is only ever used by the thread that checked it out, checkouts
+    block (in the executor thread) while all ``size`` instances are busy.
+    """
+
+    def __init__(
+        self,
+        options: dict[str, Any],
+        size: int,
+        factory: Callable[[dict[str, Any]], Any] = youtube_dl,
+    ):
+        self.options = options
+        self.size = size
+        self.factory = factory
+        self._idle: queue.LifoQueue[Any] = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> Any:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                return self.factory(self.options)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        return self._idle.get()
+
+    def warm(self) -> None:
+        """
+        Build the first instance now, unless the pool has one already.
+        """
+        with self._lock:
+            if self._created:
+                return
+        with self.checkout():
+            pass
+
+    @contextmanager
+    def checkout(self) -> Iterator[Any]:
+        ytdl = self._acquire()
+        try:
+            yield ytdl
+        finally:
+            self._idle.put(ytdl)
+
+    def extract_info(self, url: str, overrides: dict[str, Any] | None = None) -> Any:
+        """
+        Blocking, meant to run in an executor thread.
+        ``overrides`` replace option values (e.g. ``playlist_items``) for this call only.
+        """
+        with self.checkout() as ytdl:
+            if not overrides:
+                return ytdl.extract_info(url, download=False)
+            saved = {key: ytdl.params.get(key, _UNSET) for key in overrides}
+            ytdl.params.update(overrides)
+            try:
+                return ytdl.extract_info(url, download=False)
+            finally:
+                for key, value in saved.items():
+                    if value is _UNSET:
+                        _ = ytdl.params.pop(key, None)
+                    else:
+                        ytdl.params[key] = value
+
+    def close(self) -> None:
+        while True:
+            try:
+                ytdl = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._created -= 1
+            if hasattr(ytdl, "close"):
+                ytdl.close()
@@ -0,0 +1,186 @@
+"""
+Record / replay stand-ins for ``YoutubeDL``, used as ``YoutubeDLPool`` factories.
+
+``RecordingYoutubeDL`` extracts for real and saves every result as a fixture,
+``ReplayYoutubeDL`` answers from those fixtures without network access, with
+optional injected latency and errors. ``use_ytdl_factory`` in
+``yt_dlp_streamer`` swaps the factory of every option profile; the bot does it
+on start when one of these is set:
+
+    MUSCPY_YTDL_RECORD=fixtures/ python -m muscpy
+    MUSCPY_YTDL_REPLAY=fixtures/ python -m muscpy
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from muscpy.ytdl_pool import load_yt_dlp
+
+RECORD_ENV = "MUSCPY_YTDL_RECORD"
+REPLAY_ENV = "MUSCPY_YTDL_REPLAY"
+
+# options changing what extract_info returns for the same url
+_KEY_PARAMS = ("noplaylist", "playlist_items", "extract_flat")
+
+
+class FixtureStore:
+    """
+    One JSON file per extraction, named after the url and the result shaping
+    options, holding ``{"url", "params", "data"}``.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._by_url: dict[str, str] | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url: str, params: dict[str, Any]) -> str:
+        shaping = json.dumps([url, [params.get(name) for name in _KEY_PARAMS]])
+        return hashlib.sha1(shaping.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def save(self, url: str, params: dict[str, Any], data: Any) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        key = self.key(url, params)
+        fixture = {
+            "url": url,
+            "params": {name: params.get(name) for name in _KEY_PARAMS},
+            "data": data,
+        }
+        with open(self._path(key), "w", encoding="utf-8") as f:
+            json.dump(fixture, f)
+        with self._lock:
+            if self._by_url is not None:
+                self._by_url[url] = key
+
+    def _index(self) -> dict[str, str]:
+        with self._lock:
+            if self._by_url is None:
+                self._by_url = {}
+                for name in sorted(os.listdir(self.directory)):
+                    if not name.endswith(".json"):
+                        continue
+                    with open(
+                        os.path.join(self.directory, name), encoding="utf-8"
+                    ) as f:
+                        fixture = json.load(f)
+                    if isinstance(fixture, dict) and "url" in fixture:
+                        self._by_url[fixture["url"]] = name.removesuffix(".json")
+            return self._by_url
+
+    def recorded(self) -> list[str]:
+        """
+        Every url with a fixture.
+        """
+        return list(self._index())
+
+    def load(self, url: str, params: dict[str, Any]) -> Any:
+        """
+        The fixture recorded with the same options, else any fixture of ``url``.
+        Raises ``KeyError`` if ``url`` was never recorded.
+        """
+        path = self._path(self.key(url, params))
+        if not os.path.exists(path):
+            key = self._index().get(url)
+            if key is None:
+                raise KeyError(url)
+            path = self._path(key)
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["data"]
+
+
+class RecordingYoutubeDL:
+    """
+    A real ``YoutubeDL`` saving every successful ``extract_info`` result.
+    """
+
+    def __init__(self, options: dict[str, Any], store: FixtureStore):
+        self._ytdl = load_yt_dlp()(options)
+        self.store = store
+
+    @property
+    def params(self) -> dict[str, Any]:
+        return self._ytdl.params
+
+    def extract_info(self, url: str, download: bool = False) -> Any:
+        data = self._ytdl.extract_info(url, download=download)
+        if data is not None:
+            self.store.save(url, self.params, self._ytdl.sanitize_info(data))
+        return data
+
+    def close(self) -> None:
+        self._ytdl.close()
+
+
+class ReplayYoutubeDL:
+    """
+    Answers ``extract_info`` from recorded fixtures.
+
+    Every call sleeps ``latency`` seconds (± ``jitter`` of it) in the calling
+    thread, like a network round trip would, and fails with ``DownloadError`` at
+    ``error_rate``; unrecorded urls always fail. Results are fresh copies, so
+    callers may mutate them.
+    """
+
+    def __init__(
+        self,
+        options: dict[str, Any],
+        store: FixtureStore,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rng: random.Random | None = None,
+    ):
+        self.params = dict(options)
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = rng or random.Random()
+        self.calls = 0
+
+    def extract_info(self, url: str, download: bool = False) -> Any:
+        # imported here, bot_main imports this module before yt_dlp is needed
+        from yt_dlp.utils import DownloadError
+
+        self.calls += 1
+        if self.latency > 0:
+            spread = self.latency * self.jitter
+            time.sleep(max(0.0, self.latency + self.rng.uniform(-spread, spread)))
+        if self.error_rate > 0 and self.rng.random() < self.error_rate:
+            raise DownloadError(f"replay: injected error for {url}")
+        try:
+            return self.store.load(url, self.params)
+        except KeyError:
+            raise DownloadError(f"replay: no fixture recorded for {url}") from None
+
+    def close(self) -> None:
+        pass
+
+
+def recording_factory(directory: str) -> Callable[[dict[str, Any]], Any]:
+    store = FixtureStore(directory)
+    return lambda options: RecordingYoutubeDL(options, store)
+
+
+def replay_factory(
+    directory: str,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    seed: int | None = None,
+) -> Callable[[dict[str, Any]], Any]:
+    store = FixtureStore(directory)
+    rng = random.Random(seed)
+    return lambda options: ReplayYoutubeDL(
+        options, store, latency, jitter, error_rate, random.Random(rng.random())
+    )
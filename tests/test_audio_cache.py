@@ -0,0 +1,62 @@
+import io
+
+from muscpy.audio_cache import AudioCache
+
+_URL = "https://www.youtube.com/watch?v=video00001"
+
+
+def _cache(directory, byte_budget=1000) -> AudioCache:
+    cache = AudioCache(str(directory), byte_budget=byte_budget, max_track_seconds=600)
+    cache.open()
+    return cache
+
+
+def _play(fill, data: bytes) -> bytes:
+    stream = fill.tee(io.BytesIO(data))
+    read = b""
+    while chunk := stream.read(7):
+        read += chunk
+    return read
+
+
+def test_a_played_out_stream_is_stored_from_the_streamed_bytes(tmp_path):
+    cache = _cache(tmp_path)
+    fill = cache.fill(_URL, 200)
+    assert fill is not None
+    assert cache.fill(_URL, 200) is None  # one fill per track at a time
+    assert _play(fill, b"OggS audio") == b"OggS audio"
+    assert cache.path_for(_URL) is None
+    fill.commit()
+    path = cache.path_for(_URL)
+    assert path is not None
+    with open(path, "rb") as file:
+        assert file.read() == b"OggS audio"
+    assert cache.total_bytes == len(b"OggS audio")
+    assert cache.fill(_URL, 200) is None  # cached already
+
+
+def test_a_discarded_stream_leaves_nothing_behind(tmp_path):
+    cache = _cache(tmp_path)
+    fill = cache.fill(_URL, 200)
+    assert fill is not None
+    _ = _play(fill, b"OggS half")
+    fill.discard()
+    fill.commit()  # too late, a no-op
+    assert cache.path_for(_URL) is None
+    assert list(tmp_path.iterdir()) == []
+    assert cache.fill(_URL, 200) is not None
+
+
+def test_long_tracks_are_not_cached_and_the_budget_evicts_lru(tmp_path):
+    cache = _cache(tmp_path, byte_budget=10)
+    assert cache.fill(_URL, 601) is None
+    urls = [f"https://www.youtube.com/watch?v=video{indx:05d}" for indx in range(3)]
+    for url in urls:
+        fill = cache.fill(url, 200)
+        assert fill is not None
+        _ = _play(fill, b"12345")
+        fill.commit()
+    assert cache.path_for(urls[0]) is None
+    assert cache.path_for(urls[1]) is not None
+    assert cache.path_for(urls[2]) is not None
+    assert cache.total_bytes == 10
@@ -0,0 +1,53 @@
+import os
+
+from muscpy.cluster import (
+    CLUSTER_ID_ENV,
+    CLUSTERS_ENV,
+    SHARD_COUNT_ENV,
+    SHARD_IDS_ENV,
+    ClusterSupervisor,
+    audio_cache_share,
+    is_primary_cluster,
+    shard_options,
+)
+
+
+def test_single_process_uses_the_whole_audio_cache(monkeypatch):
+    monkeypatch.delenv(CLUSTER_ID_ENV, raising=False)
+    assert audio_cache_share("audio_cache", 1000) == ("audio_cache", 1000)
+
+
+def test_clusters_split_the_audio_cache(monkeypatch):
+    supervisor = ClusterSupervisor(8, [[0, 1], [2, 3], [4, 5], [6, 7]])
+    shares = set()
+    for cluster_id in range(4):
+        env = supervisor._cluster_env(cluster_id)
+        monkeypatch.setenv(CLUSTER_ID_ENV, env[CLUSTER_ID_ENV])
+        monkeypatch.setenv(CLUSTERS_ENV, env[CLUSTERS_ENV])
+        shares.add(audio_cache_share("audio_cache", 1000))
+    assert shares == {
+        (os.path.join("audio_cache", f"cluster-{cluster_id}"), 250)
+        for cluster_id in range(4)
+    }
+
+
+def test_unconfigured_process_is_unsharded_and_primary(monkeypatch):
+    for name in (SHARD_COUNT_ENV, SHARD_IDS_ENV, CLUSTER_ID_ENV):
+        monkeypatch.delenv(name, raising=False)
+    assert shard_options() == {}
+    assert is_primary_cluster()
+
+
+def test_only_cluster_0_is_primary(monkeypatch):
+    supervisor = ClusterSupervisor(4, [[0, 1], [2, 3]])
+    primary = []
+    for cluster_id in range(2):
+        env = supervisor._cluster_env(cluster_id)
+        for name in (SHARD_COUNT_ENV, SHARD_IDS_ENV, CLUSTER_ID_ENV):
+            monkeypatch.setenv(name, env[name])
+        assert shard_options() == {
+            "shard_count": 4,
+            "shard_ids": supervisor.shard_ranges[cluster_id],
+        }
+        primary.append(is_primary_cluster())
+    assert primary == [True, False]
@@ -0,0 +1,86 @@
+import pytest
+
+from muscpy import extraction_cache
+from muscpy.extraction_cache import ExtractionCache, normalize_video_key
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        " https://youtube.com/watch?v=dQw4w9WgXcQ&t=42s ",
+        "https://m.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://music.youtube.com/watch?v=dQw4w9WgXcQ&list=PL123",
+        "https://youtu.be/dQw4w9WgXcQ?t=1",
+        "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+        "https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ",
+    ],
+)
+def test_variants_of_one_video_share_a_key(url: str):
+    assert normalize_video_key(url) == "youtube:dQw4w9WgXcQ"
+
+
+def test_playlist_part_is_kept_only_when_asked_or_alone():
+    url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL123"
+    assert (
+        normalize_video_key(url, keep_playlist=True)
+        == "youtube:playlist:PL123:dQw4w9WgXcQ"
+    )
+    assert (
+        normalize_video_key("https://www.youtube.com/playlist?list=PL123")
+        == "youtube:playlist:PL123"
+    )
+    assert normalize_video_key(" https://example.com/a.mp3 ") == (
+        "https://example.com/a.mp3"
+    )
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(extraction_cache, "time", clock)
+    return clock
+
+
+def test_least_recently_used_entry_is_evicted(clock: _Clock):
+    cache = ExtractionCache(max_entries=2, default_ttl=60, expiry_margin=10)
+    cache.set("a", {"title": "a"})
+    cache.set("b", {"title": "b"})
+    assert cache.get("a") == {"title": "a"}
+    cache.set("c", {"title": "c"})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_entries_expire_with_their_stream_url(clock: _Clock):
+    cache = ExtractionCache(max_entries=8, default_ttl=60, expiry_margin=10)
+    stream = {"url": f"https://rr1.googlevideo.com/videoplayback?expire={1000 + 30}"}
+    cache.set("stream", stream)
+    cache.set("metadata", {"title": "no stream url"})
+    clock.now += 19
+    assert cache.get("stream") == stream
+    clock.now += 1
+    assert cache.get("stream") is None
+    assert cache.get("metadata") is not None
+    clock.now += 40
+    assert cache.get("metadata") is None
+    assert len(cache) == 0
+
+
+def test_already_expiring_stream_url_is_not_stored(clock: _Clock):
+    cache = ExtractionCache(max_entries=8, default_ttl=60, expiry_margin=10)
+    cache.set("a", {"url": "https://rr1.googlevideo.com/videoplayback?expire=1005"})
+    assert len(cache) == 0
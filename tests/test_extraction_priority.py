@@ -0,0 +1,49 @@
+import asyncio
+import threading
+
+from muscpy import yt_dlp_streamer
+from muscpy.extraction_executor import ExtractionPriority, ExtractionScheduler
+
+
+class _Pool:
+    def __init__(self):
+        self.release = threading.Event()
+        self.order: list[str] = []
+
+    def extract_info(self, url, overrides=None):
+        if url == "busy":
+            _ = self.release.wait(5)
+        self.order.append(url)
+        return {"url": url}
+
+
+def test_command_joining_a_prefetch_skips_the_background_queue(monkeypatch):
+    pool = _Pool()
+    scheduler = ExtractionScheduler(workers=1, max_per_guild=1)
+    monkeypatch.setitem(yt_dlp_streamer.ytdl_pools, "search", pool)
+    monkeypatch.setattr(yt_dlp_streamer, "extraction_scheduler", scheduler)
+
+    async def run():
+        def extract(url, priority):
+            return asyncio.ensure_future(
+                yt_dlp_streamer.extract_info(url, "search", priority=priority)
+            )
+
+        busy = extract("busy", ExtractionPriority.INTERACTIVE)
+        background = [
+            extract(f"prefetch {indx}", ExtractionPriority.BACKGROUND)
+            for indx in range(5)
+        ]
+        await asyncio.sleep(0.05)  # every job queued behind the busy worker
+        play = extract("prefetch 4", ExtractionPriority.INTERACTIVE)
+        await asyncio.sleep(0.05)
+        pool.release.set()
+        await asyncio.gather(busy, play, *background)
+
+    try:
+        asyncio.run(run())
+    finally:
+        scheduler.shutdown()
+    assert pool.order[:2] == ["busy", "prefetch 4"]
+    assert pool.order[2:] == [f"prefetch {indx}" for indx in range(4)]
+    assert not yt_dlp_streamer._flight_priorities
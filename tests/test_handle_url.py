@@ -0,0 +1,51 @@
+import asyncio
+import gc
+import warnings
+
+from muscpy.yt_dlp_streamer import YTDLHandler
+
+
+class _Interaction:
+    id = 1
+
+    def __init__(self, expire_after: int):
+        self.checks = 0
+        self.expire_after = expire_after
+        self.user = None
+
+    def is_expired(self) -> bool:
+        self.checks += 1
+        return self.checks > self.expire_after
+
+    async def edit_original_response(self, **_):
+        return None
+
+
+class _Bot:
+    loop = None
+
+
+async def _entry() -> None:
+    # never resolves to a track, the playlist is cut short before it matters
+    await asyncio.sleep(0.05)
+
+
+def test_expired_interaction_leaves_no_unawaited_hydrations():
+    async def run():
+        handler = YTDLHandler(_Bot(), None, guild_id="1")  # pyright: ignore[reportArgumentType]
+
+        async def entries(url, guild_id=None):
+            for _ in range(50):
+                yield _entry(), True
+
+        handler.generate_track_or_que_urls = entries  # pyright: ignore[reportAttributeAccessIssue]
+        await handler.handle_url(
+            _Interaction(expire_after=20), "https://example.com/list"
+        )  # pyright: ignore[reportArgumentType]
+        await asyncio.sleep(0)
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        asyncio.run(run())
+        gc.collect()
+    assert not [w for w in caught if "never awaited" in str(w.message)]
@@ -0,0 +1,81 @@
+import asyncio
+
+from muscpy.idle_checker import IdleChecker
+from muscpy.yt_dlp_streamer import Track, YTDLHandler
+
+
+class _VoiceClient:
+    def __init__(self, connected: bool = True, playing: bool = True):
+        self.connected = connected
+        self.playing = playing
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    def is_playing(self) -> bool:
+        return self.playing
+
+
+class _Interaction:
+    id = 1
+
+    def is_expired(self) -> bool:
+        return False
+
+    async def edit_original_response(self, **_):
+        return None
+
+
+class _Bot:
+    loop = None
+
+
+async def _playing_guild(voice_client: _VoiceClient) -> tuple[IdleChecker, YTDLHandler]:
+    idle = IdleChecker()
+    handler = YTDLHandler(
+        _Bot(),  # pyright: ignore[reportArgumentType]
+        voice_client,  # pyright: ignore[reportArgumentType]
+        guild_id="1",
+        on_playback_change=idle.playback_changed,
+    )
+    await idle.init_idle_state_for_client(
+        "1",
+        voice_client,  # pyright: ignore[reportArgumentType]
+        None,  # pyright: ignore[reportArgumentType]
+        handler,
+    )
+    guild = idle._timers.peek("1")
+    assert guild is not None and guild.playing and guild.deadline is None
+    # the track ended without telling the checker, like after a skip
+    voice_client.playing = False
+    return idle, handler
+
+
+def test_play_next_while_disconnected_arms_the_deadline():
+    async def run():
+        voice_client = _VoiceClient()
+        idle, handler = await _playing_guild(voice_client)
+        voice_client.connected = False
+        handler.queue.append(
+            Track.from_dict(
+                {"url": "https://example.com/a", "title": "a", "duration": 1},
+                fetch_sts=True,
+            )
+        )
+        await handler.play_next(_Interaction())  # pyright: ignore[reportArgumentType]
+        guild = idle._timers.peek("1")
+        assert guild is not None
+        assert not guild.playing
+        assert guild.deadline is not None
+
+    asyncio.run(run())
+
+
+def test_play_next_on_an_empty_queue_arms_the_deadline():
+    async def run():
+        idle, handler = await _playing_guild(_VoiceClient())
+        await handler.play_next(_Interaction())  # pyright: ignore[reportArgumentType]
+        guild = idle._timers.peek("1")
+        assert guild is not None and guild.deadline is not None
+
+    asyncio.run(run())
@@ -0,0 +1,123 @@
+import asyncio
+import time
+from collections import defaultdict, deque
+from typing import Any
+
+import discord
+
+from muscpy.outbound import OutboundScheduler
+
+# Discord's message routes allow 5 requests per 5 seconds, scaled down 10x
+ROUTE_LIMIT = 5
+ROUTE_WINDOW = 0.5
+INTERACTIONS = 6
+EDITS = 30
+CHANNELS = 2
+SENDS = 8
+
+
+class _FakeDiscord:
+    """
+    Per route sliding window limit, answering 429 past it like Discord.
+    """
+
+    def __init__(self):
+        self.attempts: dict[str, list[float]] = defaultdict(list)
+        self.accepted: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        self.rate_limited = 0
+        self._windows: dict[str, deque[float]] = defaultdict(deque)
+
+    async def request(self, route: str, payload: dict[str, Any]) -> dict[str, Any]:
+        await asyncio.sleep(0)
+        now = time.monotonic()
+        self.attempts[route].append(now)
+        window = self._windows[route]
+        while window and window[0] <= now - ROUTE_WINDOW:
+            _ = window.popleft()
+        if len(window) >= ROUTE_LIMIT:
+            self.rate_limited += 1
+            raise discord.RateLimited(window[0] + ROUTE_WINDOW - now)
+        window.append(now)
+        self.accepted[route].append(payload)
+        return payload
+
+
+class _Interaction:
+    def __init__(self, fake: _FakeDiscord, interaction_id: int):
+        self.fake = fake
+        self.id = interaction_id
+
+    def is_expired(self) -> bool:
+        return False
+
+    async def edit_original_response(self, **kwargs: Any) -> dict[str, Any]:
+        return await self.fake.request(f"/webhooks/{self.id}/original", kwargs)
+
+
+class _Channel:
+    def __init__(self, fake: _FakeDiscord, channel_id: int):
+        self.fake = fake
+        self.id = channel_id
+
+    async def send(self, **kwargs: Any) -> dict[str, Any]:
+        return await self.fake.request(f"/channels/{self.id}/messages", kwargs)
+
+
+async def _burst(scheduler: OutboundScheduler, fake: _FakeDiscord) -> int:
+    failed = 0
+
+    async def progress(interaction: _Interaction) -> None:
+        nonlocal failed
+        pending = []
+        for step in range(EDITS):
+            pending.append(
+                asyncio.ensure_future(scheduler.edit(interaction, content=str(step)))  # pyright: ignore[reportArgumentType]
+            )
+            await asyncio.sleep(0.005)
+        for result in await asyncio.gather(*pending, return_exceptions=True):
+            failed += isinstance(result, Exception)
+
+    async def announce(channel: _Channel) -> None:
+        nonlocal failed
+        for step in range(SENDS):
+            try:
+                _ = await scheduler.send(channel, content=str(step))  # pyright: ignore[reportArgumentType]
+            except discord.HTTPException:
+                failed += 1
+
+    _ = await asyncio.gather(
+        *(progress(_Interaction(fake, i)) for i in range(INTERACTIONS)),
+        *(announce(_Channel(fake, 1000 + i)) for i in range(CHANNELS)),
+    )
+    return failed
+
+
+def test_burst_through_the_scheduler():
+    fake = _FakeDiscord()
+    burst, rate = ROUTE_LIMIT, ROUTE_LIMIT / ROUTE_WINDOW
+    scheduler = OutboundScheduler(target_burst=burst, target_rate=rate)
+    failed = asyncio.run(_burst(scheduler, fake))
+
+    assert failed == 0
+    routes = INTERACTIONS + CHANNELS
+    assert len(fake.attempts) == routes
+    # the bucket refills ahead of Discord's sliding window, so a route may
+    # hit a 429 once it runs past its burst; each one blocks it until the
+    # window frees up instead of retrying into it
+    assert fake.rate_limited <= 2 * routes
+    for route, attempts in fake.attempts.items():
+        # no interval saw more requests than the bucket lets through
+        for first in range(len(attempts)):
+            for last in range(first, len(attempts)):
+                allowed = burst + rate * (attempts[last] - attempts[first])
+                assert last - first + 1 <= allowed + 1, route
+    for i in range(INTERACTIONS):
+        edits = fake.accepted[f"/webhooks/{i}/original"]
+        # coalesced, but the latest content always goes out
+        assert len(edits) < EDITS
+        assert edits[-1] == {"content": str(EDITS - 1)}
+    for i in range(CHANNELS):
+        sends = fake.accepted[f"/channels/{1000 + i}/messages"]
+        assert [send["content"] for send in sends] == [
+            str(step) for step in range(SENDS)
+        ]
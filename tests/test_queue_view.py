@@ -0,0 +1,50 @@
+from dataclasses import dataclass
+
+import pytest
+
+from muscpy.queue_view import _FIELD_LIMIT, QueuePages
+from muscpy.track_queue import TrackQueue
+
+
+@dataclass
+class _Entry:
+    title: str | None
+
+
+@pytest.mark.parametrize("page_size", [1, 7, 10, 25])
+def test_full_page_of_long_titles_fits_an_embed_field(page_size: int):
+    queue: TrackQueue[_Entry] = TrackQueue()
+    for _ in range(page_size * 3):
+        queue.append(_Entry("x" * 300))
+    pages = QueuePages(queue, page_size=page_size)
+    for page in range(pages.page_count):
+        text = pages.render(page)
+        assert len(text) <= _FIELD_LIMIT
+        assert text.count("\n") == page_size - 1
+
+
+def test_short_titles_are_not_truncated():
+    queue: TrackQueue[_Entry] = TrackQueue()
+    queue.append(_Entry("first"))
+    queue.append(_Entry(None))
+    assert QueuePages(queue, page_size=10).render(0) == "1. first\n2. Unknown"
+
+
+def test_only_pages_whose_titles_changed_are_rendered_again():
+    queue: TrackQueue[_Entry] = TrackQueue(_Entry(f"t{indx}") for indx in range(25))
+    pages = QueuePages(queue, page_size=10)
+    for page in range(3):
+        _ = pages.render(page)
+    assert pages.renders == 3
+    queue.append(_Entry("t25"))
+    assert pages.render(0).startswith("1. t0")
+    assert pages.renders == 3
+    assert pages.render(2).endswith("26. t25")
+    assert pages.renders == 4
+    # a fetch fills in the title of a queued entry, the queue itself is unchanged
+    queue[12].title = "fetched"
+    assert "13. fetched" in pages.render(1)
+    assert pages.renders == 5
+    _ = queue.popleft()
+    assert pages.render(0).startswith("1. t1")
+    assert pages.renders == 6
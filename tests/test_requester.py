@@ -0,0 +1,53 @@
+from muscpy import yt_dlp_streamer
+from muscpy.yt_dlp_streamer import PlaylistCursor, Requester, Track, TrackInfo
+
+
+class _Guild:
+    id = 10
+
+
+class _Member:
+    def __init__(self, user_id: int, display_name: str):
+        self.id = user_id
+        self.display_name = display_name
+        self.guild = _Guild()
+
+
+def _track() -> Track:
+    info = TrackInfo.intern(
+        original_url="https://www.youtube.com/watch?v=requester01",
+        title="requested",
+        length=100,
+        thumbnail=None,
+        extractor=None,
+        playlist_url=None,
+    )
+    return Track(info=info, data_url=info.original_url)
+
+
+def test_requester_is_shown_by_guild_nickname(monkeypatch):
+    member = _Member(1, "nickname")
+    members = {(1, 10): member}
+    monkeypatch.setattr(
+        yt_dlp_streamer,
+        "requester_lookup",
+        lambda user_id, guild_id: members.get((user_id, guild_id)),
+    )
+    track, cursor = _track(), PlaylistCursor("url", "playlist", 1)
+    track.requester = member  # pyright: ignore[reportAttributeAccessIssue]
+    cursor.requester = member  # pyright: ignore[reportAttributeAccessIssue]
+    assert track.requested_by is cursor.requested_by
+    assert track.requester is member
+    member.display_name = "renamed"
+    assert track.requester_name == cursor.requester_name == "renamed"
+    assert not hasattr(track, "__dict__")
+
+
+def test_unresolvable_requester_keeps_the_name_it_had(monkeypatch):
+    monkeypatch.setattr(yt_dlp_streamer, "requester_lookup", lambda *_: None)
+    track = _track()
+    assert track.requester_name == "Unknown"
+    track.requester = _Member(2, "left the guild")  # pyright: ignore[reportAttributeAccessIssue]
+    assert track.requester is None
+    assert track.requester_name == "left the guild"
+    assert Requester.of(_Member(2, "new name")).name == "new name"  # pyright: ignore[reportArgumentType]
@@ -0,0 +1,85 @@
+import asyncio
+
+from muscpy.utils import SharedDict
+
+
+def test_iteration_walks_a_snapshot_taken_before_mutations():
+    async def run():
+        shared: SharedDict[str, int] = SharedDict()
+        for key, value in (("a", 1), ("b", 2), ("c", 3)):
+            await shared.set(key, value)
+        seen = []
+        async for key, value in shared.items():
+            seen.append((key, value))
+            # e.g. a guild disconnecting while the idle loop walks the registry
+            await shared.delete("c")
+            await shared.set("d", 4)
+        assert seen == [("a", 1), ("b", 2), ("c", 3)]
+        assert dict(shared.snapshot()) == {"a": 1, "b": 2, "d": 4}
+
+    asyncio.run(run())
+
+
+def test_snapshot_is_rebuilt_only_after_a_mutation():
+    async def run():
+        shared: SharedDict[str, int] = SharedDict()
+        await shared.set("a", 1)
+        snapshot = shared.snapshot()
+        assert shared.snapshot() is snapshot
+        await shared.delete("missing")
+        assert shared.snapshot() is snapshot
+        await shared.set("a", 2)
+        assert shared.snapshot() is not snapshot
+        assert shared.snapshot() == (("a", 2),)
+
+    asyncio.run(run())
+
+
+def test_key_locks_serialize_one_key_and_are_dropped_when_unused():
+    async def run():
+        shared: SharedDict[str, int] = SharedDict()
+        order = []
+        release = asyncio.Event()
+
+        async def hold(key: str, name: str):
+            async with shared.lock(key):
+                order.append(f"{name} in")
+                if name == "first":
+                    await release.wait()
+                order.append(f"{name} out")
+
+        first = asyncio.ensure_future(hold("guild", "first"))
+        second = asyncio.ensure_future(hold("guild", "second"))
+        cancelled = asyncio.ensure_future(hold("guild", "cancelled"))
+        await asyncio.sleep(0)
+        # another key is never blocked by them
+        await asyncio.wait_for(hold("other", "other"), timeout=1)
+        assert shared._key_lock_users["guild"] == 3
+        _ = cancelled.cancel()
+        await asyncio.sleep(0)
+        assert shared._key_lock_users["guild"] == 2
+        release.set()
+        await asyncio.gather(first, second)
+        assert order == [
+            "first in",
+            "other in",
+            "other out",
+            "first out",
+            "second in",
+            "second out",
+        ]
+        assert shared._key_locks == {}
+        assert not shared._key_lock_users
+
+    asyncio.run(run())
+
+
+def test_setdefault_keeps_the_first_value():
+    async def run():
+        shared: SharedDict[str, int] = SharedDict()
+        results = await asyncio.gather(*(shared.setdefault("a", n) for n in range(3)))
+        assert results == [0, 0, 0]
+        assert await shared.get("a") == 0
+        assert shared._key_locks == {}
+
+    asyncio.run(run())
@@ -0,0 +1,77 @@
+import asyncio
+import gc
+
+import pytest
+
+from muscpy.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_run():
+    async def run():
+        flights = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*(flights.do("key", fetch) for _ in range(5)))
+        assert results == [1] * 5
+        assert (flights.started, flights.coalesced, len(flights)) == (1, 4, 0)
+        assert await flights.do("key", fetch) == 2
+
+    asyncio.run(run())
+
+
+def test_a_cancelled_caller_does_not_cancel_the_others():
+    async def run():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "data"
+
+        first = asyncio.ensure_future(flights.do("key", fetch))
+        second = asyncio.ensure_future(flights.do("key", fetch))
+        await asyncio.sleep(0)
+        _ = first.cancel()
+        await asyncio.sleep(0)
+        assert first.cancelled()
+        assert len(flights) == 1
+        release.set()
+        assert await second == "data"
+
+    asyncio.run(run())
+
+
+def test_every_caller_gets_the_error_and_it_is_retrieved():
+    async def run():
+        reported = []
+        asyncio.get_running_loop().set_exception_handler(
+            lambda loop, context: reported.append(context)
+        )
+        flights = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0)
+            raise RuntimeError("extraction failed")
+
+        results = await asyncio.gather(
+            flights.do("key", fetch), flights.do("key", fetch), return_exceptions=True
+        )
+        assert [str(result) for result in results] == ["extraction failed"] * 2
+
+        # the only caller gave up, the error must not be logged as never retrieved
+        waiter = asyncio.ensure_future(flights.do("other", fetch))
+        await asyncio.sleep(0)
+        _ = waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0.01)
+        gc.collect()
+        assert reported == []
+
+    asyncio.run(run())
@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+import discord
+
+from muscpy import yt_dlp_streamer
+from muscpy.yt_dlp_streamer import Track, TrackInfo, YTDLHandler
+
+_PAGE = "https://www.youtube.com/watch?v=refresh0001"
+
+
+def _stream_url(expires_at: float) -> str:
+    return f"https://rr1.googlevideo.com/videoplayback?expire={int(expires_at)}"
+
+
+class _VoiceClient:
+    def __init__(self):
+        self.played = []
+
+    def is_connected(self) -> bool:
+        return True
+
+    def is_playing(self) -> bool:
+        return bool(self.played)
+
+    def play(self, source, after) -> None:
+        self.played.append(source)
+
+
+class _Source(discord.AudioSource):
+    def read(self) -> bytes:
+        return b""
+
+
+class _Interaction:
+    id = 1
+
+    def is_expired(self) -> bool:
+        return False
+
+    async def edit_original_response(self, **_):
+        return None
+
+
+class _Bot:
+    loop = None
+
+
+def _track(expires_at: float) -> Track:
+    info = TrackInfo.intern(
+        original_url=_PAGE,
+        title="refresh",
+        length=300,
+        thumbnail=None,
+        extractor=None,
+        playlist_url=None,
+    )
+    return Track(info=info, data_url=_stream_url(expires_at), fetched=True)
+
+
+def test_expiry_is_parsed_once_per_url():
+    track = _track(2_000_000_000)
+    assert track.expires_at == 2_000_000_000
+    track.data_url = _stream_url(2_000_000_100)
+    assert track.expires_at == 2_000_000_100
+
+
+def test_url_expiring_during_the_track_is_refreshed_before_ffmpeg_starts():
+    async def run():
+        voice_client = _VoiceClient()
+        handler = YTDLHandler(_Bot(), voice_client, guild_id="1")  # pyright: ignore[reportArgumentType]
+        fresh = _stream_url(time.time() + 6 * 60 * 60)
+        refreshed = []
+
+        async def get_new_stream_url(url, guild_id=None):
+            await asyncio.sleep(0.01)
+            refreshed.append(url)
+            return fresh, "opus"
+
+        spawned = []
+        handler.get_new_stream_url = get_new_stream_url  # pyright: ignore[reportAttributeAccessIssue]
+        handler._spawn_source = lambda track, cached_path, start=0.0, fill=None: (  # pyright: ignore[reportAttributeAccessIssue]
+            spawned.append(track.data_url) or _Source()
+        )
+        # playable now, dead before the 300s track ends
+        handler.queue.append(_track(time.time() + 120))
+        await handler.play_next(_Interaction())  # pyright: ignore[reportArgumentType]
+        assert refreshed == [_PAGE]
+        assert spawned == [fresh]
+
+    asyncio.run(run())
+
+
+def test_a_refused_stream_resumes_with_the_new_formats_codec():
+    async def run():
+        voice_client = _VoiceClient()
+        handler = YTDLHandler(_Bot(), voice_client, guild_id="1")  # pyright: ignore[reportArgumentType]
+        track = _track(time.time() + 120)
+        track.acodec = "opus"
+        fresh = _stream_url(time.time() + 6 * 60 * 60)
+
+        async def get_new_stream_url(url, guild_id=None):
+            return fresh, "mp4a.40.2"
+
+        spawned = []
+        handler.get_new_stream_url = get_new_stream_url  # pyright: ignore[reportAttributeAccessIssue]
+        handler._spawn_source = lambda track, cached_path, start=0.0, fill=None: (  # pyright: ignore[reportAttributeAccessIssue]
+            spawned.append((track.data_url, track.is_opus, start)) or _Source()
+        )
+        await handler._resume_stream(_Interaction(), track, 403, 42.0)  # pyright: ignore[reportArgumentType]
+        assert spawned == [(fresh, False, 42.0)]
+        assert len(voice_client.played) == 1
+
+    asyncio.run(run())
+
+
+def test_no_new_stream_url_from_a_playlist_shaped_answer(monkeypatch):
+    async def extract_info(url, profile, **_):
+        return {"entries": [{"url": _stream_url(2_000_000_000)}]}
+
+    monkeypatch.setattr(yt_dlp_streamer, "extract_info", extract_info)
+    assert asyncio.run(YTDLHandler.get_new_stream_url(_PAGE)) is None
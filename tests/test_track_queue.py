@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from muscpy.track_queue import TrackQueue
+
+
+class _SmallBlocks(TrackQueue[int]):
+    BLOCK_SIZE = 4
+
+
+def _clamp(reference: list[int], index: int) -> int:
+    if index < 0:
+        index += len(reference)
+    return min(max(0, index), len(reference))
+
+
+def _apply(queue: TrackQueue[int], reference: list[int], rng: random.Random):
+    size = len(reference)
+    op = rng.choice(
+        [
+            "append",
+            "appendleft",
+            "extend",
+            "insert_many",
+            "popleft",
+            "pop",
+            "remove",
+            "remove_range",
+            "skip",
+            "move",
+        ]
+    )
+    index = rng.randint(-size - 2, size + 2)
+    items = [rng.randint(0, 999) for _ in range(rng.randint(0, 9))]
+    if op == "append":
+        queue.append(items[0] if items else 1)
+        reference.append(items[0] if items else 1)
+    elif op == "appendleft":
+        queue.appendleft(7)
+        reference.insert(0, 7)
+    elif op == "extend":
+        queue.extend(items)
+        reference.extend(items)
+    elif op == "insert_many":
+        queue.insert_many(index, items)
+        position = _clamp(reference, index)
+        reference[position:position] = items
+    elif op == "popleft":
+        assert queue.popleft() == (reference.pop(0) if reference else None)
+    elif op == "pop":
+        expected = reference.pop(index) if -size <= index < size else None
+        assert queue.pop(index) == expected
+    elif op == "remove":
+        item = rng.choice(reference) if reference and rng.random() < 0.8 else -1
+        if item in reference:
+            queue.remove(item)
+            reference.remove(item)
+        else:
+            with pytest.raises(ValueError):
+                queue.remove(item)
+    elif op == "remove_range":
+        start, stop = sorted((rng.randint(-1, size + 1), rng.randint(-1, size + 1)))
+        expected = reference[max(0, start) : max(0, stop)]
+        assert queue.remove_range(start, stop) == expected
+        del reference[max(0, start) : max(0, stop)]
+    elif op == "skip":
+        count = rng.randint(0, 6)
+        assert queue.skip(count) == reference[:count]
+        del reference[:count]
+    elif op == "move" and reference:
+        src = rng.randrange(-size, size)
+        item = reference.pop(src)
+        position = _clamp(reference, index)
+        reference.insert(position, item)
+        queue.move(src, index)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_a_list_under_random_operations(seed: int):
+    rng = random.Random(seed)
+    queue = _SmallBlocks(range(rng.randint(0, 20)))
+    reference = list(range(len(queue)))
+    for _ in range(300):
+        version = queue.version
+        before = list(reference)
+        _apply(queue, reference, rng)
+        assert len(queue) == len(reference)
+        assert list(queue) == reference
+        if reference != before:
+            assert queue.version > version
+        assert all(len(block) <= queue.BLOCK_SIZE for block in queue._blocks)
+        assert all(queue._blocks), "empty blocks are dropped"
+        if reference:
+            probe = rng.randrange(-len(reference), len(reference))
+            assert queue[probe] == reference[probe]
+        start, stop = rng.randint(-2, len(reference) + 2), rng.randint(-2, 40)
+        assert queue.slice(start, stop) == reference[max(0, start) : max(0, stop)]
+    assert queue.head(3) == reference[:3]
+
+
+def test_shuffle_keeps_the_items_and_clear_empties():
+    queue = _SmallBlocks(range(50))
+    queue.shuffle()
+    assert sorted(queue) == list(range(50))
+    assert all(len(block) <= queue.BLOCK_SIZE for block in queue._blocks)
+    queue.clear()
+    assert not queue
+    assert queue.popleft() is None
+    assert queue.pop() is None
+    with pytest.raises(IndexError):
+        _ = queue[0]
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import time
+
+from muscpy.track_store import TrackStore
+
+_URL = "https://www.youtube.com/watch?v=store000001"
+
+
+def _stored(path) -> TrackStore:
+    store = TrackStore(str(path))
+    store.open()
+    store.put(
+        {
+            "original_url": _URL,
+            "title": "stored",
+            "duration": 200,
+            "url": f"https://rr1.googlevideo.com/videoplayback?expire={int(time.time()) + 3600}",
+            "acodec": "opus",
+        }
+    )
+    store.close()  # flushes the writer
+    store.open()
+    return store
+
+
+def test_hydrate_fills_metadata_missing_from_a_flat_entry(tmp_path):
+    store = _stored(tmp_path / "tracks.sqlite3")
+    try:
+        data = asyncio.run(store.hydrate({"url": _URL, "title": "flat"}))
+        assert data["title"] == "flat"
+        assert data["duration"] == 200
+        stream = asyncio.run(store.get_stream(_URL))
+        assert stream is not None and stream[1] == "opus"
+    finally:
+        store.close()
+
+
+def test_a_blocked_read_does_not_stall_the_event_loop(tmp_path):
+    store = _stored(tmp_path / "tracks.sqlite3")
+    held = threading.Event()
+
+    def hold_read_lock():
+        # stands in for a read waiting on a checkpoint of the writer
+        with store._read_lock:
+            held.set()
+            time.sleep(0.3)
+
+    async def run():
+        holder = threading.Thread(target=hold_read_lock)
+        holder.start()
+        held.wait()
+        read = asyncio.ensure_future(store.get_metadata(_URL))
+        ticks = 0
+        while not read.done():
+            await asyncio.sleep(0.01)
+            ticks += 1
+        holder.join()
+        assert (await read)["title"] == "stored"
+        assert ticks >= 10
+
+    try:
+        asyncio.run(run())
+    finally:
+        store.close()
@@ -3,6 +3,11 @@ from pprint import pprint
 from typing import Any
 from yt_dlp import YoutubeDL
 
+from muscpy.ytdl_replay import FixtureStore
+
+# replayable by ReplayYoutubeDL, e.g. benchmarks/resolution_bench.py ./temp/fixtures
+fixtures = FixtureStore("./temp/fixtures")
+
 
 common_ytdl_options = {
     "format": "bestaudio/best",
@@ -50,13 +55,16 @@ def save_data_to_json(data: Any, filename: str):
 
 def search_extract():
     with YoutubeDL(ytdl_search_options) as ydl:
-        result = ydl.extract_info("ytsearch5:the boys finale ost", download=False)
+        url = "ytsearch5:the boys finale ost"
+        result = ydl.extract_info(url, download=False)
+        fixtures.save(url, ydl.params, ydl.sanitize_info(result))
         return result
 
 
 def extract_info_glbl_options(url: str) -> dict[str, Any] | None:
     with YoutubeDL(ytdl_glbl_format_options) as ydl:
         result = ydl.extract_info(url, download=False)
+        fixtures.save(url, ydl.params, ydl.sanitize_info(result))
         return result
 
 